@@ -5,6 +5,8 @@ import subprocess
 import threading
 import os
 import requests
+from launcher_index import InstalledVersionsIndex
+from launcher_console import ConsoleSink
 
 class MinecraftLauncher:
     def __init__(self, root):
@@ -16,6 +18,7 @@ class MinecraftLauncher:
         self.minecraft_dir = os.path.join(os.getenv('APPDATA'), '.minecraft')
         if not os.path.exists(self.minecraft_dir):
             os.makedirs(self.minecraft_dir)
+        self.versions_index = InstalledVersionsIndex(self.minecraft_dir)
         
         # UI Elements
         self.create_widgets()
@@ -42,6 +45,8 @@ class MinecraftLauncher:
         # Console Output
         self.console = scrolledtext.ScrolledText(main_frame, height=10)
         self.console.grid(row=3, column=0, columnspan=2, sticky=tk.NSEW)
+        self.console_sink = ConsoleSink(self.root, self.console)
+        self.console_sink.start()
 
         # Configure grid weights
         main_frame.columnconfigure(1, weight=1)
@@ -49,7 +54,7 @@ class MinecraftLauncher:
 
     def load_versions(self):
         try:
-            versions = minecraft_launcher_lib.utils.get_installed_versions(self.minecraft_dir)
+            versions = self.versions_index.refresh()
             version_names = [v['id'] for v in versions]
             self.version_combo['values'] = version_names
             if version_names:
@@ -58,8 +63,7 @@ class MinecraftLauncher:
             self.log_message(f"Error loading versions: {str(e)}")
 
     def log_message(self, message):
-        self.console.insert(tk.END, message + "\n")
-        self.console.see(tk.END)
+        self.console_sink.write(message)
 
     def start_launch_thread(self):
         threading.Thread(target=self.launch_minecraft).start()
@@ -1,15 +1,36 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
-import minecraft_launcher_lib
 import subprocess
 import threading
 import os
 import json
+import time
 import shutil
-import requests
 from pathlib import Path
 import uuid
 from functools import partial
+from launcher_install import VersionInstaller
+from launcher_store import ContentStore
+from launcher_manifest import ManifestCache
+from launcher_index import InstalledVersionsIndex
+from launcher_console import ConsoleSink
+from launcher_logs import GameLogArchive
+from launcher_launchcache import LaunchCommandCache, build_minecraft_command
+from launcher_verify import IntegrityVerifier
+from catclient_settings import app_data_dir, launcher_dir, open_settings, open_accounts, apply_network_settings
+from launcher_ping import ServerPinger
+from launcher_metrics import LaunchTimer, LaunchMetrics
+from launcher_supervisor import Supervisor, parse_cpu_set, format_cpu_set, lowest_nice, clamp_nice
+from launcher_mods import ModIndex
+from launcher_packopt import PackOptimizer
+from launcher_treeview import LazyTreeview
+from launcher_java import JavaRegistry
+from launcher_cds import ClassDataSharing
+from launcher_backup import BackupTarget, KEEP_SNAPSHOTS, throughput
+from launcher_updates import ModUpdateChecker, UPDATE_INDEX_URL
+from launcher_monitor import ResourceMonitor, heap_limit
+from launcher_warm import PageCacheWarmer, command_files, version_files
+from launcher_jvm import PROFILES, DEFAULT_PROFILE, detect_hardware, max_heap_gb, clamp_heap_gb, jvm_arguments
 
 class CatClient:
     def __init__(self, root):
@@ -20,51 +41,87 @@ class CatClient:
         self.style.theme_use('clam')
         
         # Directories setup
-        self.minecraft_dir = os.path.join(os.getenv('APPDATA'), '.catclient')
+        self.minecraft_dir = launcher_dir()
         self.versions_dir = os.path.join(self.minecraft_dir, 'versions')
         self.mods_dir = os.path.join(self.minecraft_dir, 'mods')
         self.resource_packs_dir = os.path.join(self.minecraft_dir, 'resourcepacks')
         self.assets_dir = os.path.join(self.minecraft_dir, 'assets')
         self.skins_dir = os.path.join(self.assets_dir, 'skins')
+        self.shared_dirs = [self.minecraft_dir, os.path.join(app_data_dir(), '.minecraft')]
+        self.store = ContentStore()
+        self.manifest_cache = ManifestCache(self.minecraft_dir, log=self.log)
+        self.versions_index = InstalledVersionsIndex(self.minecraft_dir)
+        self.log_archive = GameLogArchive(os.path.join(self.minecraft_dir, 'launcher_logs'))
+        self.launch_cache = LaunchCommandCache(self.minecraft_dir)
+        self.verifier = IntegrityVerifier(self.minecraft_dir)
+        self.pinger = ServerPinger()
+        self.hardware = detect_hardware()
+        self.java = JavaRegistry(self.minecraft_dir, self.shared_dirs)
+        self.warmer = PageCacheWarmer()
+        self.cds = ClassDataSharing(self.minecraft_dir, self.mods_dir)
+        self.metrics = LaunchMetrics(self.minecraft_dir)
+        self.supervisor = Supervisor()
+        self.monitor = ResourceMonitor(self.supervisor.list)
+        self.mod_index = ModIndex(self.mods_dir)
+        self.mods = []
+        self.mod_updates = {}
+        self.update_checker = None
+        # One BackupTarget per target directory, shared by every button
+        self.backup_targets = {}
+        self.pack_optimizer = PackOptimizer(os.path.join(self.minecraft_dir, 'packopt_cache'))
         
         for d in [self.minecraft_dir, self.versions_dir, self.mods_dir, 
                  self.resource_packs_dir, self.skins_dir]:
             os.makedirs(d, exist_ok=True)
         
         # Load settings and accounts
-        self.settings_file = os.path.join(self.minecraft_dir, 'settings.json')
-        self.accounts_file = os.path.join(self.minecraft_dir, 'accounts.json')
         self.load_data()
+        apply_network_settings(self.settings)
+        # Kept here rather than read from the Instances tab, which may never be built
+        self.instance_cpus = self.settings['instance_cpus']
+        self.instance_nice = clamp_nice(self.settings['instance_nice'])
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
-        # UI Setup
+        # UI Setup; list views are created with their tabs
+        self.acc_view = self.ver_view = self.srv_view = self.mod_view = None
         self.create_widgets()
+        if self.instance_nice != int(self.settings['instance_nice']):
+            self.log(f"Nice {self.settings['instance_nice']} needs elevated privileges; using {self.instance_nice}")
         self.load_versions()
         self.refresh_accounts_list()
         self.load_server_list()
+        self.manifest_cache.refresh_async()
+        self.discover_java()
+        self.monitor.set_interval(float(self.settings['monitor_interval']))
+        self.monitor.start()
+        self.draw_monitor_chart()
 
     def load_data(self):
-        self.settings = {
-            'ram_allocation': '4G',
-            'java_path': '',
-            'server_list': [],
-            'current_account': '',
-            'optimized_args': True
-        }
-        self.accounts = []
-        
-        if os.path.exists(self.settings_file):
-            with open(self.settings_file) as f:
-                self.settings.update(json.load(f))
-        
-        if os.path.exists(self.accounts_file):
-            with open(self.accounts_file) as f:
-                self.accounts = json.load(f)
+        # Both files load on first access; changes go through the stores,
+        # which journal them and write behind in the background
+        self.settings_store = open_settings(self.minecraft_dir)
+        self.accounts_store = open_accounts(self.minecraft_dir)
+
+    @property
+    def settings(self):
+        return self.settings_store.data
+
+    @property
+    def accounts(self):
+        return self.accounts_store.data
 
     def save_data(self):
-        with open(self.settings_file, 'w') as f:
-            json.dump(self.settings, f)
-        with open(self.accounts_file, 'w') as f:
-            json.dump(self.accounts, f)
+        self.settings_store.flush()
+        self.accounts_store.flush()
+
+    def on_close(self):
+        running = [i for i in self.supervisor.list() if i.running]
+        if running and not messagebox.askyesno(
+                "Quit", f"Stop {len(running)} running game instance(s) and quit?"):
+            return
+        self.supervisor.kill_all()
+        self.save_data()
+        self.root.destroy()
 
     def create_widgets(self):
         self.notebook = ttk.Notebook(self.root)
@@ -72,12 +129,42 @@ class CatClient:
 
         # Main Tab
         self.create_main_tab()
-        # Accounts Tab
-        self.create_accounts_tab()
-        # Versions Tab
-        self.create_versions_tab()
-        # Servers Tab
-        self.create_servers_tab()
+        # The other tabs start as empty frames and are built the first time they are shown
+        self.tabs = {}
+        self.built_tabs = set()
+        for name, title, build in [('accounts', "Accounts", self.create_accounts_tab),
+                                   ('versions', "Versions", self.create_versions_tab),
+                                   ('servers', "Servers", self.create_servers_tab),
+                                   ('mods', "Mods", self.create_mods_tab),
+                                   ('instances', "Instances", self.create_instances_tab),
+                                   ('logs', "Logs", self.create_logs_tab),
+                                   ('backup', "Backup", self.create_backup_tab)]:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=title)
+            self.tabs[name] = (frame, build)
+        self.notebook.bind('<<NotebookTabChanged>>', lambda e: self.on_tab_changed())
+
+    def on_tab_changed(self):
+        selected = self.notebook.select()
+        for name, (frame, build) in self.tabs.items():
+            if str(frame) == selected:
+                self.ensure_tab(name)
+
+    def ensure_tab(self, name):
+        if name not in self.built_tabs:
+            self.built_tabs.add(name)
+            frame, build = self.tabs[name]
+            build(frame)
+
+    def list_view(self, parent, columns, **kwargs):
+        # Treeview with a scrollbar, filled on demand through LazyTreeview
+        frame = ttk.Frame(parent)
+        tree = ttk.Treeview(frame, columns=columns, show='headings', **kwargs)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        return tree, LazyTreeview(tree, scrollbar)
 
     def create_main_tab(self):
         main_frame = ttk.Frame(self.notebook)
@@ -92,37 +179,79 @@ class CatClient:
         ttk.Label(main_frame, text="Version:").grid(row=1, column=0, padx=5, pady=2)
         self.version_combo = ttk.Combobox(main_frame, state='readonly')
         self.version_combo.grid(row=1, column=1, padx=5, pady=2, sticky=tk.EW)
+        self.version_combo.bind('<<ComboboxSelected>>', lambda e: self.on_version_selected())
         
         # Server Selection
         ttk.Label(main_frame, text="Server:").grid(row=2, column=0, padx=5, pady=2)
         self.server_combo = ttk.Combobox(main_frame, state='readonly')
         self.server_combo.grid(row=2, column=1, padx=5, pady=2, sticky=tk.EW)
         
-        # RAM Allocation
+        # RAM Allocation, clamped to what this machine can actually provide
+        ram_max = max_heap_gb(self.hardware)
         ttk.Label(main_frame, text="RAM (GB):").grid(row=3, column=0, padx=5, pady=2)
-        self.ram_scale = ttk.Scale(main_frame, from_=2, to=16, value=4)
+        self.ram_scale = ttk.Scale(main_frame, from_=1, to=ram_max, value=min(4, ram_max))
         self.ram_scale.grid(row=3, column=1, padx=5, pady=2, sticky=tk.EW)
         
+        # JVM Profile
+        ttk.Label(main_frame, text="JVM Profile:").grid(row=4, column=0, padx=5, pady=2)
+        self.profile_combo = ttk.Combobox(main_frame, state='readonly', values=PROFILES)
+        self.profile_combo.grid(row=4, column=1, padx=5, pady=2, sticky=tk.EW)
+        self.profile_combo.set(DEFAULT_PROFILE)
+        self.profile_combo.bind('<<ComboboxSelected>>', lambda e: self.on_profile_selected())
+        
+        # Java Runtime; "Automatic" picks the best match for each version
+        ttk.Label(main_frame, text="Java:").grid(row=5, column=0, padx=5, pady=2)
+        self.java_combo = ttk.Combobox(main_frame, state='readonly')
+        self.java_combo.grid(row=5, column=1, padx=5, pady=2, sticky=tk.EW)
+        self.java_combo.bind('<<ComboboxSelected>>', lambda e: self.on_java_selected())
+        self.java_paths = ['']
+        self.java_combo['values'] = ["Automatic"]
+        self.java_combo.current(0)
+        
         # Launch Button
         self.launch_btn = ttk.Button(main_frame, text="Launch", command=self.start_launch)
-        self.launch_btn.grid(row=4, column=0, columnspan=2, pady=10)
+        self.launch_btn.grid(row=6, column=0, sticky=tk.W, padx=5, pady=10)
+        self.metrics_label = ttk.Label(main_frame, text="")
+        self.metrics_label.grid(row=6, column=1, sticky=tk.W, padx=5, pady=10)
         
         # Console
         self.console = scrolledtext.ScrolledText(main_frame, height=15)
-        self.console.grid(row=5, column=0, columnspan=2, sticky=tk.NSEW, padx=5, pady=5)
+        self.console.grid(row=7, column=0, columnspan=2, sticky=tk.NSEW, padx=5, pady=5)
+        self.console_sink = ConsoleSink(self.root, self.console)
+        self.console_sink.start()
+        
+        # Resource Monitor
+        monitor_frame = ttk.Frame(main_frame)
+        monitor_frame.grid(row=8, column=0, columnspan=2, sticky=tk.EW, padx=5)
+        ttk.Label(monitor_frame, text="Monitor:").pack(side=tk.LEFT)
+        self.monitor_combo = ttk.Combobox(monitor_frame, state='readonly', width=24)
+        self.monitor_combo.pack(side=tk.LEFT, padx=5)
+        ttk.Label(monitor_frame, text="Every (s):").pack(side=tk.LEFT)
+        self.monitor_spin = ttk.Spinbox(monitor_frame, from_=0, to=60, increment=0.5, width=5,
+                                        command=self.on_monitor_interval_changed)
+        self.monitor_spin.set(self.settings['monitor_interval'])
+        self.monitor_spin.bind('<FocusOut>', lambda e: self.on_monitor_interval_changed())
+        self.monitor_spin.pack(side=tk.LEFT, padx=5)
+        ttk.Button(monitor_frame, text="Export...", command=self.export_monitor).pack(side=tk.RIGHT)
+        self.monitor_label = ttk.Label(monitor_frame, text="")
+        self.monitor_label.pack(side=tk.LEFT, padx=5)
+        
+        # RSS (blue) against the -Xmx line (dashed), CPU % (green) on its own scale
+        self.monitor_chart = tk.Canvas(main_frame, height=110, background='white', highlightthickness=0)
+        self.monitor_chart.grid(row=9, column=0, columnspan=2, sticky=tk.EW, padx=5, pady=5)
+        self.chart_heap = self.monitor_chart.create_line(0, 0, 0, 0, fill='gray', dash=(4, 2))
+        self.chart_rss = self.monitor_chart.create_line(0, 0, 0, 0, fill='blue', width=2)
+        self.chart_cpu = self.monitor_chart.create_line(0, 0, 0, 0, fill='green')
+        self.monitor_ids = []
         
         main_frame.columnconfigure(1, weight=1)
-        main_frame.rowconfigure(5, weight=1)
+        main_frame.rowconfigure(7, weight=1)
 
-    def create_accounts_tab(self):
-        acc_frame = ttk.Frame(self.notebook)
-        self.notebook.add(acc_frame, text="Accounts")
-        
+    def create_accounts_tab(self, acc_frame):
         # Account List
-        self.acc_list = ttk.Treeview(acc_frame, columns=('username', 'type'), show='headings')
+        self.acc_list, self.acc_view = self.list_view(acc_frame, ('username', 'type'))
         self.acc_list.heading('username', text='Username')
         self.acc_list.heading('type', text='Type')
-        self.acc_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Buttons
         btn_frame = ttk.Frame(acc_frame)
@@ -130,16 +259,14 @@ class CatClient:
         
         ttk.Button(btn_frame, text="Add Offline", command=self.add_offline_account).pack(side=tk.LEFT)
         ttk.Button(btn_frame, text="Remove", command=self.remove_account).pack(side=tk.RIGHT)
-
-    def create_versions_tab(self):
-        ver_frame = ttk.Frame(self.notebook)
-        self.notebook.add(ver_frame, text="Versions")
         
+        self.show_accounts()
+
+    def create_versions_tab(self, ver_frame):
         # Version List
-        self.ver_list = ttk.Treeview(ver_frame, columns=('id', 'type'), show='headings')
+        self.ver_list, self.ver_view = self.list_view(ver_frame, ('id', 'type'))
         self.ver_list.heading('id', text='Version ID')
         self.ver_list.heading('type', text='Type')
-        self.ver_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Controls
         ctrl_frame = ttk.Frame(ver_frame)
@@ -151,44 +278,452 @@ class CatClient:
         
         ttk.Button(ctrl_frame, text="Refresh", command=self.load_versions).pack(side=tk.LEFT)
         ttk.Button(ctrl_frame, text="Install", command=self.install_version).pack(side=tk.RIGHT)
-
-    def create_servers_tab(self):
-        srv_frame = ttk.Frame(self.notebook)
-        self.notebook.add(srv_frame, text="Servers")
+        ttk.Button(ctrl_frame, text="Clean Store", command=self.clean_store).pack(side=tk.RIGHT)
         
+        # Download cap shared by every transfer; 0 means unlimited
+        ttk.Label(ctrl_frame, text="Limit (KiB/s):").pack(side=tk.LEFT, padx=(10, 0))
+        self.limit_spin = ttk.Spinbox(ctrl_frame, from_=0, to=1048576, increment=256, width=8,
+                                      command=self.on_limit_changed)
+        self.limit_spin.set(self.settings['download_limit_kib'])
+        self.limit_spin.bind('<FocusOut>', lambda e: self.on_limit_changed())
+        self.limit_spin.bind('<Return>', lambda e: self.on_limit_changed())
+        self.limit_spin.pack(side=tk.LEFT, padx=5)
+        
+        # Install Progress
+        progress_frame = ttk.Frame(ver_frame)
+        progress_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.install_status = ttk.Label(progress_frame, text="")
+        self.install_status.pack(side=tk.LEFT)
+        self.install_progress = ttk.Progressbar(progress_frame, mode='determinate', maximum=1)
+        self.install_progress.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=5)
+        
+        self.show_versions()
+
+    def create_servers_tab(self, srv_frame):
         # Server List
-        self.srv_list = ttk.Treeview(srv_frame, columns=('name', 'address'), show='headings')
+        self.srv_list, self.srv_view = self.list_view(
+            srv_frame, ('name', 'address', 'status', 'latency', 'players', 'motd'))
         self.srv_list.heading('name', text='Name')
         self.srv_list.heading('address', text='Address')
-        self.srv_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.srv_list.heading('status', text='Status')
+        self.srv_list.heading('latency', text='Ping')
+        self.srv_list.heading('players', text='Players')
+        self.srv_list.heading('motd', text='MOTD')
+        for column, width in [('status', 70), ('latency', 60), ('players', 70)]:
+            self.srv_list.column(column, width=width, stretch=False)
         
         # Buttons
         btn_frame = ttk.Frame(srv_frame)
         btn_frame.pack(fill=tk.X, padx=5, pady=5)
         
         ttk.Button(btn_frame, text="Add", command=self.add_server).pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="Ping", command=lambda: self.ping_servers(force=True)).pack(side=tk.LEFT)
         ttk.Button(btn_frame, text="Remove", command=self.remove_server).pack(side=tk.RIGHT)
+        
+        self.show_servers()
+
+    def create_mods_tab(self, mods_frame):
+        # Mod List
+        columns = ('id', 'version', 'loader', 'depends', 'update', 'file')
+        self.mod_list, self.mod_view = self.list_view(mods_frame, columns)
+        for column, title in [('id', 'Mod ID'), ('version', 'Version'), ('loader', 'Loader'),
+                              ('depends', 'Depends On'), ('update', 'Update'), ('file', 'File')]:
+            self.mod_list.heading(column, text=title)
+        
+        # Controls
+        ctrl_frame = ttk.Frame(mods_frame)
+        ctrl_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.mods_status = ttk.Label(ctrl_frame, text="")
+        self.mods_status.pack(side=tk.LEFT)
+        ttk.Button(ctrl_frame, text="Rescan", command=self.load_mods).pack(side=tk.RIGHT)
+        ttk.Button(ctrl_frame, text="Check Updates", command=self.check_mod_updates).pack(side=tk.RIGHT)
+        ttk.Button(ctrl_frame, text="Optimize Resource Pack...", command=self.optimize_pack).pack(side=tk.RIGHT)
+        
+        self.load_mods()
+
+    def load_mods(self):
+        def show(mods, parsed, elapsed):
+            self.mods = mods
+            self.show_mods()
+            self.mods_status['text'] = f"{len(mods)} mods, {parsed} rescanned in {elapsed * 1000:.0f} ms"
+        
+        def task():
+            try:
+                start = time.perf_counter()
+                mods = self.mod_index.scan()
+                elapsed = time.perf_counter() - start
+                self.root.after(0, lambda: show(mods, self.mod_index.parsed, elapsed))
+            except Exception as e:
+                self.log(f"Error scanning mods: {str(e)}")
+        
+        threading.Thread(target=task, daemon=True).start()
+
+    def show_mods(self):
+        def update_column(mod):
+            report = self.mod_updates.get(mod['file'])
+            if not report:
+                return ''
+            if report['status'] == 'outdated':
+                return f"{report['latest']} available"
+            return {'current': 'up to date', 'unknown': 'not in index'}.get(report['status'], 'check failed')
+        
+        self.mod_view.set_rows((mod['file'], (
+            mod['id'] if mod['enabled'] else f"{mod['id']} (disabled)",
+            mod['version'], mod['loader'], ', '.join(mod['depends']), update_column(mod), mod['file']))
+            for mod in self.mods)
+
+    def check_mod_updates(self):
+        if self.update_checker is None:
+            self.update_checker = ModUpdateChecker(self.minecraft_dir, self.mods_dir,
+                                                   self.settings['mod_update_index'] or UPDATE_INDEX_URL,
+                                                   log=self.log)
+        self.mods_status['text'] = "Checking for updates..."
+        
+        def show(reports):
+            self.mod_updates = dict((report['file'], report) for report in reports)
+            self.show_mods()
+            self.mods_status['text'] = self.update_checker.summary_text()
+        
+        def task():
+            try:
+                reports = self.update_checker.check()
+                self.root.after(0, lambda: show(reports))
+            except Exception as e:
+                self.log(f"Error checking mod updates: {str(e)}")
+        
+        threading.Thread(target=task, daemon=True).start()
+
+    def optimize_pack(self):
+        path = filedialog.askopenfilename(initialdir=self.resource_packs_dir, title="Select Resource Pack",
+                                          filetypes=[("Resource Packs", "*.zip")])
+        if not path:
+            return
+        
+        def task():
+            try:
+                self.log(f"Optimizing {os.path.basename(path)}...")
+                self.pack_optimizer.optimize(path, log=self.log)
+            except Exception as e:
+                self.log(f"Error optimizing pack: {str(e)}")
+        
+        threading.Thread(target=task, daemon=True).start()
+
+    def create_instances_tab(self, inst_frame):
+        # Instance List
+        columns = ('id', 'name', 'pid', 'status', 'uptime', 'exit', 'cpus', 'nice')
+        self.inst_list = ttk.Treeview(inst_frame, columns=columns, show='headings', height=6)
+        for column, title, width in [('id', '#', 40), ('name', 'Name', 200), ('pid', 'PID', 70),
+                                     ('status', 'Status', 80), ('uptime', 'Uptime', 80),
+                                     ('exit', 'Exit Code', 70), ('cpus', 'CPUs', 100), ('nice', 'Nice', 50)]:
+            self.inst_list.heading(column, text=title)
+            self.inst_list.column(column, width=width, stretch=(column == 'name'))
+        self.inst_list.pack(fill=tk.X, padx=5, pady=5)
+        
+        # Controls
+        ctrl_frame = ttk.Frame(inst_frame)
+        ctrl_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(ctrl_frame, text="CPUs for new instances:").pack(side=tk.LEFT)
+        self.cpus_entry = ttk.Entry(ctrl_frame, width=12)
+        self.cpus_entry.insert(0, self.instance_cpus)
+        self.cpus_entry.bind('<FocusOut>', lambda e: self.on_instance_options_changed())
+        self.cpus_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Label(ctrl_frame, text="Nice:").pack(side=tk.LEFT)
+        self.nice_spin = ttk.Spinbox(ctrl_frame, from_=lowest_nice(), to=19, width=5,
+                                     command=self.on_instance_options_changed)
+        self.nice_spin.set(self.instance_nice)
+        self.nice_spin.bind('<FocusOut>', lambda e: self.on_instance_options_changed())
+        self.nice_spin.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(ctrl_frame, text="Remove", command=self.remove_instance).pack(side=tk.RIGHT)
+        ttk.Button(ctrl_frame, text="Restart", command=self.restart_instance).pack(side=tk.RIGHT)
+        ttk.Button(ctrl_frame, text="Kill", command=self.kill_instance).pack(side=tk.RIGHT)
+        
+        # Per-instance Consoles
+        self.inst_panes = ttk.Notebook(inst_frame)
+        self.inst_panes.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.refresh_instances()
+
+    def add_instance_pane(self, instance):
+        self.ensure_tab('instances')
+        console = scrolledtext.ScrolledText(self.inst_panes, height=15)
+        self.inst_panes.add(console, text=f"#{instance.id}")
+        sink = instance.extra['sink']
+        sink.widget = console
+        sink.start()
+        instance.extra['pane'] = console
+        self.show_instances()
+
+    def refresh_instances(self):
+        # Started once, when the tab is built; everything else calls show_instances
+        self.show_instances()
+        self.root.after(1000, self.refresh_instances)
+
+    def show_instances(self):
+        existing = set(self.inst_list.get_children())
+        for instance in self.supervisor.list():
+            iid = str(instance.id)
+            values = (instance.id, instance.name, instance.pid or '', instance.status,
+                      f"{instance.uptime:.0f} s", '' if instance.exit_code is None else instance.exit_code,
+                      format_cpu_set(instance.affinity), instance.nice)
+            if iid in existing:
+                self.inst_list.item(iid, values=values)
+                existing.discard(iid)
+            else:
+                self.inst_list.insert('', 'end', iid=iid, values=values)
+        for iid in existing:
+            self.inst_list.delete(iid)
+
+    def selected_instance(self):
+        selected = self.inst_list.selection()
+        if not selected:
+            messagebox.showwarning("No Selection", "Please select an instance")
+            return None
+        return self.supervisor.get(int(selected[0]))
+
+    def kill_instance(self):
+        instance = self.selected_instance()
+        if instance:
+            threading.Thread(target=instance.kill, daemon=True).start()
+
+    def restart_instance(self):
+        instance = self.selected_instance()
+        if instance:
+            threading.Thread(target=instance.restart, daemon=True).start()
+
+    def on_instance_options_changed(self):
+        cpus = self.cpus_entry.get().strip()
+        try:
+            parse_cpu_set(cpus)
+            requested = int(self.nice_spin.get())
+        except ValueError:
+            return
+        nice = clamp_nice(requested)
+        if nice != requested:
+            self.log(f"Nice {requested} needs elevated privileges; using {nice}")
+            self.nice_spin.set(nice)
+        self.instance_cpus, self.instance_nice = cpus, nice
+        self.settings_store.set('instance_cpus', cpus)
+        self.settings_store.set('instance_nice', nice)
+
+    def remove_instance(self):
+        instance = self.selected_instance()
+        if instance and self.supervisor.remove(instance.id) and 'sink' in instance.extra:
+            # An instance whose process never started has no console
+            instance.extra['sink'].stop()
+            if 'pane' in instance.extra:
+                self.inst_panes.forget(instance.extra['pane'])
+                instance.extra['pane'].destroy()
+
+    def create_logs_tab(self, logs_frame):
+        # Search Controls
+        search_frame = ttk.Frame(logs_frame)
+        search_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.log_search_entry = ttk.Entry(search_frame)
+        self.log_search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.log_search_entry.bind('<Return>', lambda e: self.search_logs())
+        ttk.Button(search_frame, text="Search", command=self.search_logs).pack(side=tk.RIGHT)
+        
+        # Results
+        self.log_results = scrolledtext.ScrolledText(logs_frame, height=15)
+        self.log_results.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def search_logs(self):
+        query = self.log_search_entry.get()
+        
+        def show(results, elapsed):
+            self.log_results.delete('1.0', tk.END)
+            self.log_results.insert(tk.END, f"{len(results)} matches in {elapsed * 1000:.0f} ms\n")
+            for name, number, line in results:
+                self.log_results.insert(tk.END, f"{name}:{number}: {line}\n")
+        
+        def task():
+            start = time.perf_counter()
+            results = self.log_archive.search(query)
+            elapsed = time.perf_counter() - start
+            self.root.after(0, lambda: show(results, elapsed))
+        
+        threading.Thread(target=task, daemon=True).start()
+
+    def create_backup_tab(self, backup_frame):
+        # Target Directory
+        target_frame = ttk.Frame(backup_frame)
+        target_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(target_frame, text="Target:").pack(side=tk.LEFT)
+        self.backup_target_entry = ttk.Entry(target_frame)
+        self.backup_target_entry.insert(0, self.settings['backup_target'])
+        self.backup_target_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.backup_target_entry.bind('<FocusOut>', lambda e: self.on_backup_target_changed())
+        ttk.Button(target_frame, text="Browse...", command=self.browse_backup_target).pack(side=tk.RIGHT)
+        
+        # Snapshot List
+        columns = ('name', 'files', 'changed', 'size', 'written', 'seconds')
+        self.backup_list, self.backup_view = self.list_view(backup_frame, columns, selectmode='browse')
+        for column, title in [('name', 'Snapshot'), ('files', 'Files'), ('changed', 'Changed'),
+                              ('size', 'Size (MiB)'), ('written', 'Written (MiB)'), ('seconds', 'Seconds')]:
+            self.backup_list.heading(column, text=title)
+        
+        # Controls
+        ctrl_frame = ttk.Frame(backup_frame)
+        ctrl_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.backup_status = ttk.Label(ctrl_frame, text="")
+        self.backup_status.pack(side=tk.LEFT)
+        ttk.Button(ctrl_frame, text="Prune", command=self.prune_backups).pack(side=tk.RIGHT)
+        ttk.Button(ctrl_frame, text="Restore Selected", command=self.restore_backup).pack(side=tk.RIGHT)
+        ttk.Button(ctrl_frame, text="Snapshot Now", command=self.snapshot_backup).pack(side=tk.RIGHT)
+        
+        self.load_backups()
+
+    def backup_target(self):
+        target = self.backup_target_entry.get().strip()
+        if not target:
+            messagebox.showwarning("No Target", "Please choose a backup target directory")
+            return None
+        return self.backups_for(target)
+
+    def backups_for(self, target):
+        if target not in self.backup_targets:
+            self.backup_targets[target] = BackupTarget(target)
+        return self.backup_targets[target]
+
+    def on_backup_target_changed(self):
+        target = self.backup_target_entry.get().strip()
+        if target != self.settings['backup_target']:
+            self.settings_store.set('backup_target', target)
+            self.load_backups()
+
+    def browse_backup_target(self):
+        path = filedialog.askdirectory(title="Select Backup Target")
+        if path:
+            self.backup_target_entry.delete(0, tk.END)
+            self.backup_target_entry.insert(0, path)
+            self.on_backup_target_changed()
+
+    def load_backups(self):
+        target = self.backup_target_entry.get().strip()
+        if not target:
+            return
+        backups = self.backups_for(target)
+        
+        def show(rows):
+            self.backup_view.set_rows(rows)
+        
+        def task():
+            rows = []
+            try:
+                for name in backups.snapshots():
+                    stats = backups.load(name)['stats']
+                    rows.append((name, (name, stats['files'], stats['changed'],
+                                        f"{stats['total_bytes'] / 1048576:.1f}",
+                                        f"{stats['written_bytes'] / 1048576:.1f}", stats['seconds'])))
+            except Exception as e:
+                self.log(f"Error reading backups: {str(e)}")
+            self.root.after(0, lambda: show(rows))
+        
+        threading.Thread(target=task, daemon=True).start()
+
+    def run_backup_task(self, status, work):
+        self.backup_status['text'] = status
+        
+        def task():
+            try:
+                message = work()
+            except Exception as e:
+                message = f"Backup error: {str(e)}"
+            self.log(message)
+            self.root.after(0, lambda: self.backup_status.configure(text=message))
+            self.root.after(0, self.load_backups)
+        
+        threading.Thread(target=task, daemon=True).start()
+
+    def snapshot_backup(self):
+        backups = self.backup_target()
+        if not backups:
+            return
+        
+        def work():
+            stats = backups.snapshot(self.minecraft_dir)
+            return (f"{stats['name']}: {stats['changed']} of {stats['files']} files changed, "
+                    f"{stats['written_bytes'] / 1048576:.1f} MiB written in {stats['seconds']:.1f} s "
+                    f"({throughput(stats['scanned_bytes'], stats['seconds']):.0f} MiB/s scanned)")
+        
+        self.run_backup_task("Taking snapshot...", work)
+
+    def restore_backup(self):
+        backups = self.backup_target()
+        if not backups:
+            return
+        selection = self.backup_view.selection()
+        if not selection:
+            messagebox.showwarning("No Selection", "Please select a snapshot to restore")
+            return
+        name = selection[0]
+        running = [i for i in self.supervisor.list() if i.running]
+        if not messagebox.askyesno(
+                "Restore", f"Overwrite worlds and settings with snapshot {name}?\n"
+                "Worlds and files that are not in the snapshot will be deleted." +
+                (f"\n{len(running)} game instance(s) are still running." if running else "")):
+            return
+        
+        def work():
+            stats = backups.restore(name, self.minecraft_dir)
+            return (f"Restored {name}: {stats['files']} files, {stats['bytes'] / 1048576:.1f} MiB in "
+                    f"{stats['seconds']:.1f} s ({throughput(stats['bytes'], stats['seconds']):.0f} MiB/s), "
+                    f"{stats['removed']} removed")
+        
+        self.run_backup_task(f"Restoring {name}...", work)
+
+    def prune_backups(self):
+        backups = self.backup_target()
+        if not backups:
+            return
+        count = len(backups.snapshots())
+        if count <= KEEP_SNAPSHOTS:
+            self.backup_status['text'] = f"{count} snapshots, nothing to prune"
+            return
+        if not messagebox.askyesno(
+                "Prune", f"Delete the {count - KEEP_SNAPSHOTS} oldest snapshots and keep the newest "
+                f"{KEEP_SNAPSHOTS}? This cannot be undone."):
+            return
+        
+        def work():
+            removed, freed = backups.prune()
+            return f"Pruned {removed} chunks, {freed / 1048576:.1f} MiB freed"
+        
+        self.run_backup_task("Pruning...", work)
 
     def load_versions(self):
         try:
-            versions = minecraft_launcher_lib.utils.get_installed_versions(self.versions_dir)
+            versions = self.versions_index.refresh()
             self.version_combo['values'] = [v['id'] for v in versions]
-            self.ver_list.delete(*self.ver_list.get_children())
-            for version in versions:
-                self.ver_list.insert('', 'end', values=(version['id'], version['type']))
+            self.show_versions()
             if versions:
                 self.version_combo.current(0)
+                self.on_version_selected()
         except Exception as e:
             self.log(f"Error loading versions: {str(e)}")
 
+    def show_versions(self):
+        if self.ver_view:
+            self.ver_view.set_rows((v['id'], (v['id'], v['type'])) for v in self.versions_index.versions())
+
     def refresh_accounts_list(self):
         self.account_combo['values'] = [acc['username'] for acc in self.accounts]
-        self.acc_list.delete(*self.acc_list.get_children())
-        for account in self.accounts:
-            self.acc_list.insert('', 'end', values=(account['username'], account['type']))
+        self.show_accounts()
         if self.accounts:
             self.account_combo.current(0)
 
+    def show_accounts(self):
+        if self.acc_view:
+            self.acc_view.set_rows((acc['id'], (acc['username'], acc['type'])) for acc in self.accounts)
+
     def add_offline_account(self):
         dialog = tk.Toplevel()
         dialog.title("Add Offline Account")
@@ -201,13 +736,12 @@ class CatClient:
             username = username_entry.get()
             if username:
                 acc_id = str(uuid.uuid4())
-                self.accounts.append({
+                self.accounts_store.append(None, {
                     'id': acc_id,
                     'username': username,
                     'type': 'offline',
                     'skin': None
                 })
-                self.save_data()
                 self.refresh_accounts_list()
                 dialog.destroy()
         
@@ -216,8 +750,7 @@ class CatClient:
     def remove_account(self):
         selected = self.account_combo.current()
         if selected != -1 and selected < len(self.accounts):
-            del self.accounts[selected]
-            self.save_data()
+            self.accounts_store.delete(None, selected)
             self.refresh_accounts_list()
         else:
             messagebox.showwarning("No Selection", "Please select an account to remove")
@@ -225,33 +758,97 @@ class CatClient:
     def install_version(self):
         version_type = self.ver_type_combo.get()
         try:
-            manifest = minecraft_launcher_lib.utils.get_version_list()
-            versions = [v for v in manifest if v['type'] == version_type]
-            
             def install(v_id):
+                progress = {'file': '', 'done': 0, 'total': 0, 'running': True}
+                
+                def on_progress(item, item_done, item_total, done, total):
+                    progress.update(file=os.path.basename(item.path), done=done, total=total)
+                
+                def poll():
+                    total = progress['total'] or 1
+                    self.install_progress['value'] = min(progress['done'] / total, 1)
+                    self.install_status['text'] = (
+                        f"{v_id}: {progress['done'] / 1048576:.1f}/{progress['total'] / 1048576:.1f} MiB "
+                        f"{progress['file']}")
+                    if progress['running']:
+                        self.root.after(100, poll)
+                
                 def task():
-                    self.log(f"Installing {v_id}...")
-                    minecraft_launcher_lib.install.install_minecraft_version(v_id, self.versions_dir)
-                    self.log(f"Installed {v_id}")
-                    self.load_versions()
-                threading.Thread(target=task).start()
+                    try:
+                        self.log(f"Installing {v_id}...")
+                        installer = VersionInstaller(self.minecraft_dir, progress=on_progress, log=self.log,
+                                                     store=self.store, manifest_cache=self.manifest_cache)
+                        installer.install(v_id)
+                        self.log(f"Installed {v_id}")
+                        self.root.after(0, self.load_versions)
+                    except Exception as e:
+                        self.log(f"Error installing {v_id}: {str(e)}")
+                    finally:
+                        progress['running'] = False
+                
+                poll()
+                threading.Thread(target=task, daemon=True).start()
             
             install_window = tk.Toplevel()
             install_window.title("Install Version")
             
-            listbox = tk.Listbox(install_window)
-            listbox.pack(fill=tk.BOTH, expand=True)
-            scrollbar = ttk.Scrollbar(install_window)
+            # Search and filters
+            filter_frame = ttk.Frame(install_window)
+            filter_frame.pack(fill=tk.X, padx=5, pady=5)
+            ttk.Label(filter_frame, text="Search:").pack(side=tk.LEFT)
+            search_entry = ttk.Entry(filter_frame)
+            search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+            type_combo = ttk.Combobox(filter_frame, state='readonly', width=10,
+                                      values=['all', 'release', 'snapshot', 'old_beta', 'old_alpha'])
+            type_combo.set(version_type or 'all')
+            type_combo.pack(side=tk.LEFT)
+            ttk.Label(filter_frame, text="Since:").pack(side=tk.LEFT, padx=(5, 0))
+            since_entry = ttk.Entry(filter_frame, width=10)
+            since_entry.pack(side=tk.LEFT, padx=5)
+            
+            list_frame = ttk.Frame(install_window)
+            list_frame.pack(fill=tk.BOTH, expand=True)
+            listbox = tk.Listbox(list_frame)
+            scrollbar = ttk.Scrollbar(list_frame)
             scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
             listbox.config(yscrollcommand=scrollbar.set)
             scrollbar.config(command=listbox.yview)
+            status = ttk.Label(install_window, text="")
+            status.pack(fill=tk.X, padx=5)
+            shown = []
+            
+            def fill_list(*_):
+                if not listbox.winfo_exists():
+                    return
+                start = time.perf_counter()
+                index = self.manifest_cache.search_index()
+                kind = type_combo.get()
+                results = index.search(search_entry.get(), None if kind == 'all' else kind,
+                                       since=since_entry.get().strip() or None)
+                elapsed = time.perf_counter() - start
+                listbox.delete(0, tk.END)
+                shown[:] = [v['id'] for v in results]
+                listbox.insert(tk.END, *[f"{v['id']}  ({v['type']}, {v.get('releaseTime', '')[:10]})"
+                                         for v in results])
+                if not index.versions and self.manifest_cache.manifest is None:
+                    status['text'] = "Loading version list..."
+                else:
+                    status['text'] = (f"{len(results)} of {len(index.versions)} versions "
+                                      f"({elapsed * 1000:.1f} ms)")
+            
+            search_entry.bind('<KeyRelease>', fill_list)
+            since_entry.bind('<KeyRelease>', fill_list)
+            type_combo.bind('<<ComboboxSelected>>', fill_list)
+            search_entry.focus_set()
             
-            for v in versions[:50]:
-                listbox.insert(tk.END, v['id'])
+            # Served from the on-disk cache; a stale or missing cache is refreshed in the background
+            fill_list()
+            self.manifest_cache.refresh_async(lambda manifest, error: self.root.after(0, fill_list))
             
             def on_install():
                 if listbox.curselection():
-                    install(listbox.get(listbox.curselection()))
+                    install(shown[listbox.curselection()[0]])
                     install_window.destroy()
                 else:
                     messagebox.showwarning("No Selection", "Please select a version to install")
@@ -260,6 +857,25 @@ class CatClient:
         except Exception as e:
             self.log(f"Error installing version: {str(e)}")
 
+    def on_limit_changed(self):
+        try:
+            limit = max(0, int(self.limit_spin.get()))
+        except ValueError:
+            return
+        self.settings_store.set('download_limit_kib', limit)
+        apply_network_settings(self.settings)
+
+    def clean_store(self):
+        def task():
+            try:
+                for d in self.shared_dirs:
+                    if os.path.isdir(d):
+                        self.store.adopt_tree(d, log=self.log)
+                self.store.gc([d for d in self.shared_dirs if os.path.isdir(d)], log=self.log)
+            except Exception as e:
+                self.log(f"Store error: {str(e)}")
+        threading.Thread(target=task, daemon=True).start()
+
     def add_server(self):
         dialog = tk.Toplevel()
         dialog.title("Add Server")
@@ -276,26 +892,51 @@ class CatClient:
             name = name_entry.get()
             address = address_entry.get()
             if name and address:
-                self.settings['server_list'].append({'name': name, 'address': address})
-                self.save_data()
+                self.settings_store.append('server_list', {'name': name, 'address': address})
                 self.load_server_list()
                 dialog.destroy()
         
         ttk.Button(dialog, text="Save", command=save_server).grid(row=2, columnspan=2)
 
     def remove_server(self):
-        selected = self.srv_list.selection()
+        selected = self.srv_view.selection()
         if selected:
-            index = int(selected[0].split('I')[-1]) - 1
-            del self.settings['server_list'][index]
-            self.save_data()
+            self.settings_store.delete('server_list', self.srv_view.index(selected[0]))
             self.load_server_list()
 
     def load_server_list(self):
         self.server_combo['values'] = [s['name'] for s in self.settings['server_list']]
-        self.srv_list.delete(*self.srv_list.get_children())
+        self.show_servers()
+        self.ping_servers()
+
+    def show_servers(self, results=None):
+        if not self.srv_view:
+            return
+        rows = []
+        seen = set()
         for i, server in enumerate(self.settings['server_list']):
-            self.srv_list.insert('', 'end', iid=f'I{i+1}', values=(server['name'], server['address']))
+            # Keyed by address so ping updates and removals only touch their own row
+            iid = server['address'] if server['address'] not in seen else f"{server['address']}#{i}"
+            seen.add(iid)
+            result = (results or {}).get(server['address']) or self.pinger.cached(server['address'])
+            rows.append((iid, (server['name'], server['address']) + self.ping_columns(result)))
+        self.srv_view.set_rows(rows)
+
+    def ping_columns(self, result):
+        if result is None:
+            return ('...', '', '', '')
+        if not result['online']:
+            return ('offline', '', '', result['error'] or '')
+        return ('online', f"{result['latency_ms']:.0f} ms",
+                f"{result['players_online']}/{result['players_max']}", result['motd'])
+
+    def ping_servers(self, force=False):
+        addresses = [s['address'] for s in self.settings['server_list']]
+        if not addresses:
+            return
+        
+        self.pinger.ping_async(addresses, lambda results: self.root.after(0, lambda: self.show_servers(results)),
+                               force)
 
     def start_launch(self):
         if not self.version_combo.get():
@@ -304,22 +945,28 @@ class CatClient:
         if not self.accounts:
             messagebox.showwarning("No Account", "Please add an account first")
             return
-        threading.Thread(target=self.launch_game).start()
+        threading.Thread(target=self.launch_game, daemon=True).start()
 
     def launch_game(self):
         try:
             self.launch_btn['state'] = tk.DISABLED
             version = self.version_combo.get()
+            timer = LaunchTimer(version)
+            self.settings_store.set('instance_cpus', self.instance_cpus)
+            self.settings_store.set('instance_nice', self.instance_nice)
             account = self.accounts[self.account_combo.current()]
-            ram = f"{int(self.ram_scale.get())}G"
+            ram = clamp_heap_gb(self.ram_scale.get(), self.hardware)
             
             options = {
                 'username': account['username'],
                 'uuid': account['id'],
                 'launcherVersion': 'CatClient-1.2',
-                'gameDirectory': self.minecraft_dir,
-                'jvmArguments': self.get_jvm_arguments(ram)
+                'gameDirectory': self.minecraft_dir
             }
+            runtime = self.java.select(self.minecraft_dir, version, self.settings['java_path'])
+            if runtime:
+                self.log(f"Using Java {runtime['version'] or '?'} {runtime['vendor']} at {runtime['path']}")
+            options['jvmArguments'] = self.get_jvm_arguments(ram, version, runtime, timer.context)
             
             # Add server connection if selected
             if self.server_combo.get():
@@ -328,47 +975,227 @@ class CatClient:
                 options['server'] = server_address
                 options['port'] = 25565
             
-            command = minecraft_launcher_lib.command.get_minecraft_command(
-                version, self.minecraft_dir, options)
+            timer.context.update(profile=self.settings['jvm_profiles'].get(version, DEFAULT_PROFILE),
+                                 jvm_args=options['jvmArguments'], java=runtime and runtime['version'])
             
-            if self.settings['java_path']:
-                command[0] = self.settings['java_path']
+            if self.settings['verify_files']:
+                self.verify_version(version)
+                timer.mark('verified')
             
-            self.log("Launching with command:\n" + ' '.join(command))
+            command, info = self.launch_cache.get_command(
+                version, options,
+                lambda: build_minecraft_command(version, self.minecraft_dir, options))
+            timer.mark('command_built')
+            timer.context.update(command_cached=info['cached'], command_seconds=info['seconds'])
+            if info['cached']:
+                self.log(f"Launch command from cache in {info['seconds'] * 1000:.1f} ms "
+                         f"(building it took {info['build_seconds'] * 1000:.0f} ms)")
+            else:
+                self.log(f"Built launch command in {info['build_seconds'] * 1000:.0f} ms")
             
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True
-            )
+            if runtime:
+                command[0] = runtime['path']
             
-            for line in iter(process.stdout.readline, ''):
-                self.log(line.strip())
-                
-            self.log(f"Exit code: {process.poll()}")
+            if self.settings['prewarm_files']:
+                # Usually already done while the version was being picked
+                stats = self.warmer.warm_once(version, lambda: command_files(command))
+                timer.mark('warmed')
+                timer.context.update(warmed_bytes=stats['bytes'], warm_seconds=round(stats['seconds'], 3))
+                self.log(f"Warmed {stats['files']} files ({stats['bytes'] / 1048576:.1f} MiB) in "
+                         f"{stats['seconds'] * 1000:.0f} ms" + (" before launch" if stats['reused'] else ""))
+            
+            self.log("Launching with command:\n" + ' '.join(command))
+            
+            name = f"{version} - {account['username']}"
+            instance = self.supervisor.launch(
+                name, command,
+                affinity=parse_cpu_set(self.instance_cpus),
+                nice=self.instance_nice,
+                on_start=lambda inst: self.on_instance_start(inst, version, timer),
+                on_line=self.on_instance_line,
+                on_exit=self.on_instance_exit)
+            timer.mark('spawned')
+            self.log(f"Started instance #{instance.id} ({name}), pid {instance.pid}")
             
         except Exception as e:
             self.log(f"Launch error: {str(e)}")
         finally:
             self.launch_btn['state'] = tk.NORMAL
 
-    def get_jvm_arguments(self, ram):
-        args = [f'-Xmx{ram}', f'-Xms{ram}']
-        if self.settings['optimized_args']:
-            args += [
-                '-XX:+UseG1GC',
-                '-XX:MaxGCPauseMillis=20',
-                '-XX:G1HeapRegionSize=32M',
-                '-XX:-OmitStackTraceInFastThrow',
-                '-XX:+AlwaysPreTouch',
-                '-XX:ParallelGCThreads=4'
-            ]
+    def on_instance_start(self, instance, version, timer):
+        # Called from whichever thread (re)starts the process, once it is spawned
+        # and before its output is read
+        if instance.restarts:
+            timer = LaunchTimer(version, **timer.context)
+        instance.extra['timer'] = timer
+        instance.extra['session'] = self.log_archive.start_session(version)
+        if 'sink' not in instance.extra:
+            instance.extra['sink'] = ConsoleSink(self.root, None)
+            self.root.after(0, lambda: self.add_instance_pane(instance))
+
+    def on_instance_line(self, instance, line):
+        instance.extra['timer'].feed(line)
+        self.cds.check_line(instance.extra['timer'].version, line)
+        instance.extra['session'].write(line)
+        instance.extra['sink'].write(line)
+
+    def on_instance_exit(self, instance, exit_code):
+        instance.extra['session'].close()
+        self.cds.finished(instance.extra['timer'].version)
+        instance.extra['timer'].context['peak_rss'] = self.monitor.peak_rss(instance.id)
+        self.metrics.append(instance.extra['timer'].finish(exit_code))
+        instance.extra['sink'].write(f"Exit code: {exit_code}")
+        self.log(f"Instance #{instance.id} exited with code {exit_code} after {instance.uptime:.0f} s")
+        self.root.after(0, self.show_metrics)
+
+    def verify_version(self, version):
+        broken, stats = self.verifier.verify_version(version)
+        self.log(f"Verified {stats['files']} files ({stats['hashed']} hashed) "
+                 f"in {stats['seconds'] * 1000:.0f} ms")
+        if broken:
+            self.log(f"Re-downloading {len(broken)} missing or corrupt files...")
+            installer = VersionInstaller(self.minecraft_dir, log=self.log, store=self.store,
+                                         manifest_cache=self.manifest_cache)
+            self.verifier.repair(broken, installer, store=self.store)
+
+    def on_version_selected(self):
+        profile = self.settings['jvm_profiles'].get(self.version_combo.get(), DEFAULT_PROFILE)
+        self.profile_combo.set(profile)
+        self.show_metrics()
+        if self.settings['prewarm_files']:
+            self.prewarm(self.version_combo.get())
+
+    def prewarm(self, version):
+        # Start pulling the version's jars into the page cache while the
+        # account and server are still being picked
+        def get_paths():
+            command = self.launch_cache.last_command(version)
+            return command_files(command) if command else version_files(self.minecraft_dir, version)
+        
+        self.warmer.warm_async(version, get_paths)
+
+    def show_metrics(self):
+        self.metrics_label['text'] = self.metrics.summary_text(self.version_combo.get())
+
+    def monitored_instance(self):
+        index = self.monitor_combo.current()
+        if index < 0 or index >= len(self.monitor_ids):
+            return None
+        return self.supervisor.get(self.monitor_ids[index])
+
+    def draw_monitor_chart(self):
+        instances = self.supervisor.list()
+        ids = [instance.id for instance in instances]
+        if ids != self.monitor_ids:
+            selected = self.monitored_instance()
+            self.monitor_ids = ids
+            self.monitor_combo['values'] = [f"#{i.id} {i.name}" for i in instances]
+            if selected and selected.id in ids:
+                self.monitor_combo.current(ids.index(selected.id))
+            elif ids:
+                # Follow the newest instance unless another one was picked
+                self.monitor_combo.current(len(ids) - 1)
+            else:
+                self.monitor_combo.set('')
+        
+        instance = self.monitored_instance()
+        samples = self.monitor.samples(instance.id) if instance else []
+        chart = self.monitor_chart
+        width, height = max(chart.winfo_width(), 2), max(chart.winfo_height(), 2)
+        if len(samples) < 2:
+            for item in (self.chart_heap, self.chart_rss, self.chart_cpu):
+                chart.coords(item, 0, 0, 0, 0)
+            self.monitor_label['text'] = "" if self.monitor.available else "Not available on this system"
+        else:
+            heap = heap_limit(instance.command)
+            peak = self.monitor.peak_rss(instance.id)
+            top = max(heap or 0, peak) * 1.1
+            cpu_top = max(100.0, max(s['cpu'] for s in samples))
+            step = width / (self.monitor.history - 1)
+            offset = width - step * (len(samples) - 1)
+            rss_points, cpu_points = [], []
+            for n, sample in enumerate(samples):
+                x = offset + n * step
+                rss_points += [x, height - sample['rss'] / top * height]
+                cpu_points += [x, height - sample['cpu'] / cpu_top * height]
+            chart.coords(self.chart_rss, *rss_points)
+            chart.coords(self.chart_cpu, *cpu_points)
+            if heap:
+                chart.coords(self.chart_heap, 0, height - heap / top * height, width, height - heap / top * height)
+            last = samples[-1]
+            self.monitor_label['text'] = (
+                f"RSS {last['rss'] / 1073741824:.2f} GiB (peak {peak / 1073741824:.2f}"
+                + (f" of -Xmx {heap / 1073741824:.1f}" if heap else "") + f"), CPU {last['cpu']:.0f}%, "
+                f"{last['threads']} threads, I/O {last['read_rate'] / 1048576:.1f}/{last['write_rate'] / 1048576:.1f} MiB/s")
+        interval = self.monitor.interval
+        self.root.after(int(max(interval, 1.0) * 1000), self.draw_monitor_chart)
+
+    def on_monitor_interval_changed(self):
+        try:
+            interval = max(0.0, float(self.monitor_spin.get()))
+        except ValueError:
+            return
+        self.settings_store.set('monitor_interval', interval)
+        self.monitor.set_interval(interval)
+
+    def export_monitor(self):
+        instance = self.monitored_instance()
+        if not instance:
+            messagebox.showwarning("No Instance", "Launch or select an instance to export")
+            return
+        path = filedialog.asksaveasfilename(title="Export Samples", defaultextension='.csv',
+                                            initialfile=f"instance-{instance.id}.csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON", "*.json")])
+        if path:
+            count = self.monitor.export(instance, path)
+            self.log(f"Exported {count} samples of instance #{instance.id} to {path}")
+
+    def on_profile_selected(self):
+        version = self.version_combo.get()
+        if version:
+            profiles = dict(self.settings['jvm_profiles'])
+            profiles[version] = self.profile_combo.get()
+            self.settings_store.set('jvm_profiles', profiles)
+
+    def get_jvm_arguments(self, ram, version=None, runtime=None, context=None):
+        args = jvm_arguments(self.settings, ram, version, runtime and runtime['major'])
+        if self.settings['class_data_sharing'] and version and runtime:
+            # The archive for this version/mods/JVM, or the flag that creates it at exit
+            cds_args, mode = self.cds.arguments(version, runtime)
+            args += cds_args
+            if context is not None:
+                context['cds'] = mode
         return args
 
+    def discover_java(self):
+        def show(runtimes):
+            self.java_paths = [''] + [r['path'] for r in runtimes]
+            self.java_combo['values'] = ["Automatic"] + [
+                f"Java {r['version']} ({r['vendor'] or 'unknown vendor'}, {r['arch'] or '?'}) - {r['path']}"
+                for r in runtimes]
+            current = self.settings['java_path']
+            if current and current not in self.java_paths:
+                self.java_paths.append(current)
+                self.java_combo['values'] = tuple(self.java_combo['values']) + (current,)
+            self.java_combo.current(self.java_paths.index(current))
+        
+        def task():
+            try:
+                start = time.perf_counter()
+                runtimes = self.java.discover()
+                self.log(f"Found {len(runtimes)} Java runtimes ({self.java.probed} probed) "
+                         f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+                self.root.after(0, lambda: show(runtimes))
+            except Exception as e:
+                self.log(f"Error discovering Java runtimes: {str(e)}")
+        
+        threading.Thread(target=task, daemon=True).start()
+
+    def on_java_selected(self):
+        self.settings_store.set('java_path', self.java_paths[self.java_combo.current()])
+
     def log(self, message):
-        self.console.insert(tk.END, message + '\n')
-        self.console.see(tk.END)
+        self.console_sink.write(message)
 
 if __name__ == "__main__":
     root = tk.Tk()
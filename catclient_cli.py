@@ -0,0 +1,353 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Headless entry point for CatClient. Shares settings.json/accounts.json with
+# the GUI, never imports tkinter, and imports each subsystem only inside the
+# command that needs it.
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def open_launcher():
+    from catclient_settings import launcher_dir, open_settings, open_accounts
+    minecraft_dir = launcher_dir()
+    os.makedirs(minecraft_dir, exist_ok=True)
+    return minecraft_dir, open_settings(minecraft_dir), open_accounts(minecraft_dir)
+
+
+def pick_account(accounts, settings, name):
+    if not accounts:
+        raise SystemExit("No accounts configured; add one in the GUI first")
+    wanted = name or settings['current_account']
+    for account in accounts:
+        if wanted and wanted in (account['username'], account['id']):
+            return account
+    if name:
+        raise SystemExit(f"Unknown account: {name}")
+    return accounts[0]
+
+
+def pick_server(settings, name):
+    if not name:
+        return None
+    for server in settings['server_list']:
+        if name in (server['name'], server['address']):
+            return server['address']
+    return name
+
+
+def cmd_launch(args):
+    from launcher_cds import ClassDataSharing
+    from launcher_java import JavaRegistry
+    from launcher_jvm import DEFAULT_PROFILE, detect_hardware, clamp_heap_gb, jvm_arguments
+    from launcher_launchcache import LaunchCommandCache, build_minecraft_command
+    from launcher_metrics import LaunchTimer, LaunchMetrics
+    from launcher_logs import GameLogArchive
+    from launcher_supervisor import GameInstance, parse_cpu_set, clamp_nice
+
+    minecraft_dir, settings_store, accounts_store = open_launcher()
+    settings = settings_store.data
+    version = args.version
+    timer = LaunchTimer(version)
+    account = pick_account(accounts_store.data, settings, args.account)
+    ram = args.ram or int(settings['ram_allocation'].rstrip('Gg') or 4)
+    ram = clamp_heap_gb(ram, detect_hardware())
+    runtime = JavaRegistry(minecraft_dir, java_dirs(minecraft_dir)).select(minecraft_dir, version,
+                                                                          settings['java_path'])
+    if runtime:
+        log(f"Using Java {runtime['version'] or '?'} {runtime['vendor']} at {runtime['path']}")
+
+    options = {
+        'username': account['username'],
+        'uuid': account['id'],
+        'launcherVersion': 'CatClient-1.2',
+        'gameDirectory': minecraft_dir,
+        'jvmArguments': jvm_arguments(settings, ram, version, runtime and runtime['major'])
+    }
+    server = pick_server(settings, args.server)
+    if server:
+        options['server'] = server
+        options['port'] = 25565
+    cds = ClassDataSharing(minecraft_dir)
+    if settings['class_data_sharing'] and runtime:
+        cds_args, timer.context['cds'] = cds.arguments(version, runtime)
+        options['jvmArguments'] += cds_args
+    timer.context.update(profile=settings['jvm_profiles'].get(version, DEFAULT_PROFILE),
+                         jvm_args=options['jvmArguments'], java=runtime and runtime['version'])
+
+    if settings['verify_files'] and not args.no_verify:
+        from launcher_verify import IntegrityVerifier
+        broken, stats = IntegrityVerifier(minecraft_dir).verify_version(version)
+        log(f"Verified {stats['files']} files ({stats['hashed']} hashed) in {stats['seconds'] * 1000:.0f} ms")
+        if broken:
+            log(f"Re-downloading {len(broken)} missing or corrupt files...")
+            installer, store = make_installer(minecraft_dir)
+            IntegrityVerifier(minecraft_dir).repair(broken, installer, store=store)
+        timer.mark('verified')
+
+    command, info = LaunchCommandCache(minecraft_dir).get_command(
+        version, options, lambda: build_minecraft_command(version, minecraft_dir, options))
+    timer.mark('command_built')
+    timer.context.update(command_cached=info['cached'], command_seconds=info['seconds'])
+    if runtime:
+        command[0] = runtime['path']
+    if settings['prewarm_files'] and not args.dry_run:
+        from launcher_warm import PageCacheWarmer, command_files
+        stats = PageCacheWarmer().warm(command_files(command))
+        timer.mark('warmed')
+        timer.context.update(warmed_bytes=stats['bytes'], warm_seconds=round(stats['seconds'], 3))
+        log(f"Warmed {stats['files']} files ({stats['bytes'] / 1048576:.1f} MiB) in {stats['seconds'] * 1000:.0f} ms")
+    if args.dry_run:
+        print(' '.join(command))
+        return 0
+
+    archive = GameLogArchive(os.path.join(minecraft_dir, 'launcher_logs'))
+    session = archive.start_session(version)
+
+    def on_line(instance, line):
+        timer.feed(line)
+        cds.check_line(version, line)
+        session.write(line)
+        print(line, flush=True)
+
+    nice = clamp_nice(settings['instance_nice'])
+    if nice != int(settings['instance_nice']):
+        log(f"Nice {settings['instance_nice']} needs elevated privileges; using {nice}")
+    instance = GameInstance(1, version, command, affinity=parse_cpu_set(settings['instance_cpus']),
+                            nice=nice, on_line=on_line)
+    try:
+        instance.start()
+    except (OSError, subprocess.SubprocessError) as e:
+        session.close()
+        log(f"Could not start {command[0]}: {e}")
+        return 1
+    timer.mark('spawned')
+    monitor = None
+    if args.monitor:
+        from launcher_monitor import ResourceMonitor
+        monitor = ResourceMonitor(lambda: [instance], float(settings['monitor_interval']) or 1.0)
+        monitor.start()
+    try:
+        instance.wait()
+    except KeyboardInterrupt:
+        instance.kill()
+        instance.wait()
+    finally:
+        session.close()
+    cds.finished(version)
+    if monitor:
+        timer.context['peak_rss'] = monitor.peak_rss(instance.id)
+        count = monitor.export(instance, args.monitor)
+        log(f"Wrote {count} resource samples to {args.monitor}")
+    LaunchMetrics(minecraft_dir).append(timer.finish(instance.exit_code))
+    log(f"Exit code: {instance.exit_code}")
+    return instance.exit_code or 0
+
+
+def java_dirs(minecraft_dir):
+    from catclient_settings import app_data_dir
+    return [minecraft_dir, os.path.join(app_data_dir(), '.minecraft')]
+
+
+def make_installer(minecraft_dir, progress=None, limit_kib=None):
+    from catclient_settings import open_settings, apply_network_settings
+    from launcher_install import VersionInstaller
+    from launcher_manifest import ManifestCache
+    from launcher_store import ContentStore
+    settings = dict(open_settings(minecraft_dir).data)
+    if limit_kib is not None:
+        settings['download_limit_kib'] = limit_kib
+    apply_network_settings(settings)
+    store = ContentStore()
+    installer = VersionInstaller(minecraft_dir, progress=progress, log=log, store=store,
+                                 manifest_cache=ManifestCache(minecraft_dir, log=log))
+    return installer, store
+
+
+def cmd_install(args):
+    import time
+    minecraft_dir, _, _ = open_launcher()
+    last = [0.0]
+
+    def progress(item, item_done, item_total, done, total):
+        now = time.monotonic()
+        if now - last[0] >= 0.5:
+            last[0] = now
+            log(f"  {done / 1048576:.1f}/{total / 1048576:.1f} MiB")
+
+    installer, _ = make_installer(minecraft_dir, progress, args.limit)
+    for version in args.versions:
+        installer.install(version)
+        log(f"Installed {version}")
+    return 0
+
+
+def cmd_list_versions(args):
+    minecraft_dir, _, _ = open_launcher()
+    if args.available:
+        from launcher_manifest import ManifestCache
+        cache = ManifestCache(minecraft_dir, log=log)
+        if args.refresh or cache.load() is None:
+            cache.refresh()
+        versions = cache.versions()
+    else:
+        from launcher_index import InstalledVersionsIndex
+        versions = InstalledVersionsIndex(minecraft_dir).refresh()
+    for version in versions:
+        if args.type and version['type'] != args.type:
+            continue
+        print(f"{version['id']}\t{version['type']}")
+    return 0
+
+
+def cmd_ping(args):
+    from launcher_ping import ServerPinger
+    _, settings_store, _ = open_launcher()
+    servers = settings_store.data['server_list']
+    names = {s['address']: s['name'] for s in servers}
+    addresses = args.addresses or [s['address'] for s in servers]
+    addresses = [next((s['address'] for s in servers if s['name'] == a), a) for a in addresses]
+    results = ServerPinger(timeout=args.timeout).ping(addresses, force=True)
+    for address in addresses:
+        result = results[address]
+        name = names.get(address, address)
+        if result['online']:
+            print(f"{name}\t{address}\tonline\t{result['latency_ms']:.0f} ms\t"
+                  f"{result['players_online']}/{result['players_max']}\t{result['motd']}")
+        else:
+            print(f"{name}\t{address}\toffline\t{result['error']}")
+    return 0 if all(results[a]['online'] for a in addresses) else 1
+
+
+def cmd_java(args):
+    from launcher_java import JavaRegistry
+    minecraft_dir, _, _ = open_launcher()
+    registry = JavaRegistry(minecraft_dir, java_dirs(minecraft_dir))
+    for runtime in registry.discover():
+        print(f"{runtime['major']}\t{runtime['version']}\t{runtime['vendor']}\t{runtime['arch']}\t{runtime['path']}")
+    log(f"{registry.probed} probed, the rest from cache")
+    return 0
+
+
+def open_backups(settings, target):
+    from launcher_backup import BackupTarget
+    target = target or settings.data['backup_target']
+    if not target:
+        log("No backup target: pass --target or set backup_target")
+        return None
+    return BackupTarget(target)
+
+
+def cmd_backup(args):
+    minecraft_dir, settings_store, _ = open_launcher()
+    backups = open_backups(settings_store, args.target)
+    if not backups:
+        return 2
+    backups.snapshot(minecraft_dir, log=log)
+    if args.keep:
+        backups.prune(args.keep, log=log)
+    return 0
+
+
+def cmd_restore(args):
+    minecraft_dir, settings_store, _ = open_launcher()
+    backups = open_backups(settings_store, args.target)
+    if not backups:
+        return 2
+    snapshots = backups.snapshots()
+    if not snapshots:
+        log("No snapshots in the target")
+        return 1
+    if not args.snapshot:
+        for name in snapshots:
+            stats = backups.load(name)['stats']
+            print(f"{name}\t{stats['files']} files\t{stats['total_bytes'] / 1048576:.1f} MiB")
+        return 0
+    name = snapshots[0] if args.snapshot == 'latest' else args.snapshot
+    if name not in snapshots:
+        log(f"Unknown snapshot: {name}")
+        return 1
+    backups.restore(name, minecraft_dir, log=log)
+    return 0
+
+
+def cmd_check_updates(args):
+    from catclient_settings import apply_network_settings
+    from launcher_updates import ModUpdateChecker, UPDATE_INDEX_URL
+    minecraft_dir, settings_store, _ = open_launcher()
+    apply_network_settings(settings_store.data)
+    checker = ModUpdateChecker(minecraft_dir, os.path.join(minecraft_dir, 'mods'),
+                               args.index or settings_store.data['mod_update_index'] or UPDATE_INDEX_URL, log=log)
+    reports = checker.check(game_version=args.game_version, force=args.force)
+    for report in reports:
+        if report['status'] == 'outdated' or args.all:
+            print(f"{report['status']}\t{report['file']}\t{report['current']}\t{report['latest']}\t{report['url']}")
+    log(checker.summary_text())
+    return 1 if checker.stats['errors'] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='catclient', description="CatClient headless launcher")
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    launch = commands.add_parser('launch', help="launch an installed version")
+    launch.add_argument('version')
+    launch.add_argument('--account', help="username or id (default: current account)")
+    launch.add_argument('--server', help="server name from the server list, or an address")
+    launch.add_argument('--ram', type=int, help="heap size in GB")
+    launch.add_argument('--no-verify', action='store_true', help="skip the file integrity check")
+    launch.add_argument('--dry-run', action='store_true', help="print the command instead of running it")
+    launch.add_argument('--monitor', metavar='FILE', help="sample RSS, CPU and I/O and write them to FILE "
+                                                          "(.csv or .json)")
+    launch.set_defaults(func=cmd_launch)
+
+    install = commands.add_parser('install', help="install one or more versions")
+    install.add_argument('versions', nargs='+')
+    install.add_argument('--limit', type=int, help="download cap in KiB/s (default: from settings, 0 = none)")
+    install.set_defaults(func=cmd_install)
+
+    list_versions = commands.add_parser('list-versions', help="list installed or available versions")
+    list_versions.add_argument('--available', action='store_true', help="list the version manifest")
+    list_versions.add_argument('--refresh', action='store_true', help="revalidate the cached manifest")
+    list_versions.add_argument('--type', help="release, snapshot, old_beta or old_alpha")
+    list_versions.set_defaults(func=cmd_list_versions)
+
+    ping = commands.add_parser('ping', help="ping servers from the server list")
+    ping.add_argument('addresses', nargs='*', help="server names or addresses (default: all)")
+    ping.add_argument('--timeout', type=float, default=3.0)
+    ping.set_defaults(func=cmd_ping)
+
+    java = commands.add_parser('java', help="list discovered Java runtimes")
+    java.set_defaults(func=cmd_java)
+
+    backup = commands.add_parser('backup', help="snapshot worlds and settings to the backup target")
+    backup.add_argument('--target', help="target directory (default: backup_target from settings)")
+    backup.add_argument('--keep', type=int, help="prune all but this many snapshots afterwards")
+    backup.set_defaults(func=cmd_backup)
+
+    restore = commands.add_parser('restore', help="list snapshots, or restore one")
+    restore.add_argument('snapshot', nargs='?', help="snapshot name or 'latest' (omit to list)")
+    restore.add_argument('--target', help="target directory (default: backup_target from settings)")
+    restore.set_defaults(func=cmd_restore)
+
+    updates = commands.add_parser('check-updates', help="list mods with newer versions in the update index")
+    updates.add_argument('--game-version', help="only offer updates for this game version")
+    updates.add_argument('--force', action='store_true', help="revalidate every cached answer")
+    updates.add_argument('--all', action='store_true', help="list up-to-date and unknown mods too")
+    updates.add_argument('--index', help="update index base URL (default: from settings)")
+    updates.set_defaults(func=cmd_check_updates)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
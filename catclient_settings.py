@@ -0,0 +1,49 @@
+import os
+
+from launcher_persist import JournaledJSON
+
+DEFAULT_SETTINGS = {
+    'ram_allocation': '4G',
+    'java_path': '',
+    'server_list': [],
+    'current_account': '',
+    'optimized_args': True,
+    'verify_files': True,
+    'jvm_profiles': {},
+    'instance_cpus': '',
+    'instance_nice': 0,
+    # {origin base URL: [mirror base URL, ...]}, ranked by measured throughput
+    'download_mirrors': {},
+    'download_limit_kib': 0,
+    'prewarm_files': True,
+    'class_data_sharing': True,
+    # Directory that receives backup snapshots (a local folder or a mounted share)
+    'backup_target': '',
+    # Modrinth-compatible update index; empty uses the public one
+    'mod_update_index': '',
+    # Seconds between resource samples of running instances; 0 turns sampling off
+    'monitor_interval': 1.0
+}
+
+
+def app_data_dir():
+    # %APPDATA% on Windows; headless Linux/macOS hosts fall back to the home directory
+    return os.getenv('APPDATA') or os.path.expanduser('~')
+
+
+def launcher_dir():
+    return os.path.join(app_data_dir(), '.catclient')
+
+
+def open_settings(minecraft_dir):
+    return JournaledJSON(os.path.join(minecraft_dir, 'settings.json'), DEFAULT_SETTINGS)
+
+
+def open_accounts(minecraft_dir):
+    return JournaledJSON(os.path.join(minecraft_dir, 'accounts.json'), [])
+
+
+def apply_network_settings(settings):
+    from launcher_http import default_pool
+    default_pool().configure(mirrors=settings['download_mirrors'],
+                             max_bytes_per_sec=int(settings['download_limit_kib']) * 1024)
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from launcher_lock import lock_file, unlock_file
+
+# What a snapshot covers, relative to the game directory
+SOURCES = ('saves', 'config', 'options.txt', 'optionsof.txt', 'optionsshaders.txt', 'servers.dat')
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+# Chunk boundaries fall after this two-byte anchor (once MIN_CHUNK has passed),
+# so they move with the content when bytes are inserted or removed. On
+# high-entropy data such as compressed region chunks it occurs about every 64 KiB.
+ANCHOR = re.compile(b'\xa9\x7b')
+# Below this many changed files the process pool costs more than it saves
+POOL_THRESHOLD = 4
+# Already-compressed chunks (region data) are stored raw
+RAW, DEFLATED = b'r', b'z'
+LOCK_FILE = 'lock'
+KEEP_SNAPSHOTS = 10
+
+# One lock per target directory for the whole process; the lock file adds
+# the same exclusion between processes (GUI and CLI) sharing a target
+_target_locks = {}
+_target_locks_guard = threading.Lock()
+
+
+class TargetLock:
+    def __init__(self, target_dir):
+        self.path = os.path.join(target_dir, LOCK_FILE)
+        key = os.path.realpath(target_dir)
+        with _target_locks_guard:
+            self.lock = _target_locks.setdefault(key, threading.Lock())
+        self.file = None
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.file = open(self.path, 'a+b')
+            lock_file(self.file)
+        except Exception:
+            if self.file:
+                self.file.close()
+                self.file = None
+            self.lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            unlock_file(self.file)
+            self.file.close()
+        finally:
+            self.file = None
+            self.lock.release()
+
+
+def chunk_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunk_boundaries(data):
+    boundaries = []
+    search = ANCHOR.search
+    start = 0
+    while start < len(data):
+        end = min(len(data), start + MAX_CHUNK)
+        match = search(data, start + MIN_CHUNK, end)
+        cut = match.end() if match else end
+        boundaries.append(cut)
+        start = cut
+    return boundaries
+
+
+def chunk_path(store, digest):
+    return os.path.join(store, digest[:2], digest)
+
+
+def write_chunk(store, digest, data):
+    path = chunk_path(store, digest)
+    if os.path.exists(path):
+        return 0
+    packed = zlib.compress(data, 1)
+    blob = DEFLATED + packed if len(packed) < len(data) * 0.9 else RAW + data
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique tmp name: several workers may store the same chunk at once
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(blob)
+    os.replace(tmp, path)
+    return len(blob)
+
+
+def read_chunk(store, digest):
+    with open(chunk_path(store, digest), 'rb') as f:
+        blob = f.read()
+    data = zlib.decompress(blob[1:]) if blob[:1] == DEFLATED else blob[1:]
+    if chunk_digest(data) != digest:
+        raise ValueError(f"Chunk {digest} is corrupt")
+    return data
+
+
+def snapshot_file(args):
+    # Worker: split one file into chunks and store the ones the target lacks
+    path, store = args
+    with open(path, 'rb') as f:
+        data = f.read()
+    chunks = []
+    written = 0
+    start = 0
+    for end in chunk_boundaries(data):
+        piece = data[start:end]
+        digest = chunk_digest(piece)
+        written += write_chunk(store, digest, piece)
+        chunks.append(digest)
+        start = end
+    return chunks, len(data), written
+
+
+def restore_file(args):
+    store, chunks, dest, mtime_ns = args
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp = dest + '.restore'
+    size = 0
+    try:
+        with open(tmp, 'wb') as f:
+            for digest in chunks:
+                data = read_chunk(store, digest)
+                f.write(data)
+                size += len(data)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, dest)
+    os.utime(dest, ns=(mtime_ns, mtime_ns))
+    return size
+
+
+def restore_path(dest_dir, rel):
+    # Snapshot files come from a shared directory; never write outside dest_dir
+    root = os.path.realpath(dest_dir)
+    path = os.path.realpath(os.path.join(root, *rel.split('/')))
+    if os.path.isabs(rel) or os.path.commonpath([root, path]) != root or path == root:
+        raise ValueError(f"Snapshot entry {rel!r} points outside {dest_dir}")
+    return path
+
+
+def throughput(size, seconds):
+    return size / 1048576 / max(seconds, 1e-6)
+
+
+class BackupTarget:
+    # Deduplicating snapshots of a game directory in any target directory (a
+    # local folder or a mounted share). Files keep a list of chunk hashes;
+    # chunks live once under chunks/, so a snapshot writes only the chunks
+    # that changed. Files whose size and mtime match the previous snapshot are
+    # not read at all.
+    def __init__(self, target_dir, workers=None):
+        self.target_dir = target_dir
+        self.store = os.path.join(target_dir, 'chunks')
+        self.snapshots_dir = os.path.join(target_dir, 'snapshots')
+        self.workers = workers or os.cpu_count() or 4
+
+    def snapshots(self):
+        try:
+            names = [n[:-5] for n in os.listdir(self.snapshots_dir) if n.endswith('.json')]
+        except FileNotFoundError:
+            return []
+        return sorted(names, reverse=True)
+
+    def load(self, name):
+        with open(os.path.join(self.snapshots_dir, f"{name}.json")) as f:
+            return json.load(f)
+
+    def source_files(self, source_dir):
+        files = {}
+        for source in SOURCES:
+            root = os.path.join(source_dir, source)
+            if os.path.isfile(root):
+                files[source] = root
+                continue
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    # The game's lock file is held open while a world is loaded
+                    if filename == 'session.lock':
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    files[os.path.relpath(path, source_dir).replace(os.sep, '/')] = path
+        return files
+
+    def snapshot(self, source_dir, log=None):
+        log = log or (lambda message: None)
+        with TargetLock(self.target_dir):
+            start = time.perf_counter()
+            os.makedirs(self.snapshots_dir, exist_ok=True)
+            existing = self.snapshots()
+            previous = self.load(existing[0])['files'] if existing else {}
+
+            entries = {}
+            changed = []
+            for rel, path in self.source_files(source_dir).items():
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                old = previous.get(rel)
+                if old and old['size'] == st.st_size and old['mtime_ns'] == st.st_mtime_ns:
+                    entries[rel] = old
+                else:
+                    changed.append((rel, path, st))
+
+            scanned = written = 0
+            jobs = [(path, self.store) for _, path, _ in changed]
+            if len(jobs) >= POOL_THRESHOLD:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    results = list(executor.map(snapshot_file, jobs))
+            else:
+                results = [snapshot_file(job) for job in jobs]
+            for (rel, path, st), (chunks, size, stored) in zip(changed, results):
+                entries[rel] = {'size': size, 'mtime_ns': st.st_mtime_ns, 'chunks': chunks}
+                scanned += size
+                written += stored
+
+            seconds = time.perf_counter() - start
+            total = sum(entry['size'] for entry in entries.values())
+            stats = {
+                'files': len(entries),
+                'changed': len(changed),
+                'total_bytes': total,
+                'scanned_bytes': scanned,
+                'written_bytes': written,
+                'seconds': round(seconds, 3),
+            }
+            name = time.strftime('%Y%m%d-%H%M%S')
+            if name in existing:
+                name += f"-{len(existing):03d}"
+            tmp = os.path.join(self.snapshots_dir, f"{name}.json.tmp")
+            with open(tmp, 'w') as f:
+                json.dump({'created': time.time(), 'source': source_dir, 'stats': stats, 'files': entries}, f)
+            os.replace(tmp, os.path.join(self.snapshots_dir, f"{name}.json"))
+            log(f"Snapshot {name}: {len(changed)} of {len(entries)} files changed, "
+                f"{scanned / 1048576:.1f} MiB scanned at {throughput(scanned, seconds):.0f} MiB/s, "
+                f"{written / 1048576:.1f} MiB written ({throughput(total, seconds):.0f} MiB/s effective)")
+            stats['name'] = name
+            return stats
+
+    def remove_extra(self, dest_dir, files):
+        # Deletes files under the snapshot's roots that the snapshot does not
+        # have, so a world is not left mixing newer region files with old ones
+        removed = 0
+        for rel, path in self.source_files(dest_dir).items():
+            if rel not in files:
+                os.remove(path)
+                removed += 1
+        for source in SOURCES:
+            root = os.path.join(dest_dir, source)
+            for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+                if dirpath != root and not os.listdir(dirpath):
+                    os.rmdir(dirpath)
+        return removed
+
+    def restore(self, name, dest_dir, log=None):
+        # Makes the snapshot's roots (saves, config, options) match the snapshot exactly
+        log = log or (lambda message: None)
+        # Held throughout so a prune cannot remove chunks mid-restore
+        with TargetLock(self.target_dir):
+            start = time.perf_counter()
+            files = self.load(name)['files']
+            jobs = [(self.store, entry['chunks'], restore_path(dest_dir, rel), entry['mtime_ns'])
+                    for rel, entry in files.items()]
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                restored = sum(executor.map(restore_file, jobs))
+            # Only once every file is back, so a failed restore deletes nothing
+            removed = self.remove_extra(dest_dir, files)
+            seconds = time.perf_counter() - start
+        log(f"Restored {name}: {len(jobs)} files, {restored / 1048576:.1f} MiB in {seconds:.1f} s "
+            f"({throughput(restored, seconds):.0f} MiB/s), {removed} files not in the snapshot removed")
+        return {'files': len(jobs), 'bytes': restored, 'removed': removed, 'seconds': round(seconds, 3)}
+
+    def prune(self, keep=KEEP_SNAPSHOTS, log=None):
+        # Drops all but the newest `keep` snapshots, then chunks nothing references
+        log = log or (lambda message: None)
+        with TargetLock(self.target_dir):
+            names = self.snapshots()
+            for name in names[keep:]:
+                os.remove(os.path.join(self.snapshots_dir, f"{name}.json"))
+            referenced = set()
+            for name in names[:keep]:
+                for entry in self.load(name)['files'].values():
+                    referenced.update(entry['chunks'])
+            removed = freed = 0
+            for dirpath, _, filenames in os.walk(self.store):
+                for filename in filenames:
+                    if filename not in referenced:
+                        path = os.path.join(dirpath, filename)
+                        freed += os.path.getsize(path)
+                        os.remove(path)
+                        removed += 1
+            log(f"Pruned {max(0, len(names) - keep)} snapshots and {removed} chunks "
+                f"({freed / 1048576:.1f} MiB)")
+            return removed, freed
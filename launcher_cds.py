@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from launcher_launchcache import version_digest
+
+CDS_DIR = 'cds'
+STATE_FILE = 'cds.json'
+# -XX:ArchiveClassesAtExit (dynamic archives) arrived in 13,
+# -XX:+AutoCreateSharedArchive in 19
+MIN_DYNAMIC = 13
+MIN_AUTO = 19
+# Lines the JVM prints when it rejects an archive and falls back to loading classes normally
+REJECTED_MARKERS = (
+    'Unable to use shared archive',
+    'shared class paths mismatch',
+    'An error has occurred while processing the shared archive file',
+    'The shared archive file was created by a different version',
+)
+
+
+def mods_fingerprint(mods_dir):
+    entries = []
+    try:
+        for entry in os.scandir(mods_dir):
+            if entry.is_file() and entry.name.endswith('.jar'):
+                st = entry.stat()
+                entries.append([entry.name, st.st_size, st.st_mtime_ns])
+    except FileNotFoundError:
+        pass
+    return sorted(entries)
+
+
+def runtime_fingerprint(runtime):
+    try:
+        st = os.stat(runtime['path'])
+        return [runtime['path'], runtime['version'], st.st_size, st.st_mtime_ns]
+    except OSError:
+        return [runtime['path'], runtime['version']]
+
+
+class ClassDataSharing:
+    # One AppCDS archive per version. Its file name carries a hash of the
+    # version JSON chain, the mods folder and the Java binary, so any change
+    # to those gives a fresh archive and the old one is deleted. The first
+    # launch dumps the archive at exit; later launches map it.
+    def __init__(self, minecraft_dir, mods_dir=None):
+        self.minecraft_dir = minecraft_dir
+        self.mods_dir = mods_dir or os.path.join(minecraft_dir, 'mods')
+        self.root = os.path.join(minecraft_dir, CDS_DIR)
+        self.path = os.path.join(self.root, STATE_FILE)
+        self.state = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.state is None:
+            try:
+                with open(self.path) as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError):
+                self.state = {}
+        return self.state
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+    def key(self, version, runtime):
+        payload = json.dumps([version_digest(self.minecraft_dir, version),
+                              mods_fingerprint(self.mods_dir), runtime_fingerprint(runtime)])
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def archive_path(self, version, key):
+        return os.path.join(self.root, version, f"{key[:16]}.jsa")
+
+    def _remove(self, entry):
+        try:
+            os.remove(entry['archive'])
+        except OSError:
+            pass
+
+    def arguments(self, version, runtime):
+        # Returns (jvm_args, mode); mode is 'use' when an archive will be
+        # mapped, 'dump' when this launch creates it, None when unsupported
+        major = runtime and runtime['major']
+        if not major or major < MIN_DYNAMIC:
+            return [], None
+        key = self.key(version, runtime)
+        archive = self.archive_path(version, key)
+        with self._lock:
+            state = self._load()
+            entry = state.get(version)
+            if entry and entry['key'] != key:
+                self._remove(entry)
+                entry = None
+            ready = bool(entry and entry['status'] == 'ready' and os.path.exists(archive))
+            if not ready:
+                entry = {'key': key, 'archive': archive, 'status': 'pending', 'java': runtime['version'],
+                         'created': time.time()}
+                state[version] = entry
+                self._save()
+        os.makedirs(os.path.dirname(archive), exist_ok=True)
+        if major >= MIN_AUTO:
+            # The JVM validates the archive itself and regenerates it when stale
+            args = ['-XX:+AutoCreateSharedArchive', f'-XX:SharedArchiveFile={archive}']
+        elif ready:
+            args = [f'-XX:SharedArchiveFile={archive}']
+        else:
+            args = [f'-XX:ArchiveClassesAtExit={archive}']
+        return args, 'use' if ready else 'dump'
+
+    def check_line(self, version, line):
+        if any(marker in line for marker in REJECTED_MARKERS):
+            self.invalidate(version)
+
+    def finished(self, version):
+        # The archive is written as the JVM exits; only a complete file counts
+        with self._lock:
+            entry = self._load().get(version)
+            if entry and entry['status'] == 'pending':
+                try:
+                    complete = os.path.getsize(entry['archive']) > 0
+                except OSError:
+                    complete = False
+                if complete:
+                    entry['status'] = 'ready'
+                    self._save()
+
+    def invalidate(self, version=None):
+        with self._lock:
+            state = self._load()
+            for name in [v for v in state if version is None or v == version]:
+                self._remove(state.pop(name))
+            self._save()
@@ -0,0 +1,73 @@
+import threading
+from collections import deque
+
+import tkinter as tk
+
+
+class ConsoleSink:
+    # Thread-safe log sink for a Tk text widget. Any thread may call write();
+    # only the Tk loop touches the widget, draining the queue in batches via
+    # root.after. The pending queue and the widget are both capped at
+    # max_lines, and the drain interval shrinks while lines keep arriving
+    # and backs off again when the console is idle.
+    def __init__(self, root, widget, max_lines=5000, min_interval=15, max_interval=250):
+        self.root = root
+        self.widget = widget
+        self.max_lines = max_lines
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = max_interval
+        self.pending = deque(maxlen=max_lines)
+        self.dropped = 0
+        self.widget_lines = 0
+        self._lock = threading.Lock()
+        self._scheduled = None
+
+    def write(self, message):
+        with self._lock:
+            if len(self.pending) == self.max_lines:
+                self.dropped += 1
+            self.pending.append(message)
+
+    def start(self):
+        if self._scheduled is None:
+            self._scheduled = self.root.after(self.interval, self._drain)
+
+    def stop(self):
+        if self._scheduled is not None:
+            self.root.after_cancel(self._scheduled)
+            self._scheduled = None
+
+    def _take(self):
+        with self._lock:
+            lines = list(self.pending)
+            self.pending.clear()
+            dropped, self.dropped = self.dropped, 0
+        return lines, dropped
+
+    def flush(self):
+        lines, dropped = self._take()
+        if not lines:
+            return 0
+        if dropped:
+            lines.insert(0, f"[... {dropped} lines skipped ...]")
+        text = '\n'.join(lines) + '\n'
+        self.widget.insert(tk.END, text)
+        self.widget_lines += text.count('\n')
+        excess = self.widget_lines - self.max_lines
+        if excess > 0:
+            self.widget.delete('1.0', f'{excess + 1}.0')
+            self.widget_lines -= excess
+        self.widget.see(tk.END)
+        return len(lines)
+
+    def _drain(self):
+        count = 0
+        try:
+            count = self.flush()
+        finally:
+            if count:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * 2, self.max_interval)
+            self._scheduled = self.root.after(self.interval, self._drain)
@@ -0,0 +1,318 @@
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit, urljoin
+
+USER_AGENT = 'CatClient-1.2'
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError)
+RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+# Bodies smaller than this say more about latency than throughput
+MIN_SAMPLE_BYTES = 16 * 1024
+FAILURE_COOLDOWN = 30.0
+# How far ahead of the cap a burst may run
+BURST_SECONDS = 0.25
+
+
+class HTTPError(Exception):
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+
+
+def is_retryable(error):
+    if isinstance(error, HTTPError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+
+def backoff_delay(attempt):
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class RateLimiter:
+    # Token bucket shared by every response a pool hands out, so the cap
+    # applies to the sum of all concurrent downloads. A rate of 0 disables it.
+    def __init__(self, rate=0):
+        self.rate = rate
+        self.tokens = rate * BURST_SECONDS
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self._lock:
+            self.rate = rate
+            self.tokens = min(self.tokens, rate * BURST_SECONDS)
+
+    def consume(self, amount):
+        # Returns how long the caller was held back
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            now = time.monotonic()
+            self.tokens = min(self.rate * BURST_SECONDS, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            # Tokens may go negative; later callers then wait out this debt too
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class MirrorSet:
+    # Alternative base URLs for an origin, e.g.
+    # {'https://resources.download.minecraft.net/': ['http://mirror.lan/assets/']}.
+    # Candidates are ordered unmeasured first (so each gets probed), then by
+    # measured throughput; a base that just failed sits out FAILURE_COOLDOWN.
+    def __init__(self, mirrors=None):
+        self.groups = []
+        self.stats = {}
+        self._lock = threading.Lock()
+        self.configure(mirrors or {})
+
+    def configure(self, mirrors):
+        with self._lock:
+            self.groups = [[origin] + [m for m in bases if m != origin] for origin, bases in mirrors.items()]
+
+    def candidates(self, url):
+        with self._lock:
+            for group in self.groups:
+                for base in group:
+                    if url.startswith(base):
+                        rest = url[len(base):]
+                        now = time.monotonic()
+
+                        def rank(b):
+                            rate, failed_until = self.stats.get(b, (None, 0.0))
+                            return (failed_until > now, rate is not None, -(rate or 0.0))
+
+                        return [(b, b + rest) for b in sorted(group, key=rank)]
+        return [(None, url)]
+
+    def record(self, base, size, seconds):
+        sample = size / max(seconds, 1e-6)
+        with self._lock:
+            rate, _ = self.stats.get(base, (None, 0.0))
+            self.stats[base] = (sample if rate is None else 0.7 * rate + 0.3 * sample, 0.0)
+
+    def failed(self, base):
+        with self._lock:
+            rate, _ = self.stats.get(base, (None, 0.0))
+            self.stats[base] = (rate and rate / 2, time.monotonic() + FAILURE_COOLDOWN)
+
+    def ranking(self):
+        with self._lock:
+            return {base: self.stats.get(base, (None, 0.0))[0] for group in self.groups for base in group}
+
+
+class PooledResponse:
+    # Wraps an http.client response and hands the connection back to the
+    # pool once the body has been fully read. Reads are charged to the pool's
+    # rate limiter and, for mirrored URLs, timed to rank the mirror.
+    def __init__(self, pool, key, conn, response, url, started=None):
+        self.pool = pool
+        self.key = key
+        self.conn = conn
+        self.response = response
+        self.url = url
+        self.status = response.status
+        self.headers = response.headers
+        self.base = None
+        self.started = started or time.perf_counter()
+        self.received = 0
+        self.throttled = 0.0
+
+    def read(self, amt=None):
+        if amt is None:
+            return b''.join(self.iter_content())
+        try:
+            data = self.response.read(amt)
+        except Exception:
+            if self.base:
+                self.pool.mirrors.failed(self.base)
+            raise
+        if not data and amt and self.response.length:
+            # http.client returns b'' when the connection drops before Content-Length
+            if self.base:
+                self.pool.mirrors.failed(self.base)
+            raise http.client.IncompleteRead(b'', self.response.length)
+        self.received += len(data)
+        self.throttled += self.pool.limiter.consume(len(data))
+        return data
+
+    def iter_content(self, chunk_size=64 * 1024):
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def json(self):
+        # Through read(), so the bytes are throttled and counted like any other body
+        return json.loads(self.read().decode('utf-8'))
+
+    def close(self):
+        if self.conn is None:
+            return
+        complete = self.response.isclosed()
+        if self.base and complete and self.received >= MIN_SAMPLE_BYTES:
+            elapsed = time.perf_counter() - self.started - self.throttled
+            self.pool.mirrors.record(self.base, self.received, elapsed)
+        reusable = complete and not self.response.will_close
+        if reusable:
+            self.pool._release(self.key, self.conn)
+        else:
+            self.conn.close()
+        self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HTTPPool:
+    # Keep-alive connections per host, shared by every launcher download.
+    # Failed requests are retried with exponential backoff, moving through
+    # the configured mirrors; max_bytes_per_sec caps all bodies combined.
+    def __init__(self, max_idle_per_host=8, timeout=30, user_agent=USER_AGENT, mirrors=None,
+                 max_bytes_per_sec=0, retries=RETRIES):
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.retries = retries
+        self.mirrors = MirrorSet(mirrors)
+        self.limiter = RateLimiter(max_bytes_per_sec)
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def configure(self, mirrors=None, max_bytes_per_sec=None):
+        if mirrors is not None:
+            self.mirrors.configure(mirrors)
+        if max_bytes_per_sec is not None:
+            self.limiter.set_rate(max_bytes_per_sec)
+
+    def _connect(self, key):
+        scheme, netloc = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def _acquire(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(key), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _send(self, method, url, headers):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        all_headers = {'User-Agent': self.user_agent, 'Accept-Encoding': 'identity'}
+        all_headers.update(headers or {})
+
+        started = time.perf_counter()
+        conn, reused = self._acquire(key)
+        try:
+            conn.request(method, path, headers=all_headers)
+            response = conn.getresponse()
+        except STALE_ERRORS:
+            conn.close()
+            if not reused:
+                raise
+            # The server dropped an idle keep-alive connection; retry on a fresh one
+            conn = self._connect(key)
+            conn.request(method, path, headers=all_headers)
+            response = conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+        return PooledResponse(self, key, conn, response, url, started)
+
+    def request(self, method, url, headers=None, ok=(200,), max_redirects=5, retries=None):
+        retries = self.retries if retries is None else retries
+        candidates = self.mirrors.candidates(url)
+        for attempt in range(retries + 1):
+            base, target = candidates[attempt % len(candidates)]
+            try:
+                response = self._follow(method, target, headers, ok, max_redirects)
+            except Exception as e:
+                # A mirror may lack a file the others have, so a 404 moves on too
+                missing = len(candidates) > 1 and isinstance(e, HTTPError) and e.status == 404
+                if not (is_retryable(e) or missing):
+                    raise
+                if base:
+                    self.mirrors.failed(base)
+                if attempt >= retries:
+                    raise
+                # Back off once every candidate has been tried in this round
+                if (attempt + 1) % len(candidates) == 0:
+                    time.sleep(backoff_delay(attempt // len(candidates)))
+                continue
+            response.base = base
+            return response
+
+    def _follow(self, method, url, headers, ok, max_redirects):
+        for _ in range(max_redirects + 1):
+            response = self._send(method, url, headers)
+            if response.status in REDIRECT_CODES:
+                location = response.headers.get('Location')
+                response.read()
+                response.close()
+                url = urljoin(url, location)
+                continue
+            if response.status not in ok:
+                response.read()
+                response.close()
+                raise HTTPError(response.status, url)
+            return response
+        raise HTTPError(response.status, url)
+
+    def get(self, url, headers=None, ok=(200,)):
+        return self.request('GET', url, headers=headers, ok=ok)
+
+    def get_bytes(self, url, headers=None):
+        with self.get(url, headers=headers) as response:
+            return response.read()
+
+    def get_json(self, url, headers=None):
+        with self.get(url, headers=headers) as response:
+            return response.json()
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def default_pool():
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = HTTPPool()
+        return _default_pool
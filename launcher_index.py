@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+
+INDEX_FILE = 'versions_index.json'
+INDEX_FORMAT = 1
+
+
+class InstalledVersionsIndex:
+    # Persistent replacement for minecraft_launcher_lib.utils.get_installed_versions.
+    # Each version folder is keyed by its directory mtime and its JSON's
+    # mtime/size, so a refresh only parses folders that actually changed.
+    def __init__(self, minecraft_dir, index_path=None):
+        self.versions_dir = os.path.join(minecraft_dir, 'versions')
+        self.index_path = index_path or os.path.join(minecraft_dir, INDEX_FILE)
+        self.entries = None
+        self.parsed = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+            if data.get('format') == INDEX_FORMAT:
+                return data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save(self):
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'format': INDEX_FORMAT, 'entries': self.entries}, f)
+        os.replace(tmp, self.index_path)
+
+    @staticmethod
+    def _parse(json_path):
+        with open(json_path) as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{json_path} is not a version object")
+        return {
+            'id': data['id'],
+            'type': data.get('type', 'release'),
+            'releaseTime': data.get('releaseTime', ''),
+            'complianceLevel': data.get('complianceLevel', 0),
+            'inheritsFrom': data.get('inheritsFrom'),
+        }
+
+    def refresh(self):
+        with self._lock:
+            if self.entries is None:
+                self.entries = self._load()
+            self.parsed = 0
+            seen = set()
+            changed = False
+            try:
+                folders = list(os.scandir(self.versions_dir))
+            except FileNotFoundError:
+                folders = []
+            for folder in folders:
+                if not folder.is_dir():
+                    continue
+                json_path = os.path.join(folder.path, f"{folder.name}.json")
+                try:
+                    st = os.stat(json_path)
+                except OSError:
+                    continue
+                seen.add(folder.name)
+                key = [folder.stat().st_mtime_ns, st.st_mtime_ns, st.st_size]
+                cached = self.entries.get(folder.name)
+                if cached and cached['key'] == key:
+                    continue
+                try:
+                    version = self._parse(json_path)
+                except (OSError, ValueError, KeyError, TypeError):
+                    continue
+                self.parsed += 1
+                self.entries[folder.name] = {'key': key, 'version': version}
+                changed = True
+            for name in set(self.entries) - seen:
+                del self.entries[name]
+                changed = True
+            if changed:
+                self._save()
+            return self.versions()
+
+    def versions(self):
+        versions = [entry['version'] for entry in (self.entries or {}).values()]
+        versions.sort(key=lambda v: v['releaseTime'], reverse=True)
+        return versions
@@ -0,0 +1,379 @@
+import hashlib
+import http.client
+import json
+import os
+import platform
+import threading
+import time
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from launcher_http import HTTPError, backoff_delay, default_pool
+from launcher_lock import PathLock
+
+VERSION_MANIFEST_URL = 'https://piston-meta.mojang.com/mc/game/version_manifest_v2.json'
+RESOURCES_URL = 'https://resources.download.minecraft.net'
+LIBRARIES_URL = 'https://libraries.minecraft.net/'
+CHUNK_SIZE = 64 * 1024
+
+# One file the installer has to fetch. sha1/size may be None for legacy
+# libraries that only publish a maven URL.
+DownloadItem = namedtuple('DownloadItem', 'url path sha1 size')
+
+
+def get_os_name():
+    system = platform.system()
+    if system == 'Windows':
+        return 'windows'
+    if system == 'Darwin':
+        return 'osx'
+    return 'linux'
+
+
+def get_arch_bits():
+    return '64' if platform.architecture()[0] == '64bit' else '32'
+
+
+def rules_allow(rules, features=None):
+    if not rules:
+        return True
+    allowed = False
+    os_name = get_os_name()
+    for rule in rules:
+        matches = True
+        rule_os = rule.get('os', {})
+        if 'name' in rule_os and rule_os['name'] != os_name:
+            matches = False
+        if 'arch' in rule_os and rule_os['arch'] == 'x86' and get_arch_bits() != '32':
+            matches = False
+        for feature, value in rule.get('features', {}).items():
+            if (features or {}).get(feature, False) != value:
+                matches = False
+        if matches:
+            allowed = rule['action'] == 'allow'
+    return allowed
+
+
+def maven_path(name):
+    parts = name.split(':')
+    group, artifact, version = parts[0], parts[1], parts[2]
+    classifier = f"-{parts[3]}" if len(parts) > 3 else ''
+    return '/'.join(group.split('.') + [artifact, version, f"{artifact}-{version}{classifier}.jar"])
+
+
+def native_classifier(library):
+    natives = library.get('natives', {})
+    classifier = natives.get(get_os_name())
+    if classifier:
+        return classifier.replace('${arch}', get_arch_bits())
+    return None
+
+
+def library_items(library, libraries_dir):
+    items = []
+    downloads = library.get('downloads')
+    if downloads is None:
+        path = maven_path(library['name'])
+        base = library.get('url') or LIBRARIES_URL
+        items.append(DownloadItem(base.rstrip('/') + '/' + path,
+                                  os.path.join(libraries_dir, path), None, None))
+        return items
+
+    artifact = downloads.get('artifact')
+    if artifact and artifact.get('url'):
+        items.append(DownloadItem(artifact['url'], os.path.join(libraries_dir, artifact['path']),
+                                  artifact.get('sha1'), artifact.get('size')))
+
+    classifier = native_classifier(library)
+    if classifier and classifier in downloads.get('classifiers', {}):
+        native = downloads['classifiers'][classifier]
+        items.append(DownloadItem(native['url'], os.path.join(libraries_dir, native['path']),
+                                  native.get('sha1'), native.get('size')))
+    return items
+
+
+def build_plan(version_json, minecraft_dir, asset_index=None, resources_url=RESOURCES_URL):
+    version_id = version_json['id']
+    libraries_dir = os.path.join(minecraft_dir, 'libraries')
+    plan = []
+
+    client = version_json.get('downloads', {}).get('client')
+    if client:
+        plan.append(DownloadItem(client['url'],
+                                 os.path.join(minecraft_dir, 'versions', version_id, f"{version_id}.jar"),
+                                 client.get('sha1'), client.get('size')))
+
+    for library in version_json.get('libraries', []):
+        if rules_allow(library.get('rules')):
+            plan.extend(library_items(library, libraries_dir))
+
+    log_file = version_json.get('logging', {}).get('client', {}).get('file')
+    if log_file:
+        plan.append(DownloadItem(log_file['url'],
+                                 os.path.join(minecraft_dir, 'assets', 'log_configs', log_file['id']),
+                                 log_file.get('sha1'), log_file.get('size')))
+
+    if asset_index:
+        objects_dir = os.path.join(minecraft_dir, 'assets', 'objects')
+        seen = set()
+        for obj in asset_index.get('objects', {}).values():
+            digest = obj['hash']
+            if digest in seen:
+                continue
+            seen.add(digest)
+            plan.append(DownloadItem(f"{resources_url}/{digest[:2]}/{digest}",
+                                     os.path.join(objects_dir, digest[:2], digest),
+                                     digest, obj.get('size')))
+
+    # Several versions can share a library; only fetch each path once
+    unique = {}
+    for item in plan:
+        unique.setdefault(item.path, item)
+    return list(unique.values())
+
+
+class InstallError(Exception):
+    pass
+
+
+class VersionInstaller:
+    def __init__(self, minecraft_dir, pool=None, workers=8, manifest_url=VERSION_MANIFEST_URL,
+                 resources_url=RESOURCES_URL, progress=None, log=None, store=None, manifest_cache=None):
+        self.minecraft_dir = minecraft_dir
+        self.store = store
+        self.manifest_cache = manifest_cache
+        self.pool = pool or default_pool()
+        self.workers = workers
+        self.manifest_url = manifest_url
+        self.resources_url = resources_url
+        self.progress = progress
+        self.log = log or (lambda message: None)
+        self._manifest = None
+        self._lock = threading.Lock()
+        self.done_bytes = 0
+        self.total_bytes = 0
+
+    def get_manifest(self, refresh=False):
+        if self.manifest_cache is not None:
+            if refresh:
+                return self.manifest_cache.refresh()
+            return self.manifest_cache.get()
+        if self._manifest is None or refresh:
+            self._manifest = self.pool.get_json(self.manifest_url)
+        return self._manifest
+
+    def find_manifest_entry(self, version_id, refresh_missing=True):
+        entry = next((v for v in self.get_manifest().get('versions', []) if v['id'] == version_id), None)
+        if entry is None and refresh_missing and self.manifest_cache is not None:
+            # The cached manifest may predate a new release
+            entry = next((v for v in self.get_manifest(refresh=True).get('versions', [])
+                          if v['id'] == version_id), None)
+        return entry
+
+    def version_json_path(self, version_id):
+        return os.path.join(self.minecraft_dir, 'versions', version_id, f"{version_id}.json")
+
+    def fetch_version_json(self, version_id):
+        path = self.version_json_path(version_id)
+        # Modded profiles are not in the manifest; they must already be on disk
+        entry = self.find_manifest_entry(version_id, refresh_missing=not os.path.exists(path))
+        if entry is None:
+            if os.path.exists(path):
+                with open(path) as f:
+                    return json.load(f)
+            raise InstallError(f"Unknown version {version_id}")
+
+        if os.path.exists(path) and entry.get('sha1'):
+            with open(path, 'rb') as f:
+                data = f.read()
+            if hashlib.sha1(data).hexdigest() == entry['sha1']:
+                return json.loads(data.decode('utf-8'))
+
+        data = self.pool.get_bytes(entry['url'])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return json.loads(data.decode('utf-8'))
+
+    def fetch_asset_index(self, version_json):
+        info = version_json.get('assetIndex')
+        if not info:
+            return None
+        path = os.path.join(self.minecraft_dir, 'assets', 'indexes', f"{info['id']}.json")
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            if not info.get('sha1') or hashlib.sha1(data).hexdigest() == info['sha1']:
+                return json.loads(data.decode('utf-8'))
+        data = self.pool.get_bytes(info['url'])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return json.loads(data.decode('utf-8'))
+
+    def resolve(self, version_id):
+        # Walk the inheritsFrom chain and collect the full download plan
+        plan = []
+        chain = []
+        seen = set()
+        current = version_id
+        while current and current not in seen:
+            seen.add(current)
+            version_json = self.fetch_version_json(current)
+            chain.append(version_json)
+            asset_index = self.fetch_asset_index(version_json)
+            plan.extend(build_plan(version_json, self.minecraft_dir, asset_index, self.resources_url))
+            current = version_json.get('inheritsFrom')
+
+        unique = {}
+        for item in plan:
+            unique.setdefault(item.path, item)
+        return list(unique.values()), chain
+
+    def is_complete(self, item):
+        try:
+            size = os.path.getsize(item.path)
+        except OSError:
+            return False
+        return item.size is None or size == item.size
+
+    def _report(self, item, item_done, item_total):
+        if self.progress:
+            self.progress(item, item_done, item_total, self.done_bytes, self.total_bytes)
+
+    def _add_done(self, amount):
+        with self._lock:
+            self.done_bytes += amount
+
+    def fetch(self, item):
+        # Installs running side by side (GUI and CLI, or versions sharing
+        # libraries) take turns on a file's .part; whoever waited then finds it done
+        with PathLock(item.path + '.lock'):
+            if self.is_complete(item):
+                self._add_done(item.size or 0)
+                self._report(item, item.size, item.size)
+                return
+            # The pool already retries failed requests; this covers bodies that
+            # break off (resumed from the .part file) or fail the checksum
+            for attempt in range(self.pool.retries + 1):
+                try:
+                    return self._fetch_once(item)
+                except InstallError:
+                    if attempt >= self.pool.retries:
+                        raise
+                    time.sleep(backoff_delay(attempt))
+
+    def _fetch_once(self, item):
+        part = item.path + '.part'
+        os.makedirs(os.path.dirname(item.path), exist_ok=True)
+        digest = hashlib.sha1()
+        offset = 0
+        if os.path.exists(part):
+            offset = os.path.getsize(part)
+            if item.size is not None and offset > item.size:
+                os.remove(part)
+                offset = 0
+            else:
+                with open(part, 'rb') as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                self._add_done(offset)
+
+        headers = {'Range': f"bytes={offset}-"} if offset else None
+        try:
+            response = self.pool.get(item.url, headers=headers, ok=(200, 206))
+        except HTTPError as e:
+            if e.status != 416:
+                raise
+            # Range not satisfiable: the partial file is already complete
+            response = None
+
+        if response is not None:
+            with response:
+                mode = 'ab'
+                if offset and response.status == 200:
+                    # Server ignored the range request; start over
+                    self._add_done(-offset)
+                    offset = 0
+                    digest = hashlib.sha1()
+                    mode = 'wb'
+                done = offset
+                try:
+                    with open(part, mode) as f:
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            f.write(chunk)
+                            digest.update(chunk)
+                            done += len(chunk)
+                            self._add_done(len(chunk))
+                            self._report(item, done, item.size)
+                except (OSError, http.client.HTTPException) as e:
+                    # The next attempt counts the .part file again
+                    self._add_done(-done)
+                    raise InstallError(f"Transfer of {item.url} interrupted: {e}")
+
+        if item.sha1 and digest.hexdigest() != item.sha1:
+            self._add_done(-os.path.getsize(part))
+            os.remove(part)
+            raise InstallError(f"Checksum mismatch for {item.url}")
+        os.replace(part, item.path)
+        if self.store and item.sha1:
+            self.store.adopt(item.path, item.sha1)
+        self._report(item, item.size, item.size)
+
+    def link_from_store(self, items):
+        # Files another launcher directory already downloaded are linked, not fetched
+        missing = []
+        for item in items:
+            if self.store and item.sha1 and self.store.has(item.sha1):
+                self.store.link_into(item.sha1, item.path)
+            else:
+                missing.append(item)
+        return missing
+
+    def download(self, plan):
+        missing = [item for item in plan if not self.is_complete(item)]
+        linked = len(missing)
+        missing = self.link_from_store(missing)
+        linked -= len(missing)
+        if linked:
+            self.log(f"Linked {linked} files from the shared store")
+        self.done_bytes = 0
+        self.total_bytes = sum(item.size or 0 for item in missing)
+        self.log(f"Downloading {len(missing)} of {len(plan)} files "
+                 f"({self.total_bytes / 1048576:.1f} MiB)")
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [(item, executor.submit(self.fetch, item)) for item in missing]
+            for item, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(f"{os.path.basename(item.path)}: {e}")
+        if errors:
+            raise InstallError(f"{len(errors)} downloads failed; first: {errors[0]}")
+        return len(missing)
+
+    def extract_natives(self, version_id, chain):
+        natives_dir = os.path.join(self.minecraft_dir, 'versions', version_id, 'natives')
+        libraries_dir = os.path.join(self.minecraft_dir, 'libraries')
+        for version_json in chain:
+            for library in version_json.get('libraries', []):
+                if not rules_allow(library.get('rules')) or not native_classifier(library):
+                    continue
+                excludes = library.get('extract', {}).get('exclude', [])
+                for item in library_items(library, libraries_dir):
+                    if native_classifier(library) not in os.path.basename(item.path):
+                        continue
+                    os.makedirs(natives_dir, exist_ok=True)
+                    with zipfile.ZipFile(item.path) as jar:
+                        for name in jar.namelist():
+                            if not any(name.startswith(prefix) for prefix in excludes):
+                                jar.extract(name, natives_dir)
+
+    def install(self, version_id):
+        self.log(f"Resolving download plan for {version_id}...")
+        plan, chain = self.resolve(version_id)
+        self.download(plan)
+        self.extract_natives(version_id, chain)
+        return plan
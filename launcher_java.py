@@ -0,0 +1,246 @@
+import glob
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CACHE_FILE = 'java_runtimes.json'
+CACHE_FORMAT = 1
+DEFAULT_REQUIRED = 8
+PROBE_TIMEOUT = 15
+
+JAVA_NAMES = ('java.exe', 'javaw.exe') if sys.platform == 'win32' else ('java',)
+PROPERTY = re.compile(r'^\s*([\w.]+) = (.*)$', re.MULTILINE)
+VERSION_LINE = re.compile(r'version "([^"]+)"')
+
+
+def install_prefixes():
+    home = os.path.expanduser('~')
+    if sys.platform == 'win32':
+        roots = [os.getenv('ProgramFiles', r'C:\Program Files'), os.getenv('ProgramFiles(x86)', ''),
+                 os.path.join(os.getenv('LOCALAPPDATA', ''), 'Programs')]
+        vendors = ['Java', 'Eclipse Adoptium', 'Eclipse Foundation', 'AdoptOpenJDK', 'Microsoft', 'Zulu',
+                   'BellSoft', 'Amazon Corretto', 'Semeru']
+        return [os.path.join(root, vendor, '*') for root in roots if root for vendor in vendors] + \
+            [os.path.join(home, '.jdks', '*')]
+    if sys.platform == 'darwin':
+        return ['/Library/Java/JavaVirtualMachines/*/Contents/Home',
+                os.path.join(home, 'Library/Java/JavaVirtualMachines/*/Contents/Home'),
+                '/opt/homebrew/opt/openjdk*', '/usr/local/opt/openjdk*',
+                os.path.join(home, '.sdkman/candidates/java/*'), os.path.join(home, '.jdks/*')]
+    return ['/usr/lib/jvm/*', '/usr/lib64/jvm/*', '/usr/java/*', '/opt/java/*', '/opt/*jdk*', '/opt/*jre*',
+            os.path.join(home, '.sdkman/candidates/java/*'), os.path.join(home, '.jdks/*')]
+
+
+def candidate_paths(minecraft_dirs=()):
+    # JAVA_HOME first, then PATH, then the usual install prefixes and the
+    # runtimes the official launcher downloads into .minecraft/runtime
+    homes = []
+    for prefix in install_prefixes():
+        homes.extend(sorted(glob.glob(prefix)))
+    for minecraft_dir in minecraft_dirs:
+        homes.extend(sorted(glob.glob(os.path.join(minecraft_dir, 'runtime', '*', '*', '*'))))
+        # macOS runtimes nest a jre.bundle
+        homes.extend(sorted(glob.glob(os.path.join(minecraft_dir, 'runtime', '*', '*', '*',
+                                                   'jre.bundle', 'Contents', 'Home'))))
+    directories = [os.path.join(os.getenv('JAVA_HOME'), 'bin')] if os.getenv('JAVA_HOME') else []
+    directories += os.getenv('PATH', '').split(os.pathsep)
+    directories += [os.path.join(home, 'bin') for home in homes]
+
+    seen = set()
+    result = []
+    for directory in directories:
+        for name in JAVA_NAMES:
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path) or not os.access(path, os.X_OK):
+                continue
+            real = os.path.realpath(path)
+            if real not in seen:
+                seen.add(real)
+                result.append(real)
+    return result
+
+
+def major_of(version):
+    # "1.8.0_392" -> 8, "17.0.9" -> 17, "21" -> 21
+    parts = re.findall(r'\d+', version)
+    if not parts:
+        return None
+    if parts[0] == '1' and len(parts) > 1:
+        return int(parts[1])
+    return int(parts[0])
+
+
+def normalize_arch(arch):
+    arch = arch.lower()
+    if arch in ('amd64', 'x86_64', 'x64'):
+        return 'x86_64'
+    if arch in ('aarch64', 'arm64'):
+        return 'aarch64'
+    if arch in ('x86', 'i386', 'i486', 'i586', 'i686'):
+        return 'x86'
+    return arch
+
+
+def probe(path):
+    # One spawn reports version, vendor and architecture together
+    runtime = {'path': path, 'version': '', 'major': None, 'vendor': '', 'arch': '', 'error': None}
+    try:
+        output = subprocess.run([path, '-XshowSettings:properties', '-version'], stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, universal_newlines=True,
+                                timeout=PROBE_TIMEOUT).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        runtime['error'] = str(e)
+        return runtime
+    properties = dict((k, v.strip()) for k, v in PROPERTY.findall(output))
+    version = properties.get('java.version')
+    if not version:
+        match = VERSION_LINE.search(output)
+        version = match.group(1) if match else ''
+    runtime['version'] = version
+    runtime['major'] = major_of(version)
+    runtime['vendor'] = properties.get('java.vendor', '')
+    runtime['arch'] = normalize_arch(properties.get('os.arch', ''))
+    if runtime['major'] is None:
+        runtime['error'] = 'unrecognized output from -version'
+    return runtime
+
+
+def required_java(minecraft_dir, version):
+    # javaVersion.majorVersion from the version JSON chain; versions older
+    # than the field ran on Java 8
+    seen = set()
+    current = version
+    while current and current not in seen:
+        seen.add(current)
+        path = os.path.join(minecraft_dir, 'versions', current, f"{current}.json")
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            break
+        major = data.get('javaVersion', {}).get('majorVersion')
+        if major:
+            return int(major)
+        current = data.get('inheritsFrom')
+    return DEFAULT_REQUIRED
+
+
+class JavaRegistry:
+    # Installed JVMs, probed in parallel and cached by binary size/mtime so a
+    # launch only stats the binaries instead of spawning `java -version`
+    def __init__(self, cache_dir, minecraft_dirs=(), workers=8):
+        self.path = os.path.join(cache_dir, CACHE_FILE)
+        self.minecraft_dirs = list(minecraft_dirs)
+        self.workers = workers
+        self.entries = None
+        self.probed = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('format') == CACHE_FORMAT:
+                return data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'format': CACHE_FORMAT, 'entries': self.entries}, f)
+        os.replace(tmp, self.path)
+
+    def _known(self):
+        if self.entries is None:
+            self.entries = self._load()
+        return list(self.entries)
+
+    def _refresh(self, paths):
+        # Binaries that no longer exist drop out; changed ones are re-probed
+        known = self._known()
+        current = {}
+        changed = []
+        for path in dict.fromkeys(list(paths) + known):
+            try:
+                st = os.stat(path)
+            except OSError:
+                current.pop(path, None)
+                continue
+            key = [st.st_size, st.st_mtime_ns]
+            cached = self.entries.get(path)
+            if cached and cached['key'] == key:
+                current[path] = cached
+            else:
+                changed.append((path, key))
+        if changed:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(probe, [path for path, _ in changed]))
+            for (path, key), runtime in zip(changed, results):
+                current[path] = {'key': key, 'runtime': runtime}
+        dirty = bool(changed) or current.keys() != self.entries.keys()
+        self.entries = current
+        self.probed = len(changed)
+        if dirty:
+            self._save()
+
+    def discover(self):
+        with self._lock:
+            self._refresh(candidate_paths(self.minecraft_dirs))
+            return self.runtimes()
+
+    def runtimes(self):
+        self._known()
+        runtimes = [e['runtime'] for e in self.entries.values() if e['runtime']['major']]
+        runtimes.sort(key=lambda r: (-r['major'], r['path']))
+        return runtimes
+
+    def get(self, path):
+        # Probe (or re-validate) one binary, e.g. a user-chosen java_path
+        real = os.path.realpath(shutil.which(path) or path)
+        with self._lock:
+            self._refresh([real])
+            entry = self.entries.get(real)
+        return entry['runtime'] if entry else None
+
+    def best_for(self, required):
+        # A runtime for the host's architecture beats any other (an x64 JVM
+        # can't load arm64 natives, and a 32-bit one caps the heap). Among
+        # those, exact major first (older Forge breaks on newer Java), then
+        # the nearest newer one; only as a last resort something older
+        host = normalize_arch(platform.machine())
+
+        def rank(runtime):
+            major = runtime['major']
+            if major == required:
+                distance = 0
+            elif major > required:
+                distance = major - required
+            else:
+                distance = 100 + required - major
+            newest = [-int(part) for part in re.findall(r'\d+', runtime['version'])]
+            return (runtime['arch'] not in ('', host), distance, newest, runtime['path'])
+
+        candidates = self.runtimes()
+        return min(candidates, key=rank) if candidates else None
+
+    def select(self, minecraft_dir, version, override=''):
+        # The runtime a launch should use: the user's java_path when set,
+        # otherwise the best discovered match for the version's javaVersion
+        if override:
+            return self.get(override) or {'path': override, 'major': None, 'version': '', 'vendor': '',
+                                          'arch': '', 'error': 'probe failed'}
+        if not self._known():
+            self.discover()
+        else:
+            with self._lock:
+                # Cached binaries are only re-stated; a full rescan is left to discover()
+                self._refresh([])
+        return self.best_for(required_java(minecraft_dir, version))
@@ -0,0 +1,124 @@
+import os
+import sys
+from collections import namedtuple
+
+PROFILES = ('low-latency', 'throughput', 'low-memory')
+DEFAULT_PROFILE = 'low-latency'
+
+Hardware = namedtuple('Hardware', 'cores total_mb free_mb')
+
+
+def read_meminfo():
+    values = {}
+    with open('/proc/meminfo') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            values[key] = int(rest.split()[0]) // 1024
+    return values['MemTotal'], values.get('MemAvailable', values['MemFree'])
+
+
+def windows_memory():
+    import ctypes
+
+    class MEMORYSTATUSEX(ctypes.Structure):
+        _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                    ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                    ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                    ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                    ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+    status = MEMORYSTATUSEX()
+    status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+    ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+    return status.ullTotalPhys // 1048576, status.ullAvailPhys // 1048576
+
+
+def detect_hardware():
+    cores = os.cpu_count() or 2
+    try:
+        if sys.platform == 'win32':
+            total, free = windows_memory()
+        elif os.path.exists('/proc/meminfo'):
+            total, free = read_meminfo()
+        else:
+            total = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // 1048576
+            free = total // 2
+    except (OSError, ValueError, AttributeError, KeyError):
+        total, free = 8192, 4096
+    return Hardware(cores, total, free)
+
+
+def max_heap_gb(hw):
+    # Leave a quarter of the machine (at least 2 GB) for the OS and the JVM's native memory
+    reserve = max(2048, hw.total_mb // 4)
+    return max(1, (hw.total_mb - reserve) // 1024)
+
+
+def clamp_heap_gb(ram_gb, hw):
+    return max(1, min(int(ram_gb), max_heap_gb(hw)))
+
+
+def gc_threads(cores):
+    # Same curve HotSpot uses by default, computed from the real core count
+    if cores <= 8:
+        return max(1, cores)
+    return 8 + (cores - 8) * 5 // 8
+
+
+def region_size_mb(heap_gb):
+    if heap_gb < 4:
+        return 4
+    if heap_gb < 8:
+        return 8
+    if heap_gb < 16:
+        return 16
+    return 32
+
+
+def tune(profile, ram_gb, hw, java_major=None):
+    heap = clamp_heap_gb(ram_gb, hw)
+    heap_mb = heap * 1024
+    parallel = gc_threads(hw.cores)
+    # Pre-touching only pays off when the whole heap fits in free memory
+    pretouch = heap_mb <= hw.free_mb * 0.8 and hw.cores >= 4
+    args = [f'-Xmx{heap}G']
+
+    if profile == 'throughput':
+        args += [f'-Xms{heap}G', '-XX:+UseParallelGC',
+                 f'-XX:ParallelGCThreads={max(1, hw.cores - 1)}']
+        if pretouch:
+            args.append('-XX:+AlwaysPreTouch')
+    elif profile == 'low-memory':
+        args.append(f'-Xms{min(heap_mb, 512)}M')
+        if hw.cores <= 2:
+            args.append('-XX:+UseSerialGC')
+        else:
+            args += ['-XX:+UseG1GC', '-XX:+UseStringDeduplication',
+                     f'-XX:ParallelGCThreads={min(parallel, 4)}']
+        args += ['-XX:MinHeapFreeRatio=10', '-XX:MaxHeapFreeRatio=30']
+    else:
+        args.append(f'-Xms{heap}G' if pretouch else f'-Xms{min(heap, 2)}G')
+        if java_major and java_major >= 21:
+            args.append('-XX:+UseZGC')
+            if java_major < 23:
+                # Generational mode is the default from 23 and the only mode from 24
+                args.append('-XX:+ZGenerational')
+            args.append(f'-XX:ConcGCThreads={max(1, parallel // 4)}')
+        else:
+            args += ['-XX:+UseG1GC', '-XX:MaxGCPauseMillis=50',
+                     f'-XX:G1HeapRegionSize={region_size_mb(heap)}M',
+                     f'-XX:ParallelGCThreads={parallel}',
+                     f'-XX:ConcGCThreads={max(1, parallel // 4)}']
+        if pretouch:
+            args.append('-XX:+AlwaysPreTouch')
+
+    args.append('-XX:-OmitStackTraceInFastThrow')
+    return args
+
+
+def jvm_arguments(settings, ram_gb, version=None, java_major=None):
+    # java_major comes from the runtime launcher_java selected for this launch
+    if not settings['optimized_args']:
+        return [f'-Xmx{ram_gb}G', f'-Xms{ram_gb}G']
+    profile = settings['jvm_profiles'].get(version, DEFAULT_PROFILE)
+    return tune(profile, ram_gb, detect_hardware(), java_major)
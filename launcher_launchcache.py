@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+CACHE_FILE = 'launch_cache.json'
+
+
+def build_minecraft_command(version, minecraft_dir, options):
+    # Imported here so cache hits and headless runs never load minecraft_launcher_lib
+    import minecraft_launcher_lib
+    return minecraft_launcher_lib.command.get_minecraft_command(version, minecraft_dir, options)
+
+
+def version_digest(minecraft_dir, version):
+    # SHA-1 over the version JSON and everything it inherits from
+    digest = hashlib.sha1()
+    seen = set()
+    current = version
+    while current and current not in seen:
+        seen.add(current)
+        path = os.path.join(minecraft_dir, 'versions', current, f"{current}.json")
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest.update(data)
+        current = json.loads(data.decode('utf-8')).get('inheritsFrom')
+    return digest.hexdigest()
+
+
+class LaunchCommandCache:
+    # Remembers the command get_minecraft_command produced, keyed by the
+    # version JSON chain (inheritsFrom included), JVM arguments and options,
+    # so a repeat launch skips re-parsing the JSONs and rebuilding the classpath.
+    def __init__(self, minecraft_dir, path=None, max_entries=64):
+        self.minecraft_dir = minecraft_dir
+        self.path = path or os.path.join(minecraft_dir, CACHE_FILE)
+        self.max_entries = max_entries
+        self.entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is None:
+            try:
+                with open(self.path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+        return self.entries
+
+    def _save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+    def version_digest(self, version):
+        return version_digest(self.minecraft_dir, version)
+
+    def key(self, version, options):
+        payload = json.dumps({
+            'version': version,
+            'json': self.version_digest(version),
+            'options': options,
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def get_command(self, version, options, build):
+        # Returns (command, info); info reports whether the cache was hit, how
+        # long this call took and how long the original build took.
+        start = time.perf_counter()
+        key = self.key(version, options)
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is not None:
+                # Kept in memory only; they reach disk with the next added or evicted entry
+                entry['hits'] = entry.get('hits', 0) + 1
+                entry['used'] = time.time()
+                return list(entry['command']), {
+                    'cached': True,
+                    'seconds': time.perf_counter() - start,
+                    'build_seconds': entry['build_seconds'],
+                }
+
+        build_start = time.perf_counter()
+        command = list(build())
+        build_seconds = time.perf_counter() - build_start
+        with self._lock:
+            entries = self._load()
+            entries[key] = {
+                'version': version,
+                'command': command,
+                'build_seconds': build_seconds,
+                'hits': 0,
+                'used': time.time(),
+            }
+            for stale in sorted(entries, key=lambda k: entries[k]['used'])[:-self.max_entries]:
+                del entries[stale]
+            self._save()
+        return list(command), {
+            'cached': False,
+            'seconds': time.perf_counter() - start,
+            'build_seconds': build_seconds,
+        }
+
+    def last_command(self, version):
+        # Most recently used command for a version, whatever its options were
+        with self._lock:
+            entries = [e for e in self._load().values() if e['version'] == version]
+        if not entries:
+            return None
+        return list(max(entries, key=lambda e: e['used'])['command'])
+
+    def invalidate(self, version=None):
+        with self._lock:
+            entries = self._load()
+            for key in [k for k, e in entries.items() if version is None or e['version'] == version]:
+                del entries[key]
+            self._save()
@@ -0,0 +1,71 @@
+import os
+import sys
+
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
+
+def lock_file(f):
+    # Blocks until this handle holds the exclusive lock; other handles on the
+    # same file wait, whether they belong to this process or another one
+    if sys.platform == 'win32':
+        while True:
+            try:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ten seconds; keep waiting
+                continue
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def unlock_file(f):
+    if sys.platform == 'win32':
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class PathLock:
+    # Exclusive lock on a lock file that is removed again on release, for
+    # guarding many short-lived paths without leaving a file behind for each
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        while True:
+            f = open(self.path, 'a+b')
+            try:
+                lock_file(f)
+                # The previous holder may have removed the file while we waited
+                if sys.platform == 'win32' or os.path.samestat(os.fstat(f.fileno()), os.stat(self.path)):
+                    self.file = f
+                    return self
+                unlock_file(f)
+            except FileNotFoundError:
+                pass
+            except Exception:
+                f.close()
+                raise
+            f.close()
+
+    def __exit__(self, *exc):
+        f, self.file = self.file, None
+        if sys.platform != 'win32':
+            # Removed while still held, so a waiter sees the change and reopens
+            os.remove(self.path)
+            f.close()
+            return
+        unlock_file(f)
+        f.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            # Another process has it open and will remove it in turn
+            pass
@@ -0,0 +1,231 @@
+import gzip
+import itertools
+import json
+import os
+import re
+import threading
+import time
+
+INDEX_FILE = 'index.json'
+SEGMENT_SUFFIX = '.log.gz'
+
+# "[12:00:00] [Render thread/INFO]: message" and the log4j XML layout
+BRACKET_LINE = re.compile(r'^\[[^\]]*\] \[([^\]/]+)/([A-Z]+)\]')
+XML_EVENT = re.compile(r'logger="([^"]+)".*?level="([A-Z]+)"(?:.*?thread="([^"]+)")?')
+KEYWORD = re.compile(r'[A-Za-z_][A-Za-z0-9_.$]{2,63}')
+
+_session_numbers = itertools.count()
+
+
+def line_terms(line):
+    terms = set()
+    match = BRACKET_LINE.match(line)
+    if match:
+        terms.add('logger:' + match.group(1).lower())
+        terms.add('level:' + match.group(2).lower())
+    else:
+        match = XML_EVENT.search(line)
+        if match:
+            terms.add('logger:' + match.group(1).lower())
+            terms.add('level:' + match.group(2).lower())
+            if match.group(3):
+                terms.add('logger:' + match.group(3).lower())
+    for word in KEYWORD.findall(line):
+        terms.update(keyword_terms(word))
+    return terms
+
+
+def keyword_terms(word):
+    # Dotted names are indexed by component, so "NullPointerException" finds
+    # "java.lang.NullPointerException" and a package prefix finds its classes
+    return [part for part in word.lower().split('.') if len(part) > 1]
+
+
+def query_terms(query):
+    terms = []
+    for token in query.split():
+        if ':' in token and token.split(':', 1)[0] in ('level', 'logger'):
+            terms.append(token.lower())
+        else:
+            for word in KEYWORD.findall(token):
+                terms.extend(keyword_terms(word))
+    return terms
+
+
+def query_substrings(query):
+    # Every plain token must appear in the line as typed (case-insensitively);
+    # this covers what the index cannot, such as numbers and short tokens
+    words = []
+    for token in query.split():
+        if ':' in token and token.split(':', 1)[0] in ('level', 'logger'):
+            continue
+        word = token.strip('.,;:()[]{}"\'').lower()
+        if word:
+            words.append(word)
+    return words
+
+
+def read_segment(path):
+    # Tolerates a segment cut short by a crash; everything up to the last sync flush is kept
+    lines = []
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                lines.append(line.rstrip('\n'))
+    except (EOFError, OSError):
+        pass
+    return lines
+
+
+class SessionWriter:
+    def __init__(self, archive, session_id, version):
+        self.archive = archive
+        self.session_id = session_id
+        self.version = version
+        self.seq = 0
+        self.file = None
+        self.name = None
+        self.bytes = 0
+        self.lines = 0
+        self.terms = set()
+        self.last_flush = time.monotonic()
+        self._open()
+
+    def _open(self):
+        self.name = f"{self.session_id}-{self.seq:03d}{SEGMENT_SUFFIX}"
+        self.file = gzip.open(os.path.join(self.archive.logs_dir, self.name), 'wt',
+                              encoding='utf-8', compresslevel=6)
+        self.bytes = 0
+        self.lines = 0
+        self.terms = set()
+
+    def _close_segment(self):
+        self.file.close()
+        self.archive._add_segment(self.name, {
+            'session': self.session_id,
+            'version': self.version,
+            'closed': time.time(),
+            'lines': self.lines,
+        }, self.terms)
+
+    def write(self, line):
+        self.file.write(line + '\n')
+        self.bytes += len(line) + 1
+        self.lines += 1
+        self.terms |= line_terms(line)
+        now = time.monotonic()
+        if now - self.last_flush > 1.0:
+            self.file.flush()
+            self.last_flush = now
+        if self.bytes >= self.archive.max_segment_bytes:
+            self._close_segment()
+            self.seq += 1
+            self._open()
+
+    def close(self):
+        if self.file is not None:
+            self._close_segment()
+            self.file = None
+
+
+class GameLogArchive:
+    # Each session is streamed into gzip segments that rotate at
+    # max_segment_bytes of uncompressed text. A small inverted index maps
+    # levels, loggers and keywords to segments, so a search only
+    # decompresses segments that can contain every query term.
+    def __init__(self, logs_dir, max_segment_bytes=8 * 1024 * 1024, max_segments=1000):
+        self.logs_dir = logs_dir
+        self.index_path = os.path.join(logs_dir, INDEX_FILE)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        os.makedirs(logs_dir, exist_ok=True)
+        self.segments, self.postings = self._load()
+        self._recover()
+
+    def _load(self):
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+            postings = {term: set(names) for term, names in data.get('terms', {}).items()}
+            return data.get('segments', {}), postings
+        except (OSError, ValueError):
+            return {}, {}
+
+    def _save(self):
+        data = {
+            'segments': self.segments,
+            'terms': {term: sorted(names) for term, names in self.postings.items()},
+        }
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.index_path)
+
+    def _recover(self):
+        # Index segments left behind by a launcher that exited mid-session
+        for name in sorted(os.listdir(self.logs_dir)):
+            if name.endswith(SEGMENT_SUFFIX) and name not in self.segments:
+                terms = set()
+                lines = read_segment(os.path.join(self.logs_dir, name))
+                for line in lines:
+                    terms |= line_terms(line)
+                session_id = name[:-len(SEGMENT_SUFFIX)].rsplit('-', 1)[0]
+                self._add_segment(name, {'session': session_id, 'version': '',
+                                         'closed': time.time(), 'lines': len(lines)}, terms)
+
+    def _add_segment(self, name, info, terms):
+        with self._lock:
+            self.segments[name] = info
+            for term in terms:
+                self.postings.setdefault(term, set()).add(name)
+            self._prune()
+            self._save()
+
+    def _prune(self):
+        excess = len(self.segments) - self.max_segments
+        if excess <= 0:
+            return
+        oldest = sorted(self.segments, key=lambda n: self.segments[n]['closed'])[:excess]
+        for name in oldest:
+            del self.segments[name]
+            try:
+                os.remove(os.path.join(self.logs_dir, name))
+            except OSError:
+                pass
+        dropped = set(oldest)
+        for term in list(self.postings):
+            self.postings[term] -= dropped
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def start_session(self, version):
+        # Launches within the same second, from this or another launcher
+        # process, each need their own segment files
+        session_id = (f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.{next(_session_numbers)}-"
+                      + re.sub(r'[^A-Za-z0-9_.-]', '_', version))
+        return SessionWriter(self, session_id, version)
+
+    def candidates(self, terms):
+        with self._lock:
+            if not terms:
+                return sorted(self.segments)
+            sets = [self.postings.get(term, set()) for term in terms]
+            return sorted(set.intersection(*sets))
+
+    def search(self, query, limit=500):
+        # Returns (segment, line number, line) for lines containing every term
+        terms = query_terms(query)
+        # The index narrows the segments; tokens it does not cover are checked per line
+        words = query_substrings(query)
+        results = []
+        for name in reversed(self.candidates(terms)):
+            for number, line in enumerate(read_segment(os.path.join(self.logs_dir, name)), 1):
+                lowered = line.lower()
+                if not all(word in lowered for word in words):
+                    continue
+                if all(term in line_terms(line) for term in terms):
+                    results.append((name, number, line))
+                    if len(results) >= limit:
+                        return results
+        return results
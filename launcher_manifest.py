@@ -0,0 +1,205 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+
+from launcher_http import default_pool
+from launcher_install import VERSION_MANIFEST_URL
+
+DEFAULT_TTL = 600
+
+
+def write_json_atomic(path, data):
+    # A unique temp file, so a GUI and a CLI refreshing at once cannot interleave writes
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except Exception:
+        os.remove(tmp)
+        raise
+
+
+class VersionSearchIndex:
+    # In-memory search over every manifest entry. Ids are kept lowercased in a
+    # sorted list for prefix lookups and joined into one string so substring
+    # matches are found by str.find rather than a Python loop per entry.
+    # Narrowing a query (typing another character) only re-checks the
+    # previous query's matches.
+    def __init__(self, versions):
+        self.versions = list(versions)
+        self.ids = [v['id'].lower() for v in self.versions]
+        self.types = [v.get('type', '') for v in self.versions]
+        self.dates = [v.get('releaseTime', '')[:10] for v in self.versions]
+        self.sorted_ids = sorted((vid, i) for i, vid in enumerate(self.ids))
+        self.text = '\n'.join(self.ids)
+        self.offsets = []
+        offset = 0
+        for vid in self.ids:
+            self.offsets.append(offset)
+            offset += len(vid) + 1
+        self._last = (None, None)
+
+    def prefix_matches(self, query):
+        start = bisect.bisect_left(self.sorted_ids, (query, -1))
+        matches = []
+        for vid, i in self.sorted_ids[start:]:
+            if not vid.startswith(query):
+                break
+            matches.append(i)
+        return matches
+
+    def substring_matches(self, query):
+        last_query, last_matches = self._last
+        if last_query is not None and query.startswith(last_query):
+            matches = [i for i in last_matches if query in self.ids[i]]
+        else:
+            matches = []
+            pos = self.text.find(query)
+            while pos != -1:
+                i = bisect.bisect_right(self.offsets, pos) - 1
+                matches.append(i)
+                # Continue after this id so each entry is reported once
+                pos = self.text.find(query, self.offsets[i] + len(self.ids[i]) + 1)
+        self._last = (query, matches)
+        return matches
+
+    def search(self, query='', version_type=None, since=None, until=None, limit=None):
+        # Prefix matches come first, then other substring matches, each in
+        # manifest (newest first) order. Dates compare as YYYY[-MM[-DD]] strings.
+        query = query.strip().lower()
+        if query:
+            prefix = sorted(self.prefix_matches(query))
+            seen = set(prefix)
+            order = prefix + [i for i in self.substring_matches(query) if i not in seen]
+        else:
+            order = range(len(self.versions))
+        results = []
+        for i in order:
+            if version_type and self.types[i] != version_type:
+                continue
+            if since and self.dates[i] < since:
+                continue
+            if until and self.dates[i][:len(until)] > until:
+                continue
+            results.append(self.versions[i])
+            if limit and len(results) >= limit:
+                break
+        return results
+
+
+class ManifestCache:
+    # Version manifest kept in the launcher directory. Reads are served from
+    # memory/disk; the network is only touched by refresh(), which revalidates
+    # with ETag / If-Modified-Since and keeps the old copy when offline.
+    def __init__(self, cache_dir, url=VERSION_MANIFEST_URL, ttl=DEFAULT_TTL, pool=None, log=None):
+        self.path = os.path.join(cache_dir, 'version_manifest.json')
+        self.url = url
+        self.ttl = ttl
+        self.pool = pool or default_pool()
+        self.log = log or (lambda message: None)
+        self.meta = {}
+        self.manifest = None
+        self.offline = False
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._refresh_lock = threading.Lock()
+        self._index = None
+
+    def load(self):
+        if not self._loaded:
+            self._loaded = True
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                self.meta = data.get('meta', {})
+                self.manifest = data.get('manifest')
+            except (OSError, ValueError):
+                self.meta, self.manifest = {}, None
+        return self.manifest
+
+    def is_stale(self):
+        self.load()
+        if self.manifest is None:
+            return True
+        return time.time() - self.meta.get('fetched_at', 0) > self.ttl
+
+    def refresh(self):
+        # One refresh at a time per cache; a caller arriving meanwhile revalidates after it
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self):
+        self.load()
+        headers = {}
+        if self.manifest is not None:
+            if self.meta.get('etag'):
+                headers['If-None-Match'] = self.meta['etag']
+            if self.meta.get('last_modified'):
+                headers['If-Modified-Since'] = self.meta['last_modified']
+        try:
+            with self.pool.get(self.url, headers=headers, ok=(200, 304)) as response:
+                if response.status == 304:
+                    self.meta['fetched_at'] = time.time()
+                else:
+                    self.manifest = response.json()
+                    self.meta = {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified')
+                        or formatdate(usegmt=True),
+                        'fetched_at': time.time(),
+                    }
+        except Exception as e:
+            self.offline = True
+            if self.manifest is None:
+                raise
+            self.log(f"Version manifest unavailable, using cached copy: {str(e)}")
+            return self.manifest
+        self.offline = False
+        write_json_atomic(self.path, {'meta': self.meta, 'manifest': self.manifest})
+        return self.manifest
+
+    def refresh_async(self, callback=None, force=False):
+        with self._lock:
+            if self._refreshing or not (force or self.is_stale()):
+                return False
+            self._refreshing = True
+
+        def task():
+            error = None
+            try:
+                self.refresh()
+            except Exception as e:
+                error = e
+                self.log(f"Error fetching version manifest: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+            if callback:
+                callback(self.manifest, error)
+
+        threading.Thread(target=task, daemon=True).start()
+        return True
+
+    def get(self):
+        # Blocks on the network only when there is no cached copy at all
+        if self.load() is None:
+            return self.refresh()
+        self.refresh_async()
+        return self.manifest
+
+    def versions(self):
+        manifest = self.load()
+        return manifest.get('versions', []) if manifest else []
+
+    def search_index(self):
+        # Rebuilt only when a refresh replaced the manifest
+        manifest = self.load()
+        if self._index is None or self._index[0] is not manifest:
+            self._index = (manifest, VersionSearchIndex(self.versions()))
+        return self._index[1]
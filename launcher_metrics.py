@@ -0,0 +1,140 @@
+import json
+import os
+import statistics
+import threading
+import time
+
+METRICS_FILE = 'launch_metrics.jsonl'
+
+# Log markers that show how far the client got, in the order they usually appear
+MARKERS = [
+    ('setting_user', 'Setting user:'),
+    ('lwjgl', 'Backend library: LWJGL'),
+    ('resource_reload', 'Reloading ResourceManager'),
+    ('sound_engine', 'Sound engine started'),
+    ('atlas_created', 'Created: '),
+]
+# Sound engine start is the last thing that happens before the title screen
+MENU_MARKERS = ('sound_engine', 'atlas_created', 'resource_reload')
+
+
+class LaunchTimer:
+    def __init__(self, version, **context):
+        self.version = version
+        self.context = context
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.pending = list(MARKERS)
+
+    def mark(self, phase):
+        if phase not in self.phases:
+            self.phases[phase] = round(time.perf_counter() - self.start, 4)
+
+    def feed(self, line):
+        if 'first_output' not in self.phases:
+            self.mark('first_output')
+        for marker in self.pending:
+            if marker[1] in line:
+                self.mark(marker[0])
+                self.pending.remove(marker)
+                break
+
+    def time_to_menu(self):
+        for phase in MENU_MARKERS:
+            if phase in self.phases:
+                return self.phases[phase]
+        return None
+
+    def finish(self, exit_code):
+        record = {
+            'time': self.started,
+            'version': self.version,
+            'phases': self.phases,
+            'time_to_menu': self.time_to_menu(),
+            'uptime': round(time.perf_counter() - self.start, 1),
+            'exit_code': exit_code,
+        }
+        record.update(self.context)
+        return record
+
+
+class LaunchMetrics:
+    # One JSON record per launch, appended to launch_metrics.jsonl
+    def __init__(self, minecraft_dir, path=None):
+        self.path = path or os.path.join(minecraft_dir, METRICS_FILE)
+        self.records = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.records is None:
+            self.records = []
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    for line in f:
+                        try:
+                            self.records.append(json.loads(line))
+                        except ValueError:
+                            continue
+        return self.records
+
+    def append(self, record):
+        with self._lock:
+            self._load().append(record)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def summary(self, version, last=20):
+        with self._lock:
+            records = [r for r in self._load() if r['version'] == version][-last:]
+        if not records:
+            return None
+        menu = [r['time_to_menu'] for r in records if r.get('time_to_menu') is not None]
+        build = [r['command_seconds'] for r in records if r.get('command_seconds') is not None]
+        first = [r['phases']['first_output'] for r in records if 'first_output' in r['phases']]
+        # Launches that mapped a class data sharing archive against the rest
+        menu_cds = [r['time_to_menu'] for r in records
+                    if r.get('time_to_menu') is not None and r.get('cds') == 'use']
+        menu_plain = [r['time_to_menu'] for r in records
+                      if r.get('time_to_menu') is not None and r.get('cds') != 'use']
+        # Spawn to first log line, split by whether the page-cache warmer ran first
+        after_spawn = {True: [], False: []}
+        for r in records:
+            phases = r['phases']
+            if 'first_output' in phases and 'spawned' in phases:
+                delay = max(0.0, phases['first_output'] - phases['spawned'])
+                after_spawn[bool(r.get('warmed_bytes'))].append(delay)
+        peak_rss = [r['peak_rss'] for r in records if r.get('peak_rss')]
+        return {
+            'launches': len(records),
+            'menu_median': statistics.median(menu) if menu else None,
+            'menu_last': menu[-1] if menu else None,
+            'build_median': statistics.median(build) if build else None,
+            'first_output_median': statistics.median(first) if first else None,
+            'first_output_warm': statistics.median(after_spawn[True]) if after_spawn[True] else None,
+            'first_output_cold': statistics.median(after_spawn[False]) if after_spawn[False] else None,
+            'menu_cds': statistics.median(menu_cds) if menu_cds else None,
+            'menu_plain': statistics.median(menu_plain) if menu_plain else None,
+            'peak_rss_max': max(peak_rss) if peak_rss else None,
+        }
+
+    def summary_text(self, version):
+        summary = self.summary(version)
+        if summary is None:
+            return "No launches recorded"
+        parts = [f"{summary['launches']} launches"]
+        if summary['menu_median'] is not None:
+            parts.append(f"time to menu {summary['menu_median']:.1f} s median, {summary['menu_last']:.1f} s last")
+        if summary['first_output_median'] is not None:
+            parts.append(f"first output {summary['first_output_median']:.1f} s")
+        if summary['first_output_warm'] is not None and summary['first_output_cold'] is not None:
+            parts.append(f"first line after spawn {summary['first_output_warm']:.2f} s warmed vs "
+                         f"{summary['first_output_cold']:.2f} s cold")
+        if summary['menu_cds'] is not None and summary['menu_plain'] is not None:
+            parts.append(f"{summary['menu_cds']:.1f} s with class data sharing vs "
+                         f"{summary['menu_plain']:.1f} s without")
+        if summary['peak_rss_max'] is not None:
+            parts.append(f"peak RSS {summary['peak_rss_max'] / 1073741824:.1f} GiB")
+        if summary['build_median'] is not None:
+            parts.append(f"command {summary['build_median'] * 1000:.0f} ms")
+        return ', '.join(parts)
@@ -0,0 +1,216 @@
+import json
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+INDEX_FILE = 'mods_index.json'
+INDEX_FORMAT = 1
+MOD_SUFFIXES = ('.jar', '.jar.disabled')
+# Below this many changed jars the pool costs more than it saves
+POOL_THRESHOLD = 8
+
+TOML_TABLE = re.compile(r'^\s*\[\[\s*([\w.\-"]+)\s*\]\]')
+TOML_VALUE = re.compile(r'^\s*([\w\-]+)\s*=\s*(?:"((?:[^"\\]|\\.)*)"|\'([^\']*)\'|(\S+))')
+
+
+def parse_simple_toml(text):
+    # Enough of TOML for mods.toml when tomllib is unavailable: arrays of
+    # tables ([[mods]], [[dependencies.id]]) holding string/bare values
+    data = {}
+    current = data
+    for line in text.splitlines():
+        match = TOML_TABLE.match(line)
+        if match:
+            parts = [p.strip('"') for p in match.group(1).split('.')]
+            parent = data
+            for part in parts[:-1]:
+                parent = parent.setdefault(part, {})
+            current = {}
+            parent.setdefault(parts[-1], []).append(current)
+            continue
+        match = TOML_VALUE.match(line)
+        if match:
+            value = next(g for g in match.groups()[1:] if g is not None)
+            current[match.group(1)] = value
+    return data
+
+
+def parse_toml(text):
+    if tomllib is not None:
+        try:
+            return tomllib.loads(text)
+        except tomllib.TOMLDecodeError:
+            pass
+    return parse_simple_toml(text)
+
+
+def manifest_version(jar):
+    try:
+        manifest = jar.read('META-INF/MANIFEST.MF').decode('utf-8', 'replace')
+    except KeyError:
+        return ''
+    match = re.search(r'^Implementation-Version:\s*(\S+)', manifest, re.MULTILINE)
+    return match.group(1) if match else ''
+
+
+def dependency_ids(values):
+    # Dependency lists in the wild mix plain ids with objects and versions; keep the ids
+    return sorted(set(v for v in values if isinstance(v, str) and v))
+
+
+def fabric_metadata(data, loader):
+    if loader == 'quilt':
+        data = data.get('quilt_loader', {})
+        depends = dependency_ids(d.get('id') if isinstance(d, dict) else d for d in data.get('depends', []))
+        name = data.get('metadata', {}).get('name', '')
+    else:
+        depends = dependency_ids(data.get('depends', {}))
+        name = data.get('name', '')
+    return {'id': data.get('id', ''), 'name': name, 'version': data.get('version', ''),
+            'loader': loader, 'depends': depends}
+
+
+def forge_metadata(jar, text, loader):
+    data = parse_toml(text)
+    mods = data.get('mods') or [{}]
+    mod = mods[0]
+    version = mod.get('version', '')
+    if '${' in version:
+        version = manifest_version(jar) or version
+    depends = []
+    for entries in data.get('dependencies', {}).values():
+        for dependency in entries:
+            dep_id = dependency.get('modId')
+            # NeoForge: type is required/optional/incompatible/discouraged, defaulting
+            # to required; Forge: mandatory. The fallback parser leaves 'true' a string
+            if 'type' in dependency:
+                required = str(dependency['type']).lower() == 'required'
+            else:
+                required = dependency.get('mandatory', True) in (True, 'true')
+            if dep_id and required:
+                depends.append(dep_id)
+    return {'id': mod.get('modId', ''), 'name': mod.get('displayName', ''), 'version': version,
+            'loader': loader, 'depends': dependency_ids(depends)}
+
+
+def mcmod_metadata(data):
+    if isinstance(data, dict):
+        data = data.get('modList', [])
+    mod = data[0] if data else {}
+    depends = mod.get('requiredMods', []) or mod.get('dependencies', [])
+    depends = [d.get('modid') if isinstance(d, dict) else d for d in depends]
+    return {'id': mod.get('modid', ''), 'name': mod.get('name', ''), 'version': mod.get('version', ''),
+            'loader': 'forge', 'depends': dependency_ids(depends)}
+
+
+def read_mod_metadata(path):
+    result = {'id': '', 'name': '', 'version': '', 'loader': 'unknown', 'depends': [], 'error': None}
+    try:
+        with zipfile.ZipFile(path) as jar:
+            names = set(jar.namelist())
+            if 'fabric.mod.json' in names:
+                data = json.loads(jar.read('fabric.mod.json').decode('utf-8', 'replace'), strict=False)
+                result.update(fabric_metadata(data, 'fabric'))
+            elif 'quilt.mod.json' in names:
+                data = json.loads(jar.read('quilt.mod.json').decode('utf-8', 'replace'), strict=False)
+                result.update(fabric_metadata(data, 'quilt'))
+            elif 'META-INF/neoforge.mods.toml' in names:
+                text = jar.read('META-INF/neoforge.mods.toml').decode('utf-8', 'replace')
+                result.update(forge_metadata(jar, text, 'neoforge'))
+            elif 'META-INF/mods.toml' in names:
+                text = jar.read('META-INF/mods.toml').decode('utf-8', 'replace')
+                result.update(forge_metadata(jar, text, 'forge'))
+            elif 'mcmod.info' in names:
+                data = json.loads(jar.read('mcmod.info').decode('utf-8', 'replace'), strict=False)
+                result.update(mcmod_metadata(data))
+    except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError, zipfile.BadZipFile) as e:
+        # One malformed jar must not abort the scan of the whole folder
+        result['error'] = f"{type(e).__name__}: {e}"
+    for key in ('id', 'name', 'version'):
+        if not isinstance(result[key], str):
+            result[key] = str(result[key]) if result[key] is not None else ''
+    if not result['id']:
+        result['id'] = os.path.basename(path).split('.jar')[0]
+    return result
+
+
+class ModIndex:
+    # Metadata for every jar in the mods directory, cached by path, size and
+    # mtime so a rescan only opens jars that changed
+    def __init__(self, mods_dir, index_path=None, workers=None):
+        self.mods_dir = mods_dir
+        self.index_path = index_path or os.path.join(os.path.dirname(mods_dir.rstrip(os.sep)), INDEX_FILE)
+        self.workers = workers
+        self.entries = None
+        self.parsed = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+            if data.get('format') == INDEX_FORMAT:
+                return data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save(self):
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'format': INDEX_FORMAT, 'entries': self.entries}, f)
+        os.replace(tmp, self.index_path)
+
+    def scan(self):
+        with self._lock:
+            if self.entries is None:
+                self.entries = self._load()
+            current = {}
+            changed = []
+            try:
+                files = list(os.scandir(self.mods_dir))
+            except FileNotFoundError:
+                files = []
+            for entry in files:
+                if not entry.is_file() or not entry.name.endswith(MOD_SUFFIXES):
+                    continue
+                st = entry.stat()
+                key = [st.st_size, st.st_mtime_ns]
+                cached = self.entries.get(entry.path)
+                if cached and cached['key'] == key:
+                    current[entry.path] = cached
+                else:
+                    changed.append((entry.path, key))
+
+            paths = [path for path, _ in changed]
+            if len(changed) >= POOL_THRESHOLD:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    results = list(executor.map(read_mod_metadata, paths, chunksize=4))
+            else:
+                results = [read_mod_metadata(path) for path in paths]
+            for (path, key), meta in zip(changed, results):
+                current[path] = {'key': key, 'meta': meta}
+
+            dirty = bool(changed) or len(current) != len(self.entries)
+            self.entries = current
+            self.parsed = len(changed)
+            if dirty:
+                self._save()
+            return self.mods()
+
+    def mods(self):
+        mods = []
+        for path, entry in (self.entries or {}).items():
+            mod = dict(entry['meta'])
+            mod['file'] = os.path.basename(path)
+            mod['enabled'] = not path.endswith('.disabled')
+            mods.append(mod)
+        mods.sort(key=lambda m: m['id'].lower())
+        return mods
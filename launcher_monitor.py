@@ -0,0 +1,190 @@
+import collections
+import csv
+import json
+import os
+import re
+import threading
+import time
+
+DEFAULT_INTERVAL = 1.0
+# Ten minutes at the default interval
+HISTORY = 600
+FIELDS = ('time', 'pid', 'rss', 'cpu', 'threads', 'read_bytes', 'write_bytes', 'read_rate', 'write_rate')
+HEAP_FLAG = re.compile(r'^-Xmx(\d+)([kKmMgG]?)$')
+UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
+PROC = '/proc'
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def heap_limit(command):
+    # Bytes from the last -Xmx in a launch command, None when there is none
+    limit = None
+    for arg in command:
+        match = HEAP_FLAG.match(arg)
+        if match:
+            limit = int(match.group(1)) * UNITS[match.group(2).lower()]
+    return limit
+
+
+class ProcReader:
+    # Keeps /proc/<pid>/stat and io open and re-reads them with pread, so a
+    # sample costs two syscalls. A descriptor stays bound to the process it
+    # was opened for: once that exits, reads fail instead of following a
+    # reused pid.
+    def __init__(self, pid):
+        self.pid = pid
+        self.stat_fd = os.open(os.path.join(PROC, str(pid), 'stat'), os.O_RDONLY)
+        try:
+            self.io_fd = os.open(os.path.join(PROC, str(pid), 'io'), os.O_RDONLY)
+        except OSError:
+            self.io_fd = None
+
+    def read(self):
+        stat = os.pread(self.stat_fd, 4096, 0)
+        # The command name may contain spaces and parentheses; fields follow the last ')'
+        fields = stat[stat.rindex(b')') + 2:].split()
+        sample = {
+            'cpu_seconds': (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+            'threads': int(fields[17]),
+            'rss': int(fields[21]) * PAGE_SIZE,
+            'read_bytes': 0,
+            'write_bytes': 0,
+        }
+        if self.io_fd is not None:
+            for line in os.pread(self.io_fd, 4096, 0).split(b'\n'):
+                if line.startswith(b'read_bytes:'):
+                    sample['read_bytes'] = int(line.split()[1])
+                elif line.startswith(b'write_bytes:'):
+                    sample['write_bytes'] = int(line.split()[1])
+        return sample
+
+    def close(self):
+        for fd in (self.stat_fd, self.io_fd):
+            if fd is not None:
+                os.close(fd)
+
+
+class ResourceMonitor:
+    # One background thread samples RSS, CPU, threads and disk I/O of every
+    # running instance returned by get_instances. Each instance keeps a
+    # rolling series that outlives the process, for the chart and export,
+    # until the instance disappears from get_instances.
+    def __init__(self, get_instances, interval=DEFAULT_INTERVAL, history=HISTORY):
+        self.get_instances = get_instances
+        self.interval = interval
+        self.history = history
+        self.series = {}
+        self.peaks = {}
+        self.available = os.path.isdir(PROC)
+        self._readers = {}
+        self._previous = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.available and self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def set_interval(self, interval):
+        self.interval = interval
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            if self.interval > 0:
+                self.sample()
+            self._wake.wait(self.interval if self.interval > 0 else None)
+
+    def _reader(self, instance):
+        key = (instance.id, instance.pid)
+        reader = self._readers.get(key)
+        if reader is None:
+            try:
+                reader = self._readers[key] = ProcReader(instance.pid)
+            except OSError:
+                return None
+        return reader
+
+    def sample(self):
+        instances = self.get_instances()
+        now = time.time()
+        live = set()
+        for instance in instances:
+            if not instance.running:
+                continue
+            reader = self._reader(instance)
+            if reader is None:
+                continue
+            key = (instance.id, instance.pid)
+            try:
+                raw = reader.read()
+            except (OSError, ValueError, IndexError):
+                continue
+            live.add(key)
+            previous = self._previous.get(key)
+            self._previous[key] = (now, raw)
+            if previous is None:
+                # CPU and I/O rates need two readings; a restarted process starts over
+                continue
+            elapsed = max(now - previous[0], 1e-6)
+            sample = {
+                'time': round(now, 3),
+                'pid': instance.pid,
+                'rss': raw['rss'],
+                'cpu': round((raw['cpu_seconds'] - previous[1]['cpu_seconds']) / elapsed * 100, 1),
+                'threads': raw['threads'],
+                'read_bytes': raw['read_bytes'],
+                'write_bytes': raw['write_bytes'],
+                'read_rate': int((raw['read_bytes'] - previous[1]['read_bytes']) / elapsed),
+                'write_rate': int((raw['write_bytes'] - previous[1]['write_bytes']) / elapsed),
+            }
+            with self._lock:
+                series = self.series.get(instance.id)
+                if series is None:
+                    series = self.series[instance.id] = collections.deque(maxlen=self.history)
+                series.append(sample)
+                self.peaks[instance.id] = max(self.peaks.get(instance.id, 0), raw['rss'])
+
+        for key in [key for key in self._readers if key not in live]:
+            self._readers.pop(key).close()
+            self._previous.pop(key, None)
+        known = set(instance.id for instance in instances)
+        with self._lock:
+            for instance_id in [i for i in self.series if i not in known]:
+                del self.series[instance_id]
+                self.peaks.pop(instance_id, None)
+
+    def samples(self, instance_id):
+        with self._lock:
+            return list(self.series.get(instance_id, ()))
+
+    def latest(self, instance_id):
+        with self._lock:
+            series = self.series.get(instance_id)
+            return series[-1] if series else None
+
+    def peak_rss(self, instance_id):
+        with self._lock:
+            return self.peaks.get(instance_id)
+
+    def export(self, instance, path):
+        # CSV for spreadsheets, JSON (with the launch's -Xmx) when the path ends in .json
+        samples = self.samples(instance.id)
+        tmp = path + '.tmp'
+        if path.lower().endswith('.json'):
+            with open(tmp, 'w') as f:
+                json.dump({'instance': instance.id, 'name': instance.name, 'heap_limit': heap_limit(instance.command),
+                           'peak_rss': self.peak_rss(instance.id), 'interval': self.interval,
+                           'samples': samples}, f)
+        else:
+            with open(tmp, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(samples)
+        os.replace(tmp, path)
+        return len(samples)
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import struct
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+OPTIMIZER_VERSION = 1
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Ancillary chunks that carry no pixel data and can be dropped losslessly
+PNG_DROP_CHUNKS = {b'tEXt', b'zTXt', b'iTXt', b'tIME'}
+JSON_SUFFIXES = ('.json', '.mcmeta')
+# Already-compressed formats are stored, so the game does not inflate them twice
+STORED_SUFFIXES = ('.png', '.ogg')
+TEXT_LEVEL = 6
+# Optimized entries kept across runs; least recently used ones go first
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def png_chunks(data):
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        length, = struct.unpack('>I', data[pos:pos + 4])
+        kind = data[pos + 4:pos + 8]
+        yield kind, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b'IEND':
+            break
+
+
+def png_chunk(kind, body):
+    return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body) & 0xFFFFFFFF)
+
+
+def optimize_png(data):
+    # Re-deflates the image data at maximum effort and strips metadata chunks;
+    # the decoded pixels are identical
+    if not data.startswith(PNG_SIGNATURE):
+        return data
+    chunks = list(png_chunks(data))
+    idat = b''.join(body for kind, body in chunks if kind == b'IDAT')
+    raw = zlib.decompress(idat)
+    best = idat
+    for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+        candidate = compressor.compress(raw) + compressor.flush()
+        if len(candidate) < len(best):
+            best = candidate
+    out = [PNG_SIGNATURE]
+    wrote_idat = False
+    for kind, body in chunks:
+        if kind in PNG_DROP_CHUNKS:
+            continue
+        if kind == b'IDAT':
+            if not wrote_idat:
+                out.append(png_chunk(b'IDAT', best))
+                wrote_idat = True
+            continue
+        out.append(png_chunk(kind, body))
+    result = b''.join(out)
+    return result if len(result) < len(data) else data
+
+
+def minify_json(data):
+    text = data.decode('utf-8-sig')
+    result = json.dumps(json.loads(text), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return result if len(result) < len(data) else data
+
+
+def optimize_entry(args):
+    name, data = args
+    lower = name.lower()
+    try:
+        if lower.endswith('.png'):
+            return optimize_png(data)
+        if lower.endswith(JSON_SUFFIXES):
+            return minify_json(data)
+    except (ValueError, zlib.error, struct.error):
+        pass
+    return data
+
+
+def read_all(path):
+    # Stand-in for the game's resource reload: open the pack and inflate every entry
+    start = time.perf_counter()
+    with zipfile.ZipFile(path) as pack:
+        for info in pack.infolist():
+            pack.read(info)
+    return time.perf_counter() - start
+
+
+class PackOptimizer:
+    # Rewrites a resource pack zip next to the original. Each distinct entry
+    # (by SHA-1) is optimized once per run and remembered in an on-disk cache
+    # keyed by its input hash, so re-running on an updated pack only
+    # recompresses what changed. The cache is trimmed to max_cache_bytes after
+    # each run, oldest use first (a hit refreshes the entry's mtime).
+    def __init__(self, cache_dir, workers=None, max_cache_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.max_cache_bytes = max_cache_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def cache_path(self, digest):
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.v{OPTIMIZER_VERSION}")
+
+    def unchanged_path(self, digest):
+        # Empty marker for entries the optimizer could not shrink, so the
+        # cache does not hold a second copy of the original bytes
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.same.v{OPTIMIZER_VERSION}")
+
+    def prune(self):
+        # Entries from older optimizer versions are dropped outright
+        suffix = f".v{OPTIMIZER_VERSION}"
+        entries = []
+        removed = freed = 0
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if filename.endswith(suffix):
+                    entries.append((st.st_mtime, st.st_size, path))
+                    continue
+                os.remove(path)
+                removed += 1
+                freed += st.st_size
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_cache_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def output_path(self, path):
+        root, ext = os.path.splitext(path)
+        return f"{root}-optimized{ext or '.zip'}"
+
+    def optimize(self, path, output=None, log=None):
+        log = log or (lambda message: None)
+        output = output or self.output_path(path)
+        with zipfile.ZipFile(path) as pack:
+            entries = [(info, pack.read(info)) for info in pack.infolist() if not info.is_dir()]
+
+        by_digest = {}
+        order = []
+        for info, data in entries:
+            digest = hashlib.sha1(data).hexdigest()
+            order.append((info, digest))
+            by_digest.setdefault(digest, (info.filename, data))
+
+        results = {}
+        todo = []
+        for digest, (name, data) in by_digest.items():
+            cached = self.cache_path(digest)
+            try:
+                with open(cached, 'rb') as f:
+                    results[digest] = f.read()
+                os.utime(cached)
+                continue
+            except OSError:
+                pass
+            try:
+                os.utime(self.unchanged_path(digest))
+                results[digest] = data
+            except OSError:
+                todo.append(digest)
+
+        if todo:
+            jobs = [by_digest[digest] for digest in todo]
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                for digest, data in zip(todo, executor.map(optimize_entry, jobs, chunksize=16)):
+                    original = by_digest[digest][1]
+                    shrunk = len(data) < len(original)
+                    results[digest] = data if shrunk else original
+                    cached = self.cache_path(digest) if shrunk else self.unchanged_path(digest)
+                    os.makedirs(os.path.dirname(cached), exist_ok=True)
+                    with open(cached, 'wb') as f:
+                        if shrunk:
+                            f.write(data)
+
+        tmp = output + '.tmp'
+        with zipfile.ZipFile(tmp, 'w') as out:
+            for info, digest in order:
+                if info.filename.lower().endswith(STORED_SUFFIXES):
+                    out.writestr(info.filename, results[digest], compress_type=zipfile.ZIP_STORED)
+                else:
+                    out.writestr(info.filename, results[digest], compress_type=zipfile.ZIP_DEFLATED,
+                                 compresslevel=TEXT_LEVEL)
+        os.replace(tmp, output)
+        pruned, freed = self.prune()
+
+        report = {
+            'input': path,
+            'output': output,
+            'entries': len(entries),
+            'unique': len(by_digest),
+            'duplicates': len(entries) - len(by_digest),
+            'optimized': len(todo),
+            'cached': len(by_digest) - len(todo),
+            'pruned': pruned,
+            'pruned_bytes': freed,
+            'before_bytes': os.path.getsize(path),
+            'after_bytes': os.path.getsize(output),
+            'before_read': read_all(path),
+            'after_read': read_all(output),
+        }
+        log(f"Optimized {os.path.basename(path)}: {report['before_bytes'] / 1048576:.1f} MiB -> "
+            f"{report['after_bytes'] / 1048576:.1f} MiB, load {report['before_read'] * 1000:.0f} ms -> "
+            f"{report['after_read'] * 1000:.0f} ms ({report['duplicates']} duplicate files, "
+            f"{report['cached']} from cache)" +
+            (f", {pruned} old cache entries removed ({freed / 1048576:.1f} MiB)" if pruned else ""))
+        return report
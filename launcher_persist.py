@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+import zlib
+
+
+def write_atomic(path, text):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class JournaledJSON:
+    # A JSON document (dict or list) persisted as a snapshot plus an
+    # append-only journal of changes. Changes are applied in memory at once
+    # and written behind: bursts within `delay` seconds become one journal
+    # append, and once the journal holds `compact_after` entries the snapshot
+    # is rewritten atomically (temp file + rename) and the journal truncated.
+    # The snapshot keeps the plain JSON layout, so older files still load; the
+    # journal starts with the CRC of the snapshot it applies to, so a crash
+    # between rewriting the snapshot and removing the journal replays nothing.
+    def __init__(self, path, default, delay=0.5, compact_after=500):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.default = default
+        self.delay = delay
+        self.compact_after = compact_after
+        self._data = None
+        self._pending = []
+        self._journal_entries = 0
+        self._base_crc = 0
+        self._timer = None
+        self._lock = threading.RLock()
+
+    @property
+    def data(self):
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._load()
+        return self._data
+
+    def _load(self):
+        data = json.loads(json.dumps(self.default))
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            self._base_crc = zlib.crc32(raw)
+            loaded = json.loads(raw.decode('utf-8'))
+            if isinstance(data, dict):
+                data.update(loaded)
+            else:
+                data = loaded
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb') as f:
+                raw = f.read()
+            lines = raw.split(b'\n')
+            try:
+                base = json.loads(lines[0].decode('utf-8'))
+            except ValueError:
+                base = None
+            if base != ['base', self._base_crc] or len(lines) == 1:
+                # Left over from before the last compaction, or torn in its first line
+                os.remove(self.journal_path)
+                return data
+            good = len(lines[0]) + 1
+            for line in lines[1:]:
+                if good + len(line) >= len(raw) and not raw.endswith(b'\n'):
+                    # Final line without its newline: the append was torn by a crash
+                    break
+                try:
+                    op = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    break
+                self._apply(data, op)
+                self._journal_entries += 1
+                good += len(line) + 1
+            if good < len(raw):
+                # Cut the torn tail off so later appends start on a clean line
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(good)
+        return data
+
+    @staticmethod
+    def _target(data, key):
+        return data if key is None else data[key]
+
+    def _apply(self, data, op):
+        kind, key = op[0], op[1]
+        if kind == 'set':
+            data[key] = op[2]
+        elif kind == 'append':
+            self._target(data, key).append(op[2])
+        elif kind == 'delete':
+            del self._target(data, key)[op[2]]
+        elif kind == 'replace':
+            self._target(data, key)[op[2]] = op[3]
+
+    def _record(self, op):
+        with self._lock:
+            self._apply(self.data, op)
+            self._pending.append(json.dumps(op))
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def set(self, key, value):
+        self._record(['set', key, value])
+
+    def append(self, key, item):
+        # key None addresses the document itself when it is a list
+        self._record(['append', key, item])
+
+    def delete(self, key, index):
+        self._record(['delete', key, index])
+
+    def replace(self, key, index, item):
+        self._record(['replace', key, index, item])
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            if self._journal_entries + len(self._pending) >= self.compact_after:
+                self.compact()
+                return
+            with open(self.journal_path, 'a') as f:
+                if f.tell() == 0:
+                    f.write(json.dumps(['base', self._base_crc]) + '\n')
+                f.write('\n'.join(self._pending) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_entries += len(self._pending)
+            self._pending = []
+
+    def compact(self):
+        with self._lock:
+            text = json.dumps(self.data)
+            write_atomic(self.path, text)
+            self._base_crc = zlib.crc32(text.encode('utf-8'))
+            self._pending = []
+            self._journal_entries = 0
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
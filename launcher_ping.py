@@ -0,0 +1,208 @@
+import asyncio
+import json
+import struct
+import threading
+import time
+
+DEFAULT_PORT = 25565
+PROTOCOL_VERSION = 47
+# 1.6.4, the last release before the 1.7 status protocol
+LEGACY_PROTOCOL_VERSION = 78
+
+
+def parse_address(address):
+    host, _, port = address.strip().rpartition(':')
+    if not host or not port.isdigit():
+        return address.strip(), DEFAULT_PORT
+    return host.strip('[]'), int(port)
+
+
+def pack_varint(value):
+    out = bytearray()
+    value &= 0xFFFFFFFF
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def pack_string(text):
+    data = text.encode('utf-8')
+    return pack_varint(len(data)) + data
+
+
+def pack_packet(packet_id, payload=b''):
+    body = pack_varint(packet_id) + payload
+    return pack_varint(len(body)) + body
+
+
+async def read_varint(reader):
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value
+    raise ValueError("VarInt too long")
+
+
+def unpack_varint(data, pos=0):
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+    raise ValueError("VarInt too long")
+
+
+def flatten_motd(description):
+    if isinstance(description, str):
+        return description
+    if isinstance(description, dict):
+        return description.get('text', '') + ''.join(flatten_motd(e) for e in description.get('extra', []))
+    if isinstance(description, list):
+        return ''.join(flatten_motd(e) for e in description)
+    return ''
+
+
+async def modern_status(host, port):
+    # Server List Ping: handshake, status request, then ping/pong for latency
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        handshake = (pack_varint(PROTOCOL_VERSION) + pack_string(host)
+                     + struct.pack('>H', port) + pack_varint(1))
+        writer.write(pack_packet(0x00, handshake) + pack_packet(0x00))
+        await writer.drain()
+
+        length = await read_varint(reader)
+        data = await reader.readexactly(length)
+        packet_id, pos = unpack_varint(data)
+        if packet_id != 0x00:
+            raise ValueError(f"Unexpected packet {packet_id:#x}")
+        text_length, pos = unpack_varint(data, pos)
+        status = json.loads(data[pos:pos + text_length].decode('utf-8'))
+
+        start = time.perf_counter()
+        writer.write(pack_packet(0x01, struct.pack('>q', int(start * 1000))))
+        await writer.drain()
+        length = await read_varint(reader)
+        await reader.readexactly(length)
+        return status, (time.perf_counter() - start) * 1000
+    finally:
+        writer.close()
+
+
+def pack_legacy_string(text):
+    return struct.pack('>H', len(text)) + text.encode('utf-16-be')
+
+
+def parse_legacy_status(text):
+    # 1.4-1.6: "\xa71\0protocol\0version\0motd\0online\0max"; older: "motd\xa7online\xa7max"
+    if text.startswith('\xa71\x00'):
+        _, _, version, motd, online, players_max = text.split('\x00')[:6]
+    else:
+        motd, online, players_max = text.rsplit('\xa7', 2)
+        version = ''
+    return {'version': {'name': version}, 'description': motd,
+            'players': {'online': int(online), 'max': int(players_max)}}
+
+
+async def legacy_status(host, port):
+    # Pre-1.7 servers only know the 0xFE ping, answered with a 0xFF kick packet
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        start = time.perf_counter()
+        payload = bytes([LEGACY_PROTOCOL_VERSION]) + pack_legacy_string(host) + struct.pack('>i', port)
+        writer.write(b'\xfe\x01\xfa' + pack_legacy_string('MC|PingHost')
+                     + struct.pack('>H', len(payload)) + payload)
+        await writer.drain()
+        header = await reader.readexactly(3)
+        if header[0] != 0xFF:
+            raise ValueError(f"Unexpected packet {header[0]:#x}")
+        length = struct.unpack('>H', header[1:])[0]
+        text = (await reader.readexactly(length * 2)).decode('utf-16-be')
+        return parse_legacy_status(text), (time.perf_counter() - start) * 1000
+    finally:
+        writer.close()
+
+
+async def ping(address, timeout=3.0):
+    host, port = parse_address(address)
+    result = {'address': address, 'online': False, 'latency_ms': None, 'players_online': None,
+              'players_max': None, 'motd': '', 'version': '', 'legacy': False, 'error': None}
+    try:
+        async def exchange():
+            try:
+                return (await modern_status(host, port)) + (False,)
+            except (ValueError, asyncio.IncompleteReadError, ConnectionResetError):
+                # The server hung up on or garbled the modern handshake; it may predate 1.7
+                return (await legacy_status(host, port)) + (True,)
+
+        status, latency, legacy = await asyncio.wait_for(exchange(), timeout)
+        players = status.get('players', {})
+        result.update(online=True, latency_ms=round(latency, 1), legacy=legacy,
+                      players_online=players.get('online'), players_max=players.get('max'),
+                      motd=flatten_motd(status.get('description', '')).strip(),
+                      version=status.get('version', {}).get('name', ''))
+    except asyncio.TimeoutError:
+        result['error'] = 'timeout'
+    except Exception as e:
+        result['error'] = str(e) or type(e).__name__
+    return result
+
+
+async def ping_all(addresses, timeout=3.0, concurrency=256):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(address):
+        async with semaphore:
+            return await ping(address, timeout)
+
+    return await asyncio.gather(*(bounded(address) for address in addresses))
+
+
+class ServerPinger:
+    # Pings many servers at once on a private event loop thread and keeps the
+    # answers in a TTL cache keyed by address.
+    def __init__(self, ttl=30.0, timeout=3.0, concurrency=256):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.cache = {}
+        self._lock = threading.Lock()
+
+    def cached(self, address):
+        with self._lock:
+            entry = self.cache.get(address)
+        if entry and time.time() - entry[0] <= self.ttl:
+            return entry[1]
+        return None
+
+    def stale(self, addresses):
+        return [a for a in dict.fromkeys(addresses) if self.cached(a) is None]
+
+    def ping(self, addresses, force=False):
+        todo = list(dict.fromkeys(addresses)) if force else self.stale(addresses)
+        if todo:
+            loop = asyncio.new_event_loop()
+            try:
+                results = loop.run_until_complete(ping_all(todo, self.timeout, self.concurrency))
+            finally:
+                loop.close()
+            now = time.time()
+            with self._lock:
+                for result in results:
+                    self.cache[result['address']] = (now, result)
+        with self._lock:
+            return {a: self.cache[a][1] for a in addresses if a in self.cache}
+
+    def ping_async(self, addresses, callback, force=False):
+        def task():
+            callback(self.ping(addresses, force))
+        threading.Thread(target=task, daemon=True).start()
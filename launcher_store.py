@@ -0,0 +1,166 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import uuid
+
+from launcher_install import build_plan
+
+CHUNK_SIZE = 1024 * 1024
+FICLONE = 0x40049409
+
+
+def default_store_dir():
+    return os.path.join(os.getenv('APPDATA') or os.path.expanduser('~'), '.catstore')
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def reflink(src, dst):
+    # Copy-on-write clone; only attempted on Linux filesystems that support it
+    if not sys.platform.startswith('linux'):
+        raise OSError("reflink not supported on this platform")
+    import fcntl
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dst)
+            raise
+
+
+def place(src, dst):
+    # Hardlink, then reflink, then plain copy. Returns the method used.
+    # os.link needs a name that does not exist yet, so no mkstemp; the suffix
+    # keeps concurrent placements of the same file from sharing a temp
+    tmp = f"{dst}.{os.getpid()}-{uuid.uuid4().hex[:12]}.store-tmp"
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    method = 'hardlink'
+    try:
+        try:
+            os.link(src, tmp)
+        except OSError:
+            try:
+                reflink(src, tmp)
+                method = 'reflink'
+            except OSError:
+                shutil.copyfile(src, tmp)
+                method = 'copy'
+        os.replace(tmp, dst)
+    finally:
+        # Also covers a dst that already was a hardlink to src: rename() between
+        # two names of the same file is a no-op and leaves tmp in place
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    return method
+
+
+class ContentStore:
+    def __init__(self, root=None):
+        self.root = root or default_store_dir()
+        self.objects_dir = os.path.join(self.root, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def object_path(self, sha1):
+        return os.path.join(self.objects_dir, sha1[:2], sha1)
+
+    def has(self, sha1):
+        return os.path.exists(self.object_path(sha1))
+
+    def discard(self, sha1):
+        try:
+            os.remove(self.object_path(sha1))
+        except FileNotFoundError:
+            pass
+
+    def link_into(self, sha1, dest):
+        return place(self.object_path(sha1), dest)
+
+    def adopt(self, path, sha1=None):
+        # Move a file's content into the store and make path point at it
+        sha1 = sha1 or file_sha1(path)
+        obj = self.object_path(sha1)
+        if not os.path.exists(obj):
+            place(path, obj)
+            return sha1
+        if os.path.samefile(obj, path):
+            return sha1
+        self.link_into(sha1, path)
+        return sha1
+
+    def adopt_tree(self, minecraft_dir, log=None):
+        # Deduplicate an existing launcher directory's libraries and asset objects
+        adopted = 0
+        saved = 0
+        roots = [os.path.join(minecraft_dir, 'libraries'), os.path.join(minecraft_dir, 'assets', 'objects')]
+        for root in roots:
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    if name.endswith('.part'):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    sha1 = file_sha1(path)
+                    had = self.has(sha1)
+                    if os.stat(path).st_nlink > 1 and had and os.path.samefile(path, self.object_path(sha1)):
+                        continue
+                    self.adopt(path, sha1)
+                    adopted += 1
+                    if had:
+                        saved += os.path.getsize(path)
+        if log:
+            log(f"Store: adopted {adopted} files from {minecraft_dir}, {saved / 1048576:.1f} MiB deduplicated")
+        return adopted, saved
+
+    def referenced(self, minecraft_dirs):
+        # SHA-1s of every file any installed version in any launcher directory needs
+        refs = set()
+        for minecraft_dir in minecraft_dirs:
+            for json_path in glob.glob(os.path.join(minecraft_dir, 'versions', '*', '*.json')):
+                try:
+                    with open(json_path) as f:
+                        version_json = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                asset_index = None
+                info = version_json.get('assetIndex')
+                if info:
+                    index_path = os.path.join(minecraft_dir, 'assets', 'indexes', f"{info['id']}.json")
+                    if os.path.exists(index_path):
+                        with open(index_path) as f:
+                            asset_index = json.load(f)
+                for item in build_plan(version_json, minecraft_dir, asset_index):
+                    if item.sha1:
+                        refs.add(item.sha1)
+                    elif os.path.exists(item.path):
+                        refs.add(file_sha1(item.path))
+        return refs
+
+    def gc(self, minecraft_dirs, log=None):
+        refs = self.referenced(minecraft_dirs)
+        removed = 0
+        freed = 0
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for name in filenames:
+                if name in refs:
+                    continue
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                # Bytes are only freed when no launcher directory still links to them
+                if st.st_nlink <= 1:
+                    freed += st.st_size
+                os.remove(path)
+                removed += 1
+        if log:
+            log(f"Store: removed {removed} unreferenced objects, freed {freed / 1048576:.1f} MiB")
+        return removed, freed
@@ -0,0 +1,229 @@
+import itertools
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Windows priority classes standing in for POSIX nice levels
+IDLE_PRIORITY_CLASS = 0x40
+BELOW_NORMAL_PRIORITY_CLASS = 0x4000
+ABOVE_NORMAL_PRIORITY_CLASS = 0x8000
+
+
+def parse_cpu_set(text):
+    # "0-3,8" -> {0, 1, 2, 3, 8}; empty means no restriction
+    cpus = set()
+    for part in (text or '').replace(' ', '').split(','):
+        if not part:
+            continue
+        if '-' in part:
+            low, high = part.split('-', 1)
+            cpus.update(range(int(low), int(high) + 1))
+        else:
+            cpus.add(int(part))
+    available = os.cpu_count() or 1
+    return {cpu for cpu in cpus if cpu < available} or None
+
+
+def lowest_nice():
+    # Negative nice needs root (or RLIMIT_NICE headroom) on POSIX; Windows maps it to a priority class
+    if sys.platform == 'win32' or os.geteuid() == 0:
+        return -20
+    try:
+        import resource
+        limit = resource.getrlimit(resource.RLIMIT_NICE)[0]
+    except (ImportError, AttributeError, OSError):
+        return 0
+    if limit == resource.RLIM_INFINITY:
+        return -20
+    return max(-20, min(0, 20 - limit))
+
+
+def clamp_nice(nice):
+    return max(lowest_nice(), min(19, int(nice)))
+
+
+def format_cpu_set(cpus):
+    return ','.join(str(cpu) for cpu in sorted(cpus)) if cpus else 'all'
+
+
+def windows_priority_class(nice):
+    if nice >= 10:
+        return IDLE_PRIORITY_CLASS
+    if nice > 0:
+        return BELOW_NORMAL_PRIORITY_CLASS
+    if nice < 0:
+        return ABOVE_NORMAL_PRIORITY_CLASS
+    return 0
+
+
+class GameInstance:
+    def __init__(self, instance_id, name, command, cwd=None, affinity=None, nice=0,
+                 on_start=None, on_line=None, on_exit=None):
+        self.id = instance_id
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.affinity = affinity
+        # What the OS will accept, so the instance list shows the value in effect
+        self.nice = clamp_nice(nice)
+        self.on_start = on_start
+        self.on_line = on_line
+        self.on_exit = on_exit
+        self.process = None
+        self.started = None
+        self.ended = None
+        self.exit_code = None
+        self.restarts = 0
+        self.extra = {}
+        self._reader = None
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    @property
+    def uptime(self):
+        if self.started is None:
+            return 0.0
+        return (self.ended or time.time()) - self.started
+
+    @property
+    def status(self):
+        if self.running:
+            return 'running'
+        if self.exit_code is None:
+            return 'starting'
+        return 'exited'
+
+    def _preexec(self):
+        # Runs in the child before exec, so every JVM thread inherits the limits
+        if self.affinity and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, self.affinity)
+        if self.nice:
+            try:
+                os.nice(self.nice)
+            except OSError:
+                # Start at normal priority rather than fail the launch
+                pass
+
+    def _apply_windows_affinity(self):
+        if not self.affinity:
+            return
+        import ctypes
+        mask = sum(1 << cpu for cpu in self.affinity)
+        ctypes.windll.kernel32.SetProcessAffinityMask(int(self.process._handle), mask)
+
+    def start(self):
+        kwargs = {
+            'stdout': subprocess.PIPE,
+            'stderr': subprocess.STDOUT,
+            'universal_newlines': True,
+            'cwd': self.cwd,
+        }
+        if sys.platform == 'win32':
+            kwargs['creationflags'] = windows_priority_class(self.nice)
+        elif self.affinity or self.nice:
+            # Only when needed: preexec_fn runs Python in the forked child of a
+            # threaded process, and without it subprocess can use posix_spawn/vfork.
+            # Setting the limits on the pid after spawn would miss threads the
+            # JVM has already started, since both are per thread on Linux
+            kwargs['preexec_fn'] = self._preexec
+        self.exit_code = None
+        self.ended = None
+        try:
+            self.process = subprocess.Popen(self.command, **kwargs)
+        except (OSError, subprocess.SubprocessError):
+            # Missing java or a bad cwd: mark the instance exited, open nothing
+            self.process = None
+            self.exit_code = -1
+            self.ended = self.started = time.time()
+            raise
+        self.started = time.time()
+        if sys.platform == 'win32':
+            self._apply_windows_affinity()
+        # Output is only read below, so on_start still runs before the first line
+        if self.on_start:
+            try:
+                self.on_start(self)
+            except Exception:
+                self.process.kill()
+                self.exit_code = self.process.wait()
+                self.ended = time.time()
+                raise
+        self._reader = threading.Thread(target=self._pump, args=(self.process,), daemon=True)
+        self._reader.start()
+
+    def _pump(self, process):
+        for line in iter(process.stdout.readline, ''):
+            if self.on_line:
+                self.on_line(self, line.rstrip('\r\n'))
+        exit_code = process.wait()
+        if process is self.process:
+            self.exit_code = exit_code
+            self.ended = time.time()
+        if self.on_exit:
+            self.on_exit(self, exit_code)
+
+    def kill(self, timeout=5.0):
+        if not self.running:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def wait(self, timeout=None):
+        # Blocks until the output has been drained and on_exit has run
+        if self._reader is not None:
+            self._reader.join(timeout)
+        return self.exit_code
+
+    def restart(self):
+        self.kill()
+        if self._reader is not None:
+            self._reader.join(5.0)
+        self.restarts += 1
+        self.start()
+
+
+class Supervisor:
+    # Tracks every game process the launcher starts
+    def __init__(self):
+        self.instances = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def launch(self, name, command, **kwargs):
+        instance = GameInstance(next(self._ids), name, command, **kwargs)
+        with self._lock:
+            self.instances[instance.id] = instance
+        instance.start()
+        return instance
+
+    def get(self, instance_id):
+        with self._lock:
+            return self.instances.get(instance_id)
+
+    def list(self):
+        with self._lock:
+            return list(self.instances.values())
+
+    def remove(self, instance_id):
+        with self._lock:
+            instance = self.instances.get(instance_id)
+            if instance is None or instance.running:
+                return False
+            del self.instances[instance_id]
+            return True
+
+    def kill_all(self):
+        for instance in self.list():
+            instance.kill()
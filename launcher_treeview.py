@@ -0,0 +1,69 @@
+PAGE_ROWS = 200
+# Insert the next page once the view is scrolled past this fraction
+PREFETCH_AT = 0.9
+
+
+class LazyTreeview:
+    # Keeps a ttk.Treeview in sync with a list of (iid, values) rows. Only the
+    # rows scrolled within reach are inserted into the widget, and set_rows
+    # applies the difference against what is already shown instead of
+    # clearing and repopulating, so a refresh costs what changed, not the
+    # length of the list.
+    def __init__(self, tree, scrollbar=None, page=PAGE_ROWS):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.page = page
+        self.rows = []
+        self.positions = {}
+        self.shown = []
+        self.values = {}
+        self._pending = False
+        tree.configure(yscrollcommand=self._on_scroll)
+        if scrollbar is not None:
+            scrollbar.configure(command=tree.yview)
+
+    def set_rows(self, rows):
+        self.rows = [(str(iid), tuple(values)) for iid, values in rows]
+        self.positions = {iid: i for i, (iid, _) in enumerate(self.rows)}
+        # Keep however many rows the user had already scrolled through
+        self._sync(min(len(self.rows), max(self.page, len(self.shown))))
+
+    def index(self, iid):
+        return self.positions.get(iid)
+
+    def selection(self):
+        return self.tree.selection()
+
+    def _sync(self, count):
+        wanted = self.rows[:count]
+        keep = {iid for iid, _ in wanted}
+        stale = [iid for iid in self.shown if iid not in keep]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self.values[iid]
+            self.shown = [iid for iid in self.shown if iid in keep]
+
+        for pos, (iid, values) in enumerate(wanted):
+            if iid not in self.values:
+                self.tree.insert('', pos, iid=iid, values=values)
+                self.shown.insert(pos, iid)
+            else:
+                if self.shown[pos] != iid:
+                    self.tree.move(iid, '', pos)
+                    self.shown.remove(iid)
+                    self.shown.insert(pos, iid)
+                if self.values[iid] != values:
+                    self.tree.item(iid, values=values)
+            self.values[iid] = values
+
+    def _on_scroll(self, first, last):
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if float(last) >= PREFETCH_AT and len(self.shown) < len(self.rows) and not self._pending:
+            self._pending = True
+            self.tree.after_idle(self._load_more)
+
+    def _load_more(self):
+        self._pending = False
+        self._sync(min(len(self.rows), len(self.shown) + self.page))
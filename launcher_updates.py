@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from launcher_http import HTTPError, default_pool
+from launcher_mods import MOD_SUFFIXES
+
+UPDATE_INDEX_URL = 'https://api.modrinth.com/v2'
+CACHE_FILE = 'mod_updates.json'
+CACHE_FORMAT = 1
+# How long a project's version list is trusted before it is revalidated
+DEFAULT_TTL = 6 * 3600
+# Jars the index does not know are asked about again after this long
+UNKNOWN_TTL = 24 * 3600
+# Requests in flight at once; matches the shared pool's keep-alive
+# connections per host, and the index allows a few hundred per minute
+MAX_CONCURRENT = 8
+READ_SIZE = 1024 * 1024
+
+
+def sha1_file(path):
+    # hashlib drops the GIL on large buffers, so a thread pool hashes in parallel
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def trim_version(version):
+    # Only what the checker shows or compares, to keep the cache small
+    files = version.get('files') or [{}]
+    primary = next((f for f in files if f.get('primary')), files[0])
+    return {
+        'id': version.get('id'),
+        'project_id': version.get('project_id'),
+        'version_number': version.get('version_number', ''),
+        'date_published': version.get('date_published', ''),
+        'loaders': version.get('loaders', []),
+        'game_versions': version.get('game_versions', []),
+        'filename': primary.get('filename', ''),
+        'url': primary.get('url', ''),
+        'sha1': primary.get('hashes', {}).get('sha1', ''),
+    }
+
+
+class ModUpdateChecker:
+    # Looks up every jar in the mods directory in a Modrinth-compatible update
+    # index. Jars are hashed once per size/mtime; a hash's file record never
+    # changes, so it is cached for good, while each project's version list is
+    # revalidated with If-None-Match once the TTL runs out.
+    def __init__(self, cache_dir, mods_dir, url=UPDATE_INDEX_URL, ttl=DEFAULT_TTL, workers=MAX_CONCURRENT,
+                 pool=None, log=None):
+        self.path = os.path.join(cache_dir, CACHE_FILE)
+        self.mods_dir = mods_dir
+        self.url = url.rstrip('/')
+        self.ttl = ttl
+        self.workers = workers
+        # The launcher-wide pool, so mirrors and the bandwidth cap apply here too
+        self.pool = pool or default_pool()
+        self.log = log or (lambda message: None)
+        self.cache = None
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.cache is None:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if data.get('format') != CACHE_FORMAT:
+                    raise ValueError('old cache format')
+                self.cache = data
+            except (OSError, ValueError):
+                self.cache = {'format': CACHE_FORMAT, 'hashes': {}, 'files': {}, 'projects': {}}
+        return self.cache
+
+    def _save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.cache, f)
+        os.replace(tmp, self.path)
+
+    def hash_mods(self):
+        # {path: sha1}; only jars whose size or mtime changed are read
+        hashes = self.cache['hashes']
+        current = {}
+        changed = []
+        try:
+            files = list(os.scandir(self.mods_dir))
+        except FileNotFoundError:
+            files = []
+        for entry in files:
+            if not entry.is_file() or not entry.name.endswith(MOD_SUFFIXES):
+                continue
+            st = entry.stat()
+            key = [st.st_size, st.st_mtime_ns]
+            cached = hashes.get(entry.path)
+            if cached and cached['key'] == key:
+                current[entry.path] = cached
+            else:
+                changed.append((entry.path, key))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            digests = list(executor.map(sha1_file, [path for path, _ in changed]))
+        for (path, key), digest in zip(changed, digests):
+            current[path] = {'key': key, 'sha1': digest}
+        self.cache['hashes'] = current
+        self.stats['hashed'] = len(changed)
+        return dict((path, entry['sha1']) for path, entry in current.items())
+
+    def _fetch_file(self, digest):
+        url = f"{self.url}/version_file/{digest}?algorithm=sha1"
+        try:
+            version = trim_version(self.pool.get_json(url))
+        except HTTPError as e:
+            if e.status != 404:
+                raise
+            version = None
+        return {'fetched_at': time.time(), 'version': version}
+
+    def _fetch_project(self, query, cached):
+        project_id, loader, game_version = query
+        params = []
+        if loader:
+            params.append('loaders=' + quote(json.dumps([loader])))
+        if game_version:
+            params.append('game_versions=' + quote(json.dumps([game_version])))
+        url = f"{self.url}/project/{project_id}/version" + ('?' + '&'.join(params) if params else '')
+        headers = {'If-None-Match': cached['etag']} if cached and cached.get('etag') else {}
+        with self.pool.get(url, headers=headers, ok=(200, 304)) as response:
+            if response.status == 304:
+                return dict(cached, fetched_at=time.time()), True
+            versions = [trim_version(v) for v in response.json()]
+            return {'fetched_at': time.time(), 'etag': response.headers.get('ETag'), 'versions': versions}, False
+
+    def _run(self, jobs, fetch):
+        # Runs fetch(job) for every job with at most `workers` in flight;
+        # failures are returned in place of results
+        def safe(job):
+            try:
+                return fetch(job)
+            except Exception as e:
+                return e
+
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs))) as executor:
+            return list(executor.map(safe, jobs))
+
+    def check(self, game_version=None, force=False):
+        with self._lock:
+            start = time.perf_counter()
+            cache = self._load()
+            self.stats = {'requests': 0, 'not_modified': 0, 'errors': 0}
+            hashes = self.hash_mods()
+            now = time.time()
+
+            # File records: fetched once per hash, unknown jars retried after UNKNOWN_TTL
+            files = cache['files']
+            wanted = sorted(set(hashes.values()))
+            missing = [d for d in wanted if d not in files or
+                       (files[d]['version'] is None and now - files[d]['fetched_at'] > UNKNOWN_TTL)]
+            for digest, result in zip(missing, self._run(missing, self._fetch_file)):
+                if isinstance(result, Exception):
+                    self.stats['errors'] += 1
+                    self.log(f"Update check failed for {digest[:12]}: {str(result)}")
+                else:
+                    files[digest] = result
+            self.stats['requests'] += len(missing)
+
+            # Version lists: one request per project, loader and game version
+            queries = {}
+            for path, digest in hashes.items():
+                version = files.get(digest, {}).get('version')
+                if version:
+                    loader = version['loaders'][0] if version['loaders'] else ''
+                    target = game_version or (version['game_versions'][-1] if version['game_versions'] else '')
+                    queries[path] = (version['project_id'], loader, target)
+            projects = cache['projects']
+            stale = []
+            for query in sorted(set(queries.values())):
+                cached = projects.get('|'.join(query))
+                if force or not cached or now - cached['fetched_at'] > self.ttl:
+                    stale.append(query)
+            results = self._run(stale, lambda query: self._fetch_project(query, projects.get('|'.join(query))))
+            for query, result in zip(stale, results):
+                if isinstance(result, Exception):
+                    self.stats['errors'] += 1
+                    self.log(f"Update check failed for {query[0]}: {str(result)}")
+                else:
+                    projects['|'.join(query)] = result[0]
+                    self.stats['not_modified'] += result[1]
+            self.stats['requests'] += len(stale)
+
+            # Records for hashes no longer present are dropped with them
+            cache['files'] = dict((d, files[d]) for d in wanted if d in files)
+            used = set('|'.join(query) for query in queries.values())
+            cache['projects'] = dict((k, v) for k, v in projects.items() if k in used)
+            self._save()
+
+            reports = []
+            for path, digest in sorted(hashes.items()):
+                version = cache['files'].get(digest, {}).get('version')
+                report = {'file': os.path.basename(path), 'sha1': digest, 'project_id': '', 'current': '',
+                          'latest': '', 'filename': '', 'url': '', 'status': 'unknown'}
+                if version:
+                    report.update(project_id=version['project_id'], current=version['version_number'])
+                    listing = cache['projects'].get('|'.join(queries[path]))
+                    if listing is None:
+                        report['status'] = 'error'
+                    else:
+                        newest = max(listing['versions'] or [version], key=lambda v: v['date_published'])
+                        outdated = newest['id'] != version['id'] and \
+                            newest['date_published'] > version['date_published']
+                        report.update(latest=newest['version_number'], filename=newest['filename'],
+                                      url=newest['url'], status='outdated' if outdated else 'current')
+                reports.append(report)
+            self.stats['seconds'] = round(time.perf_counter() - start, 3)
+            self.stats['mods'] = len(reports)
+            self.stats['outdated'] = sum(1 for r in reports if r['status'] == 'outdated')
+            return reports
+
+    def summary_text(self):
+        stats = self.stats
+        if not stats.get('mods') and not stats.get('requests'):
+            return ""
+        return (f"{stats.get('outdated', 0)} of {stats.get('mods', 0)} mods outdated, "
+                f"{stats['requests']} requests ({stats['not_modified']} not modified), "
+                f"{stats.get('hashed', 0)} jars hashed, {stats.get('seconds', 0):.1f} s" +
+                (f", {stats['errors']} errors" if stats['errors'] else ""))
@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from launcher_install import build_plan
+from launcher_store import file_sha1
+
+RECORD_FILE = 'verified.json'
+
+
+def hash_file(path):
+    try:
+        return file_sha1(path)
+    except OSError:
+        return None
+
+
+def local_plan(minecraft_dir, version):
+    # The download plan of an installed version, built from the JSONs on disk
+    plan = {}
+    seen = set()
+    current = version
+    while current and current not in seen:
+        seen.add(current)
+        with open(os.path.join(minecraft_dir, 'versions', current, f"{current}.json")) as f:
+            version_json = json.load(f)
+        asset_index = None
+        info = version_json.get('assetIndex')
+        if info:
+            index_path = os.path.join(minecraft_dir, 'assets', 'indexes', f"{info['id']}.json")
+            if os.path.exists(index_path):
+                with open(index_path) as f:
+                    asset_index = json.load(f)
+        for item in build_plan(version_json, minecraft_dir, asset_index):
+            plan.setdefault(item.path, item)
+        current = version_json.get('inheritsFrom')
+    return list(plan.values())
+
+
+class IntegrityVerifier:
+    # Checks library, client jar and asset hashes against the version/asset
+    # index. Files whose size and mtime match the last successful check are
+    # skipped; the rest are hashed across a process pool.
+    def __init__(self, minecraft_dir, record_path=None, workers=None):
+        self.minecraft_dir = minecraft_dir
+        self.record_path = record_path or os.path.join(minecraft_dir, RECORD_FILE)
+        self.workers = workers
+        self.records = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.records is None:
+            try:
+                with open(self.record_path) as f:
+                    self.records = json.load(f)
+            except (OSError, ValueError):
+                self.records = {}
+        return self.records
+
+    def _save(self):
+        tmp = self.record_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.records, f)
+        os.replace(tmp, self.record_path)
+
+    def verify(self, plan):
+        # Returns (broken items, stats)
+        start = time.perf_counter()
+        with self._lock:
+            records = self._load()
+            broken = []
+            to_hash = []
+            for item in plan:
+                try:
+                    st = os.stat(item.path)
+                except OSError:
+                    broken.append(item)
+                    continue
+                if item.size is not None and st.st_size != item.size:
+                    broken.append(item)
+                    continue
+                if not item.sha1:
+                    continue
+                record = records.get(item.path)
+                if record == [st.st_size, st.st_mtime_ns, item.sha1]:
+                    continue
+                to_hash.append((item, st))
+
+            if to_hash:
+                chunksize = max(1, len(to_hash) // 64)
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    digests = executor.map(hash_file, [item.path for item, _ in to_hash], chunksize=chunksize)
+                    for (item, st), digest in zip(to_hash, digests):
+                        if digest == item.sha1:
+                            records[item.path] = [st.st_size, st.st_mtime_ns, item.sha1]
+                        else:
+                            records.pop(item.path, None)
+                            broken.append(item)
+                self._save()
+
+        return broken, {
+            'files': len(plan),
+            'hashed': len(to_hash),
+            'broken': len(broken),
+            'seconds': time.perf_counter() - start,
+        }
+
+    def verify_version(self, version):
+        return self.verify(local_plan(self.minecraft_dir, version))
+
+    def repair(self, broken, installer, store=None):
+        # Drop the broken copies (and a corrupt store object they may share) and fetch them again
+        for item in broken:
+            if store and item.sha1 and store.has(item.sha1):
+                if hash_file(store.object_path(item.sha1)) != item.sha1:
+                    store.discard(item.sha1)
+            if os.path.exists(item.path):
+                os.remove(item.path)
+        return installer.download(broken)
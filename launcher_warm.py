@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+READ_SIZE = 1024 * 1024
+# A version warmed this recently is not read again at launch
+WARM_TTL = 120
+
+
+def command_files(command):
+    # Classpath jars, extracted natives and the asset index named by a launch command
+    files = []
+    args = dict(zip(command, command[1:]))
+    for flag in ('-cp', '-classpath', '--class-path'):
+        if flag in args:
+            files.extend(p for p in args[flag].split(os.pathsep) if p)
+    for arg in command:
+        if arg.startswith('-Djava.library.path='):
+            natives = arg.split('=', 1)[1]
+            if os.path.isdir(natives):
+                files.extend(entry.path for entry in os.scandir(natives) if entry.is_file())
+    if '--assetsDir' in args and '--assetIndex' in args:
+        files.append(os.path.join(args['--assetsDir'], 'indexes', f"{args['--assetIndex']}.json"))
+    return files
+
+
+def version_files(minecraft_dir, version):
+    # Used before a launch command exists: the jars of the version's download
+    # plan plus its asset index, leaving out the asset objects themselves
+    from launcher_verify import local_plan
+    objects = os.path.join(minecraft_dir, 'assets', 'objects')
+    files = [item.path for item in local_plan(minecraft_dir, version) if not item.path.startswith(objects)]
+    seen = set()
+    current = version
+    while current and current not in seen:
+        seen.add(current)
+        with open(os.path.join(minecraft_dir, 'versions', current, f"{current}.json")) as f:
+            data = json.load(f)
+        if data.get('assetIndex'):
+            files.append(os.path.join(minecraft_dir, 'assets', 'indexes', f"{data['assetIndex']['id']}.json"))
+        current = data.get('inheritsFrom')
+    return files
+
+
+def warm_file(path):
+    # The fadvise hint starts readahead; reading the file through makes sure
+    # its pages are resident on filesystems that ignore the hint (NFS, SMB)
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    except OSError:
+        return 0
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        size = 0
+        while True:
+            chunk = os.read(fd, READ_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+        return size
+    except OSError:
+        return 0
+    finally:
+        os.close(fd)
+
+
+class PageCacheWarmer:
+    # Reads a launch's files in parallel so the JVM's class loading hits the
+    # page cache instead of a cold disk. One pass per key runs at a time;
+    # callers arriving meanwhile wait for it and share its result.
+    def __init__(self, workers=8, ttl=WARM_TTL):
+        self.workers = workers
+        self.ttl = ttl
+        self.results = {}
+        self.running = {}
+        self._lock = threading.Lock()
+
+    def warm(self, paths):
+        start = time.perf_counter()
+        paths = list(dict.fromkeys(paths))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            sizes = list(executor.map(warm_file, paths))
+        return {
+            'files': sum(1 for size in sizes if size),
+            'bytes': sum(sizes),
+            'seconds': time.perf_counter() - start,
+            'reused': False,
+        }
+
+    def warm_once(self, key, get_paths):
+        with self._lock:
+            recent = self.results.get(key)
+            if recent and time.time() - recent[0] < self.ttl:
+                return dict(recent[1], reused=True)
+            event = self.running.get(key)
+            owner = event is None
+            if owner:
+                event = self.running[key] = threading.Event()
+        if not owner:
+            event.wait()
+            with self._lock:
+                recent = self.results.get(key)
+            return dict(recent[1], reused=True) if recent else self.warm_once(key, get_paths)
+
+        try:
+            stats = self.warm(get_paths())
+            with self._lock:
+                self.results[key] = (time.time(), stats)
+            return stats
+        finally:
+            with self._lock:
+                del self.running[key]
+            event.set()
+
+    def warm_async(self, key, get_paths, callback=None):
+        def task():
+            try:
+                stats = self.warm_once(key, get_paths)
+            except Exception as e:
+                stats = {'error': str(e)}
+            if callback:
+                callback(stats)
+
+        threading.Thread(target=task, daemon=True).start()
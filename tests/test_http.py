@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from launcher_http import HTTPError, HTTPPool, RateLimiter
+
+BODY = os.urandom(256 * 1024)
+
+
+class StandInServer(BaseHTTPRequestHandler):
+    # Answers every GET with the next status in `statuses` (200 once they
+    # run out); each server class keeps its own request log
+    protocol_version = 'HTTP/1.1'
+    statuses = []
+    hits = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        cls.hits.append(self.path)
+        status = cls.statuses.pop(0) if cls.statuses else 200
+        body = BODY if status == 200 else b'nope'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(statuses=()):
+    handler = type('Handler', (StandInServer,), {'statuses': list(statuses), 'hits': []})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler, f'http://127.0.0.1:{server.server_address[1]}/'
+
+
+class HTTPPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.servers = []
+        self.pool = None
+
+    def tearDown(self):
+        if self.pool:
+            self.pool.close()
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def serve(self, statuses=()):
+        server, handler, url = serve(statuses)
+        self.servers.append(server)
+        return handler, url
+
+    def test_server_errors_and_429_are_retried(self):
+        handler, url = self.serve([503, 429])
+        self.pool = HTTPPool(retries=2)
+        self.assertEqual(self.pool.get_bytes(url + 'file'), BODY)
+        self.assertEqual(len(handler.hits), 3)
+
+    def test_retries_back_off(self):
+        handler, url = self.serve([500, 500])
+        self.pool = HTTPPool(retries=2)
+        start = time.monotonic()
+        self.pool.get_bytes(url + 'file')
+        # Two waits of at least half of 0.5 s and 1 s
+        self.assertGreaterEqual(time.monotonic() - start, 0.75)
+
+    def test_gives_up_after_the_last_retry(self):
+        handler, url = self.serve([500] * 5)
+        self.pool = HTTPPool(retries=1)
+        with self.assertRaises(HTTPError) as caught:
+            self.pool.get_bytes(url + 'file')
+        self.assertEqual(caught.exception.status, 500)
+        self.assertEqual(len(handler.hits), 2)
+
+    def test_client_errors_are_not_retried(self):
+        handler, url = self.serve([404])
+        self.pool = HTTPPool(retries=3)
+        with self.assertRaises(HTTPError):
+            self.pool.get_bytes(url + 'file')
+        self.assertEqual(len(handler.hits), 1)
+
+    def test_failed_origin_hands_over_to_the_mirror(self):
+        origin, origin_url = self.serve([500] * 5)
+        mirror, mirror_url = self.serve()
+        self.pool = HTTPPool(mirrors={origin_url: [mirror_url]}, retries=2)
+        # The unmeasured origin is tried first, then the mirror without waiting
+        start = time.monotonic()
+        self.assertEqual(self.pool.get_bytes(origin_url + 'a/file'), BODY)
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual(origin.hits, ['/a/file'])
+        self.assertEqual(mirror.hits, ['/a/file'])
+
+        # While cooling down the origin is only asked after the mirror
+        self.assertEqual(self.pool.get_bytes(origin_url + 'b/file'), BODY)
+        self.assertEqual(origin.hits, ['/a/file'])
+        self.assertEqual(mirror.hits, ['/a/file', '/b/file'])
+        self.assertIsNotNone(self.pool.mirrors.ranking()[mirror_url])
+
+    def test_mirror_missing_a_file_moves_on(self):
+        origin, origin_url = self.serve()
+        mirror, mirror_url = self.serve([404])
+        self.pool = HTTPPool(mirrors={origin_url: [mirror_url]}, retries=2)
+        # Measured faster than the origin, so it is asked first
+        self.pool.mirrors.record(origin_url, 1 << 20, 1.0)
+        self.pool.mirrors.record(mirror_url, 1 << 20, 0.001)
+        self.assertEqual(self.pool.get_bytes(origin_url + 'file'), BODY)
+        self.assertEqual(len(mirror.hits), 1)
+        self.assertEqual(len(origin.hits), 1)
+
+    def test_bandwidth_cap_applies_to_concurrent_downloads(self):
+        handler, url = self.serve()
+        rate = 512 * 1024
+        self.pool = HTTPPool(max_bytes_per_sec=rate)
+        threads = [threading.Thread(target=self.pool.get_bytes, args=(url + f'file{i}',)) for i in range(3)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Everything beyond the initial burst allowance is paid for at the cap
+        expected = (3 * len(BODY)) / rate - 0.25
+        self.assertGreaterEqual(time.monotonic() - start, expected * 0.9)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_disabled_limiter_never_waits(self):
+        self.assertEqual(RateLimiter(0).consume(10 ** 9), 0.0)
+
+    def test_debt_is_paid_off_at_the_rate(self):
+        limiter = RateLimiter(1000)
+        # The burst allowance (0.25 s worth) is free
+        self.assertEqual(limiter.consume(250), 0.0)
+        self.assertAlmostEqual(limiter.consume(100), 0.1, delta=0.02)
+
+    def test_lowering_the_rate_drops_saved_up_tokens(self):
+        limiter = RateLimiter(1 << 20)
+        limiter.set_rate(1000)
+        self.assertLessEqual(limiter.tokens, 250)
+
+
+if __name__ == '__main__':
+    unittest.main()
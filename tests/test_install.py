@@ -0,0 +1,134 @@
+import hashlib
+import os
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from launcher_http import HTTPPool
+from launcher_install import DownloadItem, InstallError, VersionInstaller
+
+BLOB = os.urandom(300 * 1024)
+
+
+class StandInFiles(BaseHTTPRequestHandler):
+    # Serves BLOB with Range support; `faults` lists what to do to the next
+    # responses: 'cut' stops halfway through the body, 'corrupt' flips a byte
+    protocol_version = 'HTTP/1.1'
+    faults = []
+    ranges = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        fault = self.faults.pop(0) if self.faults else None
+        header = self.headers.get('Range')
+        self.ranges.append(header)
+        start = int(header[len('bytes='):].rstrip('-')) if header else 0
+        if start >= len(BLOB):
+            self.send_response(416)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = BLOB[start:]
+        if fault == 'corrupt':
+            body = bytes([body[0] ^ 0xFF]) + body[1:]
+        self.send_response(206 if header else 200)
+        if header:
+            self.send_header('Content-Range', f"bytes {start}-{len(BLOB) - 1}/{len(BLOB)}")
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if fault == 'cut':
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class VersionInstallerFetchTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        StandInFiles.faults = []
+        StandInFiles.ranges = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInFiles)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.pool = HTTPPool(retries=2)
+        self.installer = VersionInstaller(self.dir.name, pool=self.pool)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.dir.cleanup()
+
+    def item(self, sha1=None):
+        url = f'http://127.0.0.1:{self.server.server_address[1]}/blob'
+        path = os.path.join(self.dir.name, 'libraries', 'blob.jar')
+        return DownloadItem(url, path, sha1 or hashlib.sha1(BLOB).hexdigest(), len(BLOB))
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_existing_part_file_is_resumed_with_a_range_request(self):
+        item = self.item()
+        os.makedirs(os.path.dirname(item.path))
+        with open(item.path + '.part', 'wb') as f:
+            f.write(BLOB[:100000])
+        self.installer.fetch(item)
+        self.assertEqual(StandInFiles.ranges, ['bytes=100000-'])
+        self.assertEqual(self.read(item.path), BLOB)
+        self.assertFalse(os.path.exists(item.path + '.part'))
+
+    def test_broken_off_transfer_continues_where_it_stopped(self):
+        StandInFiles.faults = ['cut']
+        item = self.item()
+        self.installer.fetch(item)
+        self.assertEqual(len(StandInFiles.ranges), 2)
+        self.assertIsNone(StandInFiles.ranges[0])
+        self.assertEqual(StandInFiles.ranges[1], f'bytes={len(BLOB) // 2}-')
+        self.assertEqual(self.read(item.path), BLOB)
+
+    def test_complete_part_file_is_accepted_on_416(self):
+        item = self.item()
+        os.makedirs(os.path.dirname(item.path))
+        with open(item.path + '.part', 'wb') as f:
+            f.write(BLOB)
+        self.installer.fetch(item)
+        self.assertEqual(StandInFiles.ranges, [f'bytes={len(BLOB)}-'])
+        self.assertEqual(self.read(item.path), BLOB)
+
+    def test_checksum_mismatch_downloads_the_file_again(self):
+        StandInFiles.faults = ['corrupt']
+        item = self.item()
+        self.installer.fetch(item)
+        self.assertEqual(StandInFiles.ranges, [None, None])
+        self.assertEqual(self.read(item.path), BLOB)
+
+    def test_concurrent_installs_fetch_a_file_once(self):
+        item = self.item()
+        installers = [VersionInstaller(self.dir.name, pool=self.pool) for _ in range(4)]
+        threads = [threading.Thread(target=installer.fetch, args=(item,)) for installer in installers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(StandInFiles.ranges, [None])
+        self.assertEqual(self.read(item.path), BLOB)
+        self.assertEqual(os.listdir(os.path.dirname(item.path)), ['blob.jar'])
+        self.assertEqual([i.done_bytes for i in installers], [len(BLOB)] * 4)
+
+    def test_gives_up_when_the_checksum_never_matches(self):
+        item = self.item(sha1='0' * 40)
+        with self.assertRaises(InstallError):
+            self.installer.fetch(item)
+        self.assertEqual(len(StandInFiles.ranges), self.pool.retries + 1)
+        self.assertFalse(os.path.exists(item.path))
+        self.assertFalse(os.path.exists(item.path + '.part'))
+        self.assertEqual(self.installer.done_bytes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+
+from launcher_logs import GameLogArchive
+
+
+class GameLogArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.archive = GameLogArchive(self.dir.name)
+        session = self.archive.start_session('1.20.1')
+        for i in range(200):
+            session.write(f"[12:00:00] [Render thread/INFO]: thing {i} ok")
+        session.write("[12:00:01] [Server thread/WARN]: Can't keep up! Is the server overloaded?")
+        session.close()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_numbers_in_the_query_must_match(self):
+        results = self.archive.search('thing 150')
+        self.assertEqual([line for _, _, line in results], ["[12:00:00] [Render thread/INFO]: thing 150 ok"])
+
+    def test_short_tokens_must_match(self):
+        self.assertEqual(len(self.archive.search('thing ok')), 200)
+        self.assertEqual(len(self.archive.search('thing up')), 0)
+        self.assertEqual(len(self.archive.search('keep up')), 1)
+
+    def test_index_terms_still_apply(self):
+        self.assertEqual(len(self.archive.search('level:warn overloaded')), 1)
+        self.assertEqual(len(self.archive.search('level:warn thing')), 0)
+
+    def test_sessions_started_together_keep_their_own_lines(self):
+        first = self.archive.start_session('1.20.1')
+        second = self.archive.start_session('1.20.1')
+        self.assertNotEqual(first.session_id, second.session_id)
+        first.write("[12:00:02] [Render thread/INFO]: from first")
+        second.write("[12:00:02] [Render thread/INFO]: from second")
+        first.close()
+        second.close()
+        self.assertEqual(len(self.archive.search('from first')), 1)
+        self.assertEqual(len(self.archive.search('from second')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
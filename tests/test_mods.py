@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+
+from launcher_mods import ModIndex, read_mod_metadata
+
+
+class ModMetadataTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.mods_dir = os.path.join(self.dir.name, 'mods')
+        os.makedirs(self.mods_dir)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def jar(self, name, entries):
+        path = os.path.join(self.mods_dir, name)
+        with zipfile.ZipFile(path, 'w') as jar:
+            for entry, data in entries.items():
+                jar.writestr(entry, data if isinstance(data, str) else json.dumps(data))
+        return path
+
+    def test_fabric_metadata_that_is_not_an_object(self):
+        meta = read_mod_metadata(self.jar('list.jar', {'fabric.mod.json': [{'id': 'x'}]}))
+        self.assertTrue(meta['error'].startswith('AttributeError'))
+        self.assertEqual(meta['id'], 'list')
+
+    def test_mcmod_dependencies_given_as_objects(self):
+        info = [{'modid': 'old', 'requiredMods': [{'modid': 'lib'}, 'core', 3]}]
+        meta = read_mod_metadata(self.jar('old.jar', {'mcmod.info': info}))
+        self.assertIsNone(meta['error'])
+        self.assertEqual(meta['depends'], ['core', 'lib'])
+
+    def test_only_required_forge_dependencies_are_kept(self):
+        toml = '\n'.join([
+            'modLoader="javafml"', '[[mods]]', 'modId="neo"', 'version="1.0"',
+            '[[dependencies.neo]]', 'modId="lib"', 'type="required"',
+            '[[dependencies.neo]]', 'modId="rival"', 'type="incompatible"',
+            '[[dependencies.neo]]', 'modId="old"', 'type="discouraged"',
+            '[[dependencies.neo]]', 'modId="extra"', 'type="optional"',
+            '[[dependencies.neo]]', 'modId="neoforge"',
+            '[[dependencies.neo]]', 'modId="forge"', 'mandatory=true',
+            '[[dependencies.neo]]', 'modId="jei"', 'mandatory=false',
+        ])
+        meta = read_mod_metadata(self.jar('neo.jar', {'META-INF/neoforge.mods.toml': toml}))
+        self.assertIsNone(meta['error'])
+        self.assertEqual(meta['depends'], ['forge', 'lib', 'neoforge'])
+
+    def test_one_broken_jar_does_not_stop_the_scan(self):
+        self.jar('broken.jar', {'fabric.mod.json': 'not an object'})
+        self.jar('good.jar', {'fabric.mod.json': {'id': 'good', 'version': '1.0', 'depends': {'fabricloader': '*'}}})
+        self.jar('numeric.jar', {'fabric.mod.json': {'id': 42}})
+        mods = ModIndex(self.mods_dir).scan()
+        by_file = dict((mod['file'], mod) for mod in mods)
+        self.assertEqual(by_file['good.jar']['depends'], ['fabricloader'])
+        self.assertIsNotNone(by_file['broken.jar']['error'])
+        self.assertEqual(by_file['numeric.jar']['id'], '42')
+
+
+if __name__ == '__main__':
+    unittest.main()
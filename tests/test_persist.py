@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+
+from launcher_persist import JournaledJSON
+
+
+class JournaledJSONTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'settings.json')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def open(self):
+        return JournaledJSON(self.path, {'x': None, 'y': None}, delay=60)
+
+    def test_changes_survive_reload(self):
+        store = self.open()
+        store.set('x', 1)
+        store.flush()
+        self.assertEqual(self.open().data['x'], 1)
+
+    def test_torn_line_does_not_swallow_later_changes(self):
+        store = self.open()
+        store.set('x', 1)
+        store.flush()
+        # A crash in the middle of an append leaves half a line behind
+        with open(store.journal_path, 'a') as f:
+            f.write(json.dumps(['set', 'y', 'lost'])[:7])
+
+        store = self.open()
+        self.assertEqual(store.data['x'], 1)
+        self.assertIsNone(store.data['y'])
+        store.set('x', 2)
+        store.set('y', 3)
+        store.flush()
+
+        reloaded = self.open().data
+        self.assertEqual(reloaded['x'], 2)
+        self.assertEqual(reloaded['y'], 3)
+
+    def test_torn_first_line_starts_a_fresh_journal(self):
+        store = self.open()
+        store.compact()
+        with open(store.journal_path, 'w') as f:
+            f.write('["ba')
+        store = self.open()
+        store.set('x', 1)
+        store.flush()
+        self.assertEqual(self.open().data['x'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import socket
+import socketserver
+import struct
+import threading
+import time
+import unittest
+
+from launcher_ping import ServerPinger, pack_packet, pack_string, ping, ping_all, unpack_varint
+
+STATUS = {'version': {'name': '1.20.1', 'protocol': 763}, 'players': {'online': 3, 'max': 20},
+          'description': {'text': 'A ', 'extra': [{'text': 'cat'}, {'text': ' server'}]}}
+
+
+def read_varint(rfile):
+    data = b''
+    while True:
+        byte = rfile.read(1)
+        if not byte:
+            raise EOFError
+        data += byte
+        if not byte[0] & 0x80:
+            return unpack_varint(data)[0]
+
+
+class ModernServer(socketserver.BaseRequestHandler):
+    # 1.7+ status protocol: handshake, status request, then echoes the ping
+    handshakes = []
+    requests = []
+
+    def handle(self):
+        rfile = self.request.makefile('rb')
+        handshake = rfile.read(read_varint(rfile))
+        packet_id, pos = unpack_varint(handshake)
+        protocol, pos = unpack_varint(handshake, pos)
+        length, pos = unpack_varint(handshake, pos)
+        host = handshake[pos:pos + length].decode('utf-8')
+        port = struct.unpack('>H', handshake[pos + length:pos + length + 2])[0]
+        next_state, _ = unpack_varint(handshake, pos + length + 2)
+        self.handshakes.append((packet_id, protocol, host, port, next_state))
+        self.requests.append(rfile.read(read_varint(rfile)))
+        self.request.sendall(pack_packet(0x00, pack_string(json.dumps(STATUS))))
+        ping_packet = rfile.read(read_varint(rfile))
+        self.request.sendall(pack_packet(0x01, ping_packet[1:]))
+
+
+class LegacyServer(socketserver.BaseRequestHandler):
+    # A 1.6 server: kicks anything but the 0xFE ping, which it answers with
+    # the status fields in the kick message
+    reply = '\xa71\x0078\x001.6.4\x00Old times\x005\x0010'
+    requests = []
+
+    def handle(self):
+        data = self.request.recv(1024)
+        self.requests.append(data[:1])
+        text = self.reply if data[:2] == b'\xfe\x01' else 'Outdated client!'
+        self.request.sendall(b'\xff' + struct.pack('>H', len(text)) + text.encode('utf-16-be'))
+
+
+class SilentServer(socketserver.BaseRequestHandler):
+    def handle(self):
+        time.sleep(1.0)
+
+
+def serve(handler):
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'127.0.0.1:{server.server_address[1]}'
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class PingTest(unittest.TestCase):
+    def setUp(self):
+        self.servers = []
+        ModernServer.handshakes = []
+        ModernServer.requests = []
+        LegacyServer.requests = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def serve(self, handler):
+        server, address = serve(handler)
+        self.servers.append(server)
+        return address
+
+    def test_status_ping(self):
+        address = self.serve(ModernServer)
+        result = run(ping(address))
+        self.assertIsNone(result['error'])
+        self.assertTrue(result['online'])
+        self.assertFalse(result['legacy'])
+        self.assertEqual((result['players_online'], result['players_max']), (3, 20))
+        self.assertEqual(result['motd'], 'A cat server')
+        self.assertEqual(result['version'], '1.20.1')
+        self.assertIsNotNone(result['latency_ms'])
+        port = int(address.rsplit(':', 1)[1])
+        self.assertEqual(ModernServer.handshakes, [(0x00, 47, '127.0.0.1', port, 1)])
+        self.assertEqual(ModernServer.requests, [b'\x00'])
+
+    def test_falls_back_to_the_legacy_ping(self):
+        result = run(ping(self.serve(LegacyServer)))
+        self.assertIsNone(result['error'])
+        self.assertTrue(result['legacy'])
+        self.assertEqual((result['players_online'], result['players_max']), (5, 10))
+        self.assertEqual(result['motd'], 'Old times')
+        self.assertEqual(result['version'], '1.6.4')
+        # The modern handshake was kicked, then the 0xFE ping answered
+        self.assertEqual(LegacyServer.requests[-1], b'\xfe')
+        self.assertEqual(len(LegacyServer.requests), 2)
+
+    def test_pre_1_4_legacy_reply(self):
+        handler = type('Handler', (LegacyServer,), {'reply': 'Beta \xa7server\xa71\xa78'})
+        result = run(ping(self.serve(handler)))
+        self.assertEqual(result['motd'], 'Beta \xa7server')
+        self.assertEqual((result['players_online'], result['players_max']), (1, 8))
+        self.assertEqual(result['version'], '')
+
+    def test_unreachable_and_silent_servers(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        closed = f'127.0.0.1:{sock.getsockname()[1]}'
+        sock.close()
+        silent = self.serve(SilentServer)
+        start = time.monotonic()
+        refused, timed_out = run(ping_all([closed, silent], timeout=0.3))
+        self.assertLess(time.monotonic() - start, 0.6)
+        self.assertFalse(refused['online'])
+        self.assertIsNotNone(refused['error'])
+        self.assertEqual(timed_out['error'], 'timeout')
+
+
+class ServerPingerTest(unittest.TestCase):
+    def setUp(self):
+        ModernServer.handshakes = []
+        self.server, self.address = serve(ModernServer)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_results_are_cached_until_forced(self):
+        pinger = ServerPinger(ttl=60)
+        first = pinger.ping([self.address, self.address])
+        self.assertTrue(first[self.address]['online'])
+        self.assertEqual(pinger.stale([self.address]), [])
+        pinger.ping([self.address])
+        self.assertEqual(len(ModernServer.handshakes), 1)
+        pinger.ping([self.address], force=True)
+        self.assertEqual(len(ModernServer.handshakes), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
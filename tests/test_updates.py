@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from launcher_http import HTTPPool, default_pool
+from launcher_updates import ModUpdateChecker
+
+# Every tenth jar is unknown to the index, every third project has a newer release
+MODS = 60
+# Added to every response, so concurrency shows up in the timings
+LATENCY = 0.05
+
+
+class StandInIndex(BaseHTTPRequestHandler):
+    # Just enough of the Modrinth v2 API: version_file/<sha1> and project/<id>/version
+    protocol_version = 'HTTP/1.1'
+    files = {}
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        parts = self.path.split('?')[0].split('/')
+        if parts[2] == 'version_file':
+            self.requests.append('file')
+            version = self.files.get(parts[3])
+            return self.reply(200, json.dumps(version).encode()) if version else self.reply(404)
+        project = parts[3]
+        versions = [v for v in self.files.values() if v['project_id'] == project]
+        if int(project[1:]) % 3 == 0:
+            versions.append(dict(versions[0], id=project + '-new', version_number='2.0',
+                                 date_published='2024-01-01T00:00:00Z'))
+        etag = f'"{project}-{len(versions)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.requests.append('not_modified')
+            return self.reply(304, headers={'ETag': etag})
+        self.requests.append('project')
+        self.reply(200, json.dumps(versions).encode(), {'ETag': etag})
+
+
+class ModUpdateCheckerTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.mods_dir = os.path.join(self.dir.name, 'mods')
+        os.makedirs(self.mods_dir)
+        files = {}
+        for i in range(MODS):
+            data = os.urandom(4096)
+            name = f'mod{i:03d}.jar'
+            with open(os.path.join(self.mods_dir, name), 'wb') as f:
+                f.write(data)
+            if i % 10 == 9:
+                continue
+            digest = hashlib.sha1(data).hexdigest()
+            files[digest] = {'id': f'v{i}', 'project_id': f'p{i}', 'version_number': '1.0',
+                             'date_published': '2023-01-01T00:00:00Z', 'loaders': ['fabric'],
+                             'game_versions': ['1.20.1'],
+                             'files': [{'primary': True, 'filename': name, 'url': f'http://mods/{name}',
+                                        'hashes': {'sha1': digest}}]}
+        StandInIndex.files = files
+        StandInIndex.requests = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInIndex)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.pool = HTTPPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.dir.cleanup()
+
+    def checker(self):
+        url = f'http://127.0.0.1:{self.server.server_address[1]}/v2'
+        return ModUpdateChecker(self.dir.name, self.mods_dir, url, pool=self.pool)
+
+    def test_uses_the_launcher_pool_by_default(self):
+        self.assertIs(ModUpdateChecker(self.dir.name, self.mods_dir).pool, default_pool())
+
+    def test_reports_outdated_current_and_unknown(self):
+        reports = dict((r['file'], r) for r in self.checker().check())
+        self.assertEqual(len(reports), MODS)
+        self.assertEqual(reports['mod003.jar']['status'], 'outdated')
+        self.assertEqual(reports['mod003.jar']['latest'], '2.0')
+        self.assertEqual(reports['mod001.jar']['status'], 'current')
+        self.assertEqual(reports['mod009.jar']['status'], 'unknown')
+
+    def test_requests_run_concurrently(self):
+        checker = self.checker()
+        checker.check()
+        serial = checker.stats['requests'] * LATENCY
+        self.assertEqual(checker.stats['requests'], MODS + MODS * 9 // 10)
+        self.assertLess(checker.stats['seconds'], serial / 3)
+
+    def test_second_check_is_served_from_the_cache(self):
+        self.checker().check()
+        StandInIndex.requests = []
+        checker = self.checker()
+        reports = checker.check()
+        self.assertEqual(StandInIndex.requests, [])
+        self.assertEqual(checker.stats['hashed'], 0)
+        self.assertEqual(sum(1 for r in reports if r['status'] == 'outdated'), 18)
+
+    def test_revalidation_uses_conditional_requests(self):
+        self.checker().check()
+        StandInIndex.requests = []
+        checker = self.checker()
+        checker.check(force=True)
+        self.assertEqual(StandInIndex.requests, ['not_modified'] * (MODS * 9 // 10))
+        self.assertEqual(checker.stats['not_modified'], MODS * 9 // 10)
+
+    def test_changed_jar_is_hashed_again(self):
+        self.checker().check()
+        with open(os.path.join(self.mods_dir, 'mod001.jar'), 'ab') as f:
+            f.write(b'changed')
+        checker = self.checker()
+        reports = dict((r['file'], r) for r in checker.check())
+        self.assertEqual(checker.stats['hashed'], 1)
+        self.assertEqual(reports['mod001.jar']['status'], 'unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()